@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from uuid import UUID
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from uuid import UUID, uuid4
 from datetime import datetime
-from app.core.database import get_db
-from app.models.agent import AgentExecution
-from app.schemas.agent import AgentType, AgentExecutionCreate, AgentExecution
-from app.services.agent_executor import AgentExecutor
-from typing import List
+import asyncio
+import json
+from app.core.config import settings
+from app.core.database import get_db, AsyncSessionLocal
+from app.models.agent import AgentExecution, AgentStatus
+from app.schemas.agent import (
+    AgentType,
+    AgentExecutionCreate,
+    AgentExecution as AgentExecutionSchema,
+    AgentBatchCreate,
+    AgentBatch as AgentBatchSchema,
+)
+from app.services.agent_dedup import find_duplicate, input_fingerprint
+from app.services.agent_queue import AgentQueueFull, agent_workers
+from app.services.job_queue import agent_job_queue
+from app.services.execution_stream import execution_streams
+from typing import AsyncIterator, List
 
 router = APIRouter()
 
@@ -51,78 +65,215 @@ AVAILABLE_AGENTS: List[AgentType] = [
 ]
 
 
-def run_agent_task(
-    execution_id: UUID,
-    agent_type: str,
-    project_id: str,
-    task_description: str,
-    input_data: dict
-):
-    """Background task to run agent."""
-    import asyncio
-    from app.core.database import AsyncSessionLocal
+# Seconds a client is told to wait when the agent queue is full
+QUEUE_FULL_RETRY_AFTER = 5
 
-    async def run():
-        async with AsyncSessionLocal() as db:
-            executor = AgentExecutor(db)
-            try:
-                await executor.run_agent(
-                    agent_type=agent_type,
-                    project_id=project_id,
-                    task_description=task_description,
-                    input_data=input_data
-                )
-            except Exception as e:
-                print(f"Agent execution failed: {e}")
 
-    asyncio.run(run())
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={"error": {"message": "Too many agent executions queued, retry later", "code": "AGENT_QUEUE_FULL"}},
+        headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER)},
+    )
+
+
+def _check_agent_type(agent_type: str) -> None:
+    """Reject agent types that are not in AVAILABLE_AGENTS."""
+    agent_types = {agent.id for agent in AVAILABLE_AGENTS}
+    if agent_type not in agent_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": {"message": f"Unknown agent type: {agent_type}", "code": "INVALID_AGENT_TYPE"}},
+        )
+
+
+def _duplicate_response(response: Response, duplicate: AgentExecution) -> dict:
+    """Response for a request served by an identical execution."""
+    response.headers["X-Agent-Dedup"] = "hit"
+    if duplicate.status == AgentStatus.COMPLETED:
+        response.status_code = status.HTTP_200_OK
+        message = "Returned the result of an identical recent execution."
+    else:
+        message = "Attached to an identical execution in progress."
+    return {
+        "data": AgentExecutionSchema.model_validate(duplicate),
+        "message": message,
+    }
 
 
 @router.post("", status_code=status.HTTP_202_ACCEPTED, response_model=dict)
 async def execute_agent(
     execution_data: AgentExecutionCreate,
-    background_tasks: BackgroundTasks,
+    response: Response,
+    x_agent_dedup: str | None = Header(None, description="Send \"off\" to always start a new execution"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Execute an agent task (runs in background)."""
-    # Verify agent type exists
-    agent_types = {agent.id for agent in AVAILABLE_AGENTS}
-    if execution_data.agent_type not in agent_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": {"message": f"Unknown agent type: {execution_data.agent_type}", "code": "INVALID_AGENT_TYPE"}},
+    """
+    Queue an agent task for the worker pool.
+
+    An identical request (same project, agent type and input) attaches to the
+    execution already pending or running, or gets the result of one that
+    completed recently, unless the X-Agent-Dedup: off header is sent.
+    """
+    _check_agent_type(execution_data.agent_type)
+
+    input_hash = input_fingerprint(
+        execution_data.project_id, execution_data.agent_type, execution_data.input_data,
+    )
+    dedup = x_agent_dedup != "off"
+    if dedup:
+        duplicate = await find_duplicate(
+            db, execution_data.project_id, input_hash, settings.agent_dedup_window_seconds,
         )
+        if duplicate is not None:
+            return _duplicate_response(response, duplicate)
+
+    # Refuse before writing anything if there is no room
+    durable = settings.agent_queue_backend == "database"
+    if durable:
+        if await agent_job_queue.depth(db) >= settings.agent_queue_size:
+            raise _queue_full()
+    elif agent_workers.full():
+        raise _queue_full()
 
     # Create execution record
     execution = AgentExecution(
-        id=UUID(__import__('uuid').uuid4().hex),
+        id=uuid4(),
         project_id=execution_data.project_id,
         agent_type=execution_data.agent_type,
         task_description=execution_data.task_description,
         status="pending",
         input_data=execution_data.input_data,
+        # Opted-out executions stay out of the active-input unique index
+        input_hash=input_hash if dedup else None,
         started_at=datetime.utcnow(),
     )
     db.add(execution)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # An identical request inserted its execution after our lookup
+        await db.rollback()
+        duplicate = await find_duplicate(
+            db, execution_data.project_id, input_hash, settings.agent_dedup_window_seconds,
+        )
+        if duplicate is None:
+            raise
+        return _duplicate_response(response, duplicate)
     await db.refresh(execution)
 
-    # Run agent in background
-    background_tasks.add_task(
-        run_agent_task,
-        str(execution.id),
-        execution_data.agent_type,
-        str(execution_data.project_id),
-        execution_data.task_description,
-        execution_data.input_data or {}
-    )
+    # With the database queue the pending row is the job; a worker claims it
+    if not durable:
+        try:
+            agent_workers.submit(execution.id)
+        except AgentQueueFull:
+            # Filled up while the record was being written
+            await db.delete(execution)
+            await db.commit()
+            raise _queue_full()
+
+        # Open the stream now so subscribers can attach before the agent starts
+        execution_streams.open(execution.id)
 
     return {
-        "data": AgentExecution.model_validate(execution),
+        "data": AgentExecutionSchema.model_validate(execution),
         "message": "Agent execution started. Check status using the execution ID."
     }
 
 
+@router.post("/batch", status_code=status.HTTP_202_ACCEPTED, response_model=dict)
+async def execute_agent_batch(
+    batch_data: AgentBatchCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue one execution of an agent per input, e.g. one per file of a repository."""
+    _check_agent_type(batch_data.agent_type)
+    if len(batch_data.inputs) > settings.agent_batch_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": {"message": f"Batches are limited to {settings.agent_batch_max_size} inputs", "code": "BATCH_TOO_LARGE"}},
+        )
+
+    # Refuse before writing anything unless the whole batch fits
+    durable = settings.agent_queue_backend == "database"
+    if durable:
+        if await agent_job_queue.depth(db) + len(batch_data.inputs) > settings.agent_queue_size:
+            raise _queue_full()
+    elif agent_workers.full(len(batch_data.inputs)):
+        raise _queue_full()
+
+    batch_id = uuid4()
+    started_at = datetime.utcnow()
+    rows = [
+        {
+            "id": uuid4(),
+            "project_id": batch_data.project_id,
+            "agent_type": batch_data.agent_type,
+            "task_description": batch_data.task_description,
+            "status": AgentStatus.PENDING,
+            "input_data": input_data,
+            "input_hash": input_fingerprint(batch_data.project_id, batch_data.agent_type, input_data),
+            "started_at": started_at,
+            "batch_id": batch_id,
+        }
+        for input_data in batch_data.inputs
+    ]
+    # One multi-row INSERT instead of a round trip per execution
+    await db.execute(insert(AgentExecution), rows)
+    await db.commit()
+
+    # With the database queue, worker processes claim the pending rows
+    if not durable:
+        parallelism = min(
+            batch_data.parallelism or settings.agent_batch_parallelism,
+            settings.agent_batch_parallelism,
+        )
+        try:
+            agent_workers.submit_batch([row["id"] for row in rows], parallelism)
+        except AgentQueueFull:
+            # Filled up while the records were being written
+            await db.execute(delete(AgentExecution).where(AgentExecution.batch_id == batch_id))
+            await db.commit()
+            raise _queue_full()
+
+    return {
+        "data": AgentBatchSchema(
+            id=batch_id,
+            total=len(rows),
+            counts={AgentStatus.PENDING: len(rows)},
+            done=False,
+        ),
+        "execution_ids": [row["id"] for row in rows],
+        "message": "Agent batch queued. Check progress using the batch ID.",
+    }
+
+
+@router.get("/batch/{batch_id}", response_model=dict)
+async def get_agent_batch(
+    batch_id: UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """Execution counts per status for a batch."""
+    result = await db.execute(
+        select(AgentExecution.status, func.count())
+        .where(AgentExecution.batch_id == batch_id)
+        .group_by(AgentExecution.status)
+    )
+    counts = {AgentStatus(row[0]): row[1] for row in result.all()}
+    total = sum(counts.values())
+
+    if not total:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": {"message": "Agent batch not found", "code": "BATCH_NOT_FOUND"}},
+        )
+
+    unfinished = counts.get(AgentStatus.PENDING, 0) + counts.get(AgentStatus.RUNNING, 0)
+    return {
+        "data": AgentBatchSchema(id=batch_id, total=total, counts=counts, done=unfinished == 0)
+    }
+
+
 @router.get("/types", response_model=dict)
 async def list_agent_types():
     """List available agent types."""
@@ -146,4 +297,72 @@ async def get_agent_execution(
             detail={"error": {"message": "Agent execution not found", "code": "EXECUTION_NOT_FOUND"}},
         )
 
-    return {"data": AgentExecution.model_validate(execution)}
+    return {"data": AgentExecutionSchema.model_validate(execution)}
+
+
+# Seconds between status checks when an execution's stream is not in this process
+STREAM_POLL_INTERVAL = 1.0
+
+TERMINAL_STATUSES = (AgentStatus.COMPLETED, AgentStatus.FAILED)
+
+
+def _sse(event: str, data) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _load_execution(db: AsyncSession, execution_id: UUID) -> AgentExecution | None:
+    result = await db.execute(
+        select(AgentExecution).where(AgentExecution.id == execution_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _execution_events(execution_id: UUID) -> AsyncIterator[str]:
+    """SSE events for an execution: live tokens, then a final status."""
+    stream = execution_streams.get(execution_id)
+
+    if stream is not None:
+        async for chunk in stream.subscribe():
+            yield _sse("token", {"text": chunk})
+        if stream.error:
+            yield _sse("error", {"message": stream.error})
+        status_value = AgentStatus.FAILED if stream.error else AgentStatus.COMPLETED
+        yield _sse("done", {"status": status_value.value})
+        return
+
+    # Running in another process, or finished and retired: follow the record
+    while True:
+        async with AsyncSessionLocal() as db:
+            execution = await _load_execution(db, execution_id)
+        if execution is None or execution.status in TERMINAL_STATUSES:
+            break
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+    if execution is None:
+        yield _sse("error", {"message": "Agent execution not found"})
+        return
+    if execution.output_data:
+        yield _sse("token", {"text": execution.output_data.get("result", "")})
+    if execution.error_message:
+        yield _sse("error", {"message": execution.error_message})
+    yield _sse("done", {"status": AgentStatus(execution.status).value})
+
+
+@router.get("/{execution_id}/stream")
+async def stream_agent_execution(
+    execution_id: UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream agent output as server-sent events while it is generated."""
+    if execution_streams.get(execution_id) is None and not await _load_execution(db, execution_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": {"message": "Agent execution not found", "code": "EXECUTION_NOT_FOUND"}},
+        )
+
+    return StreamingResponse(
+        _execution_events(execution_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,19 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional
 from uuid import UUID
 from app.core.database import get_db
+from app.core.pagination import PageParams, paginate
 from app.models.ai_activity import AIActivity, AITool, ActivityCategory
-from app.schemas.ai_activity import AIActivityCreate, AIActivity
+from app.schemas.ai_activity import AIActivityCreate, AIActivity as AIActivitySchema
+from app.services.activity_rollup_service import ActivityRollupService
 
 router = APIRouter()
 
 
 @router.get("", response_model=dict)
 async def list_ai_activities(
-    page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=100),
+    params: PageParams = Depends(),
     project_id: Optional[UUID] = None,
     tool_used: Optional[AITool] = None,
     category: Optional[ActivityCategory] = None,
@@ -29,34 +30,11 @@ async def list_ai_activities(
     if category:
         query = query.where(AIActivity.category == category)
 
-    query = query.order_by(AIActivity.timestamp.desc())
-    query = query.offset((page - 1) * per_page).limit(per_page)
-
-    result = await db.execute(query)
-    activities = result.scalars().all()
-
-    # Get total count
-    count_query = select(AIActivity)
-    if project_id:
-        count_query = count_query.where(AIActivity.project_id == project_id)
-    if tool_used:
-        count_query = count_query.where(AIActivity.tool_used == tool_used)
-    if category:
-        count_query = count_query.where(AIActivity.category == category)
-
-    count_result = await db.execute(count_query)
-    total = len(count_result.scalars().all())
-
-    total_pages = (total + per_page - 1) // per_page
+    page = await paginate(db, query, params, AIActivity.timestamp, AIActivity.id)
 
     return {
-        "data": [AIActivity.model_validate(a) for a in activities],
-        "meta": {
-            "page": page,
-            "per_page": per_page,
-            "total": total,
-            "total_pages": total_pages,
-        },
+        "data": [AIActivitySchema.model_validate(a) for a in page["items"]],
+        "meta": page["meta"],
     }
 
 
@@ -76,10 +54,14 @@ async def log_ai_activity(
         user_id=UUID("00000000-0000-0000-0000-000000000000"),  # TODO: Get from auth
     )
     db.add(new_activity)
-    await db.commit()
+    await db.flush()
     await db.refresh(new_activity)
 
-    return {"data": AIActivity.model_validate(new_activity)}
+    # Keep the analytics rollup current in the same transaction
+    await ActivityRollupService(db).record_activity(new_activity)
+    await db.commit()
+
+    return {"data": AIActivitySchema.model_validate(new_activity)}
 
 
 @router.get("/{activity_id}", response_model=dict)
@@ -97,4 +79,4 @@ async def get_ai_activity(
             detail={"error": {"message": "AI activity not found", "code": "ACTIVITY_NOT_FOUND"}},
         )
 
-    return {"data": AIActivity.model_validate(activity)}
+    return {"data": AIActivitySchema.model_validate(activity)}
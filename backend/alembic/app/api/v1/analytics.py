@@ -5,11 +5,10 @@ from typing import Optional
 from uuid import UUID
 from datetime import date, datetime, timedelta
 from app.core.database import get_db
-from app.models.ai_activity import AIActivity
 from app.models.pipeline import PipelineExecution
 from app.models.project import Project
 from app.schemas.analytics import UsageAnalytics, ProductivityMetrics
-from app.services.ai_activity_service import AIActivityService
+from app.services.activity_rollup_service import ActivityRollupService
 
 router = AIAnalyticsRouter = APIRouter()
 
@@ -20,9 +19,8 @@ async def get_usage_analytics(
     end_date: Optional[date] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get AI tool usage analytics with REAL calculations."""
-    # Use AIActivityService for statistics
-    ai_service = AIActivityService(db)
+    """Get AI tool usage analytics from the daily rollup."""
+    rollup_service = ActivityRollupService(db)
 
     # Calculate date range
     if not start_date:
@@ -30,13 +28,10 @@ async def get_usage_analytics(
     if not end_date:
         end_date = datetime.utcnow().date()
 
-    start_datetime = datetime.combine(start_date, datetime.min.time())
-    end_datetime = datetime.combine(end_date, datetime.max.time())
-
-    # Get statistics using service
-    stats = await ai_service.get_statistics(
+    stats = await rollup_service.get_usage_statistics(
         project_id=project_id,
-        days=(end_date - start_date).days + 1
+        start_day=start_date,
+        end_day=end_date,
     )
 
     return {"data": UsageAnalytics(**stats)}
@@ -47,16 +42,10 @@ async def get_productivity_metrics(
     project_id: Optional[UUID] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get productivity metrics with REAL data from database."""
-    # Get all AI activities for project or all projects
-    query = select(AIActivity)
-    if project_id:
-        query = query.where(AIActivity.project_id == project_id)
-
-    result = await db.execute(query)
-    activities = list(result.scalars().all())
+    """Get productivity metrics from the daily rollup and pipeline history."""
+    totals = await ActivityRollupService(db).get_totals(project_id=project_id)
 
-    if not activities:
+    if not totals["total_activities"]:
         return {
             "data": ProductivityMetrics(
                 total_commits=0,
@@ -68,15 +57,8 @@ async def get_productivity_metrics(
             )
         }
 
-    # Calculate real metrics
-    total_activities = len(activities)
-
-    # Estimate lines of code changed from activities
-    total_loc = 0
-    for activity in activities:
-        if activity.code_changes:
-            # Assume average of 50 lines per code change
-            total_loc += len(activity.code_changes) * 50
+    total_activities = totals["total_activities"]
+    total_loc = totals["lines_of_code"]
 
     # AI-assisted commits = activities logged
     ai_assisted = total_activities
@@ -104,8 +86,7 @@ async def get_productivity_metrics(
     avg_build_time = sum(build_times) / len(build_times) if build_times else 0.0
 
     # Estimate test coverage based on test-related activities
-    test_activities = [a for a in activities if a.category == "test"]
-    test_ratio = len(test_activities) / total_activities if total_activities > 0 else 0
+    test_ratio = totals["test_activities"] / total_activities if total_activities > 0 else 0
     estimated_coverage = min(95, 50 + (test_ratio * 45))  # Base 50% + up to 45% more
 
     # AI contribution percentage (based on typical project)
@@ -132,36 +113,33 @@ async def get_activity_timeline(
     db: AsyncSession = Depends(get_db),
 ):
     """Get activity timeline with grouping by date."""
-    start_date = datetime.utcnow() - timedelta(days=days)
-
-    query = select(AIActivity).where(AIActivity.timestamp >= start_date)
-    if project_id:
-        query = query.where(AIActivity.project_id == project_id)
+    start_date = (datetime.utcnow() - timedelta(days=days)).date()
 
-    query = query.order_by(AIActivity.timestamp.desc())
-    result = await db.execute(query)
-    activities = list(result.scalars().all())
+    rows = await ActivityRollupService(db).get_daily_rows(
+        project_id=project_id,
+        start_day=start_date,
+    )
 
     # Group by date
     timeline = {}
-    for activity in activities:
-        date_key = activity.timestamp.date().isoformat()
+    total_activities = 0
+    for day, tool_used, category, count in rows:
+        date_key = day.isoformat()
 
         if date_key not in timeline:
-            timeline[date_key] = []
+            timeline[date_key] = {"total": 0, "by_tool": {}, "by_category": {}}
 
-        timeline[date_key].append({
-            "id": str(activity.id),
-            "tool": activity.tool_used.value,
-            "category": activity.category.value,
-            "timestamp": activity.timestamp.isoformat(),
-        })
+        entry = timeline[date_key]
+        entry["total"] += count
+        entry["by_tool"][tool_used.value] = entry["by_tool"].get(tool_used.value, 0) + count
+        entry["by_category"][category.value] = entry["by_category"].get(category.value, 0) + count
+        total_activities += count
 
     return {
         "data": {
             "timeline": timeline,
             "total_days": len(timeline),
-            "total_activities": len(activities),
+            "total_activities": total_activities,
         }
     }
 
@@ -172,17 +150,13 @@ async def get_tools_comparison(
     db: AsyncSession = Depends(get_db),
 ):
     """Compare AI tools usage with REAL data."""
-    query = select(AIActivity)
-    if project_id:
-        query = query.where(AIActivity.project_id == project_id)
-
-    result = await db.execute(query)
-    activities = list(result.scalars().all())
+    rows = await ActivityRollupService(db).get_tool_category_counts(project_id=project_id)
 
     # Calculate metrics per tool
     tools_data = {}
-    for activity in activities:
-        tool = activity.tool_used.value
+    total_activities = 0
+    for tool_used, category, count in rows:
+        tool = tool_used.value
 
         if tool not in tools_data:
             tools_data[tool] = {
@@ -190,12 +164,9 @@ async def get_tools_comparison(
                 "by_category": {},
             }
 
-        tools_data[tool]["total"] += 1
-
-        category = activity.category.value
-        if category not in tools_data[tool]["by_category"]:
-            tools_data[tool]["by_category"][category] = 0
-        tools_data[tool]["by_category"][category] += 1
+        tools_data[tool]["total"] += count
+        tools_data[tool]["by_category"][category.value] = count
+        total_activities += count
 
     # Add comparisons
     comparison = []
@@ -204,7 +175,7 @@ async def get_tools_comparison(
             "tool": tool,
             "total_usage": data["total"],
             "categories": data["by_category"],
-            "percentage": round(data["total"] / len(activities) * 100, 1) if activities else 0,
+            "percentage": round(data["total"] / total_activities * 100, 1) if total_activities else 0,
         })
 
     # Sort by usage
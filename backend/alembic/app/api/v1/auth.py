@@ -3,14 +3,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
     decode_token,
 )
+from app.middleware.auth import get_current_user
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, User, TokenRefresh, TokenResponse
+from app.schemas.user import (
+    UserCreate,
+    UserLogin,
+    User as UserSchema,
+    TokenRefresh,
+    TokenResponse,
+)
 from typing import Dict
 
 router = APIRouter()
@@ -42,7 +49,7 @@ async def register_user(
         email=user_data.email,
         username=user_data.username,
         full_name=user_data.full_name,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
     )
     db.add(new_user)
     await db.commit()
@@ -53,7 +60,7 @@ async def register_user(
     refresh_token = create_refresh_token(data={"sub": str(new_user.id)})
 
     return {
-        "data": User.model_validate(new_user),
+        "data": UserSchema.model_validate(new_user),
         "tokens": {
             "access_token": access_token,
             "refresh_token": refresh_token,
@@ -71,7 +78,7 @@ async def login_user(
     result = await db.execute(select(User).where(User.email == user_data.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user or not await verify_password_async(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={"error": {"message": "Invalid email or password", "code": "INVALID_CREDENTIALS"}},
@@ -82,7 +89,7 @@ async def login_user(
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
 
     return {
-        "data": User.model_validate(user),
+        "data": UserSchema.model_validate(user),
         "tokens": {
             "access_token": access_token,
             "refresh_token": refresh_token,
@@ -103,3 +110,9 @@ async def refresh_token(token_data: TokenRefresh) -> TokenResponse:
 
     access_token = create_access_token(data={"sub": payload["sub"]})
     return TokenResponse(access_token=access_token)
+
+
+@router.get("/me")
+async def get_me(current_user: User = Depends(get_current_user)) -> Dict:
+    """Get the authenticated user."""
+    return {"data": UserSchema.model_validate(current_user)}
@@ -2,6 +2,12 @@ from fastapi import APIRouter, Depends
 from datetime import datetime
 from app.core.config import settings
 from app.core.database import get_db
+from app.middleware.auth import token_cache
+from app.services.identity_cache import user_identity_cache
+from app.services.ai_client import get_ai_client
+from app.services.agent_queue import agent_workers
+from app.services.github_client import github_etag_cache, github_rate_limit, github_repo_cache
+from app.services.mcp_client import mcp_connections
 from app.schemas.common import HealthResponse, ReadinessResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -33,3 +39,21 @@ async def check_readiness(db: AsyncSession = Depends(get_db)):
         ready = False
 
     return ReadinessResponse(ready=ready, dependencies=dependencies)
+
+
+@router.get("/health/metrics")
+async def get_metrics():
+    """In-process cache and limiter metrics for this worker."""
+    ai_client = get_ai_client()
+    response_cache = ai_client.cache
+    return {
+        "auth_token_cache": token_cache.stats(),
+        "user_identity_cache": user_identity_cache.stats(),
+        "ai_response_cache": response_cache.stats() if response_cache else None,
+        "ai_provider_limits": ai_client.limiter.stats(),
+        "agent_queue": agent_workers.stats(),
+        "github_response_cache": github_etag_cache.stats(),
+        "github_rate_limit": github_rate_limit.stats(),
+        "github_repo_cache": github_repo_cache.stats(),
+        "mcp_servers": mcp_connections.stats(),
+    }
@@ -1,10 +1,17 @@
+import math
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 from app.core.database import get_db
-from app.models.mcp import MCPServer
-from app.schemas.mcp import MCPServerCreate, MCPServer, MCPToolExecute
+from app.models.mcp import MCPServer, MCPServerStatus
+from app.schemas.mcp import MCPServerCreate, MCPServer as MCPServerSchema, MCPToolExecute
+from app.services.mcp_client import (
+    MCPServerError,
+    MCPServerUnavailable,
+    MCPToolError,
+    mcp_connections,
+)
 from typing import List
 
 router = APIRouter()
@@ -18,7 +25,7 @@ async def list_mcp_servers(
     result = await db.execute(select(MCPServer))
     servers = result.scalars().all()
 
-    return {"data": [MCPServer.model_validate(s) for s in servers]}
+    return {"data": [MCPServerSchema.model_validate(s) for s in servers]}
 
 
 @router.post("/servers", status_code=status.HTTP_201_CREATED, response_model=dict)
@@ -37,7 +44,7 @@ async def register_mcp_server(
     await db.commit()
     await db.refresh(new_server)
 
-    return {"data": MCPServer.model_validate(new_server)}
+    return {"data": MCPServerSchema.model_validate(new_server)}
 
 
 @router.post("/servers/{server_id}/execute", response_model=dict)
@@ -52,21 +59,43 @@ async def execute_mcp_tool(
     server = result.scalar_one_or_none()
 
     if not server:
+        # Deleted servers leave no pooled session behind
+        await mcp_connections.evict(server_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"error": {"message": "MCP server not found", "code": "SERVER_NOT_FOUND"}},
         )
 
-    # TODO: Implement actual MCP server communication
-    # This would involve:
-    # 1. Establishing connection to MCP server
-    # 2. Calling the specified tool with parameters
-    # 3. Returning the result
+    if server.status == MCPServerStatus.INACTIVE:
+        await mcp_connections.evict(server_id)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": {"message": "MCP server is inactive", "code": "MCP_SERVER_INACTIVE"}},
+        )
 
-    result_data = {
-        "tool_name": tool_data.tool_name,
-        "parameters": tool_data.parameters,
-        "result": "Tool execution result (placeholder)",
-    }
+    try:
+        result_data = await mcp_connections.call_tool(server, tool_data.tool_name, tool_data.parameters)
+    except MCPServerUnavailable as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": {"message": str(exc), "code": "MCP_SERVER_UNAVAILABLE"}},
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        )
+    except MCPServerError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail={"error": {"message": str(exc), "code": "MCP_SERVER_ERROR"}},
+        )
+    except MCPToolError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": {"message": str(exc), "code": "MCP_TOOL_ERROR"}},
+        )
 
-    return {"data": result_data}
+    return {
+        "data": {
+            "tool_name": tool_data.tool_name,
+            "parameters": tool_data.parameters,
+            "result": result_data,
+        }
+    }
@@ -1,19 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional
 from uuid import UUID
 from app.core.database import get_db
+from app.core.pagination import PageParams, paginate
 from app.models.pipeline import PipelineExecution, PipelineStatus
-from app.schemas.pipeline import PipelineTrigger, PipelineExecution
+from app.schemas.pipeline import PipelineTrigger, PipelineExecution as PipelineExecutionSchema
 
 router = APIRouter()
 
 
 @router.get("", response_model=dict)
 async def list_pipeline_executions(
-    page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=100),
+    params: PageParams = Depends(),
     project_id: Optional[UUID] = None,
     status_filter: Optional[PipelineStatus] = None,
     db: AsyncSession = Depends(get_db),
@@ -26,32 +26,13 @@ async def list_pipeline_executions(
     if status_filter:
         query = query.where(PipelineExecution.status == status_filter)
 
-    query = query.order_by(PipelineExecution.started_at.desc())
-    query = query.offset((page - 1) * per_page).limit(per_page)
-
-    result = await db.execute(query)
-    executions = result.scalars().all()
-
-    # Get total count
-    count_query = select(PipelineExecution)
-    if project_id:
-        count_query = count_query.where(PipelineExecution.project_id == project_id)
-    if status_filter:
-        count_query = count_query.where(PipelineExecution.status == status_filter)
-
-    count_result = await db.execute(count_query)
-    total = len(count_result.scalars().all())
-
-    total_pages = (total + per_page - 1) // per_page
+    page = await paginate(
+        db, query, params, PipelineExecution.started_at, PipelineExecution.id
+    )
 
     return {
-        "data": [PipelineExecution.model_validate(e) for e in executions],
-        "meta": {
-            "page": page,
-            "per_page": per_page,
-            "total": total,
-            "total_pages": total_pages,
-        },
+        "data": [PipelineExecutionSchema.model_validate(e) for e in page["items"]],
+        "meta": page["meta"],
     }
 
 
@@ -74,7 +55,7 @@ async def trigger_pipeline(
 
     # TODO: Trigger actual CI/CD pipeline via GitHub Actions or similar
 
-    return {"data": PipelineExecution.model_validate(new_execution)}
+    return {"data": PipelineExecutionSchema.model_validate(new_execution)}
 
 
 @router.get("/{execution_id}", response_model=dict)
@@ -92,4 +73,4 @@ async def get_pipeline_execution(
             detail={"error": {"message": "Pipeline execution not found", "code": "PIPELINE_NOT_FOUND"}},
         )
 
-    return {"data": PipelineExecution.model_validate(execution)}
+    return {"data": PipelineExecutionSchema.model_validate(execution)}
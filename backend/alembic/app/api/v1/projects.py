@@ -1,19 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional
 from uuid import UUID
 from app.core.database import get_db
+from app.core.pagination import PageParams, paginate
 from app.models.project import Project, ProjectStatus
-from app.schemas.project import ProjectCreate, ProjectUpdate, Project
+from app.schemas.project import ProjectCreate, ProjectUpdate, Project as ProjectSchema
 
 router = APIRouter()
 
 
 @router.get("", response_model=dict)
 async def list_projects(
-    page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=100),
+    params: PageParams = Depends(),
     search: Optional[str] = None,
     status_filter: Optional[ProjectStatus] = None,
     db: AsyncSession = Depends(get_db),
@@ -27,32 +27,11 @@ async def list_projects(
     if search:
         query = query.where(Project.name.ilike(f"%{search}%"))
 
-    # Count total
-    count_query = select(Project)
-    if status_filter:
-        count_query = count_query.where(Project.status == status_filter)
-    if search:
-        count_query = count_query.where(Project.name.ilike(f"%{search}%"))
-
-    # Get paginated results
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    result = await db.execute(query)
-    projects = result.scalars().all()
-
-    # Get total count
-    count_result = await db.execute(count_query)
-    total = len(count_result.scalars().all())
-
-    total_pages = (total + per_page - 1) // per_page
+    page = await paginate(db, query, params, Project.created_at, Project.id)
 
     return {
-        "data": [Project.model_validate(p) for p in projects],
-        "meta": {
-            "page": page,
-            "per_page": per_page,
-            "total": total,
-            "total_pages": total_pages,
-        },
+        "data": [ProjectSchema.model_validate(p) for p in page["items"]],
+        "meta": page["meta"],
     }
 
 
@@ -73,7 +52,7 @@ async def create_project(
     await db.commit()
     await db.refresh(new_project)
 
-    return {"data": Project.model_validate(new_project)}
+    return {"data": ProjectSchema.model_validate(new_project)}
 
 
 @router.get("/{project_id}", response_model=dict)
@@ -91,7 +70,7 @@ async def get_project(
             detail={"error": {"message": "Project not found", "code": "PROJECT_NOT_FOUND"}},
         )
 
-    return {"data": Project.model_validate(project)}
+    return {"data": ProjectSchema.model_validate(project)}
 
 
 @router.put("/{project_id}", response_model=dict)
@@ -125,7 +104,7 @@ async def update_project(
     await db.commit()
     await db.refresh(project)
 
-    return {"data": Project.model_validate(project)}
+    return {"data": ProjectSchema.model_validate(project)}
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
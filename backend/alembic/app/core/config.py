@@ -30,6 +30,20 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
+    auth_token_cache_size: int = Field(
+        default=10_000,
+        description="Verified access tokens cached per worker; 0 disables the cache"
+    )
+    user_cache_ttl_seconds: float = Field(
+        default=30.0,
+        description="How long a resolved caller is reused without a DB lookup; 0 disables"
+    )
+    user_cache_size: int = 10_000
+    password_hash_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Threads for bcrypt hashing; bounds concurrent logins per worker"
+    )
 
     # CORS
     cors_origins: List[str] = Field(
@@ -42,10 +56,111 @@ class Settings(BaseSettings):
     anthropic_api_key: str = ""
     github_token: str = ""
 
+    # AI provider HTTP pool (shared by all model calls in a worker)
+    openai_base_url: str = "https://api.openai.com/v1"
+    anthropic_base_url: str = "https://api.anthropic.com/v1"
+    ai_http2: bool = True
+    ai_timeout_seconds: float = 60.0
+    ai_max_connections: int = 100
+    ai_max_keepalive_connections: int = 20
+    ai_keepalive_expiry_seconds: float = 30.0
+
+    # GitHub API client (shared pool, conditional-request cache, quota pacing)
+    github_api_url: str = "https://api.github.com"
+    github_timeout_seconds: float = 30.0
+    github_max_connections: int = 20
+    github_cache_max_entries: int = Field(
+        default=1000,
+        description="GET responses kept for conditional requests; 0 disables"
+    )
+    github_rate_limit_reserve: int = Field(
+        default=100,
+        description="Below this many remaining requests, calls are spaced out until the quota resets"
+    )
+    github_rate_limit_max_wait_seconds: float = Field(
+        default=60.0,
+        description="Longest a call waits for quota before failing"
+    )
+    github_page_concurrency: int = Field(
+        default=4,
+        description="Pages of a paginated list fetched at once"
+    )
+    github_tree_cache_max_entries: int = Field(
+        default=200,
+        description="Repository trees (by SHA) and default branches kept in memory; 0 disables"
+    )
+    github_default_branch_ttl_seconds: float = 300.0
+
+    # AI provider limits: excess calls queue instead of failing
+    ai_max_concurrency_per_model: int = 8
+    openai_tokens_per_minute: int = Field(default=0, description="0 disables the budget")
+    anthropic_tokens_per_minute: int = Field(default=0, description="0 disables the budget")
+    ai_max_retries: int = 5
+    ai_retry_base_delay_seconds: float = 1.0
+    ai_retry_max_delay_seconds: float = 60.0
+
+    # AI response cache (opt-in)
+    ai_cache_backend: str = Field(
+        default="none",
+        description="Model response cache: none, memory (per process) or sqlite (per host)"
+    )
+    ai_cache_max_entries: int = 1000
+    ai_cache_ttl_seconds: float = 86400
+    ai_cache_sqlite_path: str = "./ai_response_cache.db"
+
+    # Agent workers: executions run on the API process's event loop, or on
+    # separate worker processes that claim them from the database
+    agent_workers: int = 4
+    agent_queue_size: int = Field(
+        default=100,
+        description="Executions waiting beyond this are refused with 429; a batch must fit whole"
+    )
+    agent_drain_timeout_seconds: float = 30.0
+    web_concurrency: int = Field(
+        default=1,
+        description="API processes (uvicorn reads WEB_CONCURRENCY too); above 1, unfinished in-process executions are not recovered at startup"
+    )
+    agent_queue_backend: str = Field(
+        default="memory",
+        description="memory (workers in the API process) or database (scripts/agent_worker.py)"
+    )
+    agent_lease_seconds: float = 60.0
+    agent_max_attempts: int = 3
+    agent_poll_interval_seconds: float = 1.0
+    agent_dedup_window_seconds: float = Field(
+        default=600,
+        description="Identical requests reuse an execution completed this recently (0: only attach to running ones)"
+    )
+    agent_batch_max_size: int = 1000
+    agent_batch_parallelism: int = Field(
+        default=8,
+        description="Executions of one batch queued or running at once (in-process workers)"
+    )
+    # About 3k tokens of code per prompt, leaving room for the reply
+    agent_chunk_chars: int = Field(
+        default=12000,
+        description="Code reviewer/test generator split larger files into prompts of about this size"
+    )
+
     # MCP
     mcp_github_endpoint: str = ""
     mcp_filesystem_endpoint: str = ""
     mcp_database_endpoint: str = ""
+    # Pooled sessions to registered MCP servers
+    mcp_timeout_seconds: float = 30.0
+    mcp_max_connections_per_server: int = 10
+    mcp_health_check_interval_seconds: float = Field(
+        default=30.0,
+        description="Seconds between pings of registered MCP servers; 0 disables"
+    )
+    mcp_breaker_failure_threshold: int = Field(
+        default=5,
+        description="Consecutive failures after which calls to an MCP server fail fast"
+    )
+    mcp_breaker_reset_seconds: float = Field(
+        default=30.0,
+        description="How long a tripped MCP server fails fast before a trial call"
+    )
 
     # CI/CD
     github_webhook_secret: str = ""
@@ -56,6 +171,12 @@ class Settings(BaseSettings):
 
     # Rate Limiting
     rate_limit_per_minute: int = 100
+    rate_limit_backend: str = Field(
+        default="memory",
+        description="Rate limit state store: memory (per process), sqlite (per host) or redis"
+    )
+    rate_limit_sqlite_path: str = "./rate_limit.db"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
 
     @validator("cors_origins", pre=True)
     def parse_cors_origins(cls, v):
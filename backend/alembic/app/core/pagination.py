@@ -0,0 +1,164 @@
+"""
+Pagination helpers shared by list endpoints.
+
+Totals come from SELECT count(*) (optionally capped or planner-estimated)
+and deep pages use an opaque keyset cursor on (sort column, id) instead of
+OFFSET, so page N costs the same as page 1.
+"""
+import base64
+import enum
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from uuid import UUID
+from fastapi import HTTPException, Query, status
+from sqlalchemy import select, func, tuple_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Largest total reported exactly in capped/estimated mode
+COUNT_CAP = 10_000
+
+
+class CountMode(str, enum.Enum):
+    """How the total row count is computed."""
+    EXACT = "exact"
+    CAPPED = "capped"
+    ESTIMATED = "estimated"
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    """Encode a keyset position as an opaque URL-safe token."""
+    raw = json.dumps({"k": sort_value.isoformat(), "id": str(row_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor token. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["k"]), UUID(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class PageParams:
+    """Query parameters accepted by paginated list endpoints."""
+
+    def __init__(
+        self,
+        page: int = Query(1, ge=1),
+        per_page: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from meta.next_cursor"),
+        count: CountMode = Query(CountMode.EXACT, description="How to compute meta.total"),
+    ):
+        self.page = page
+        self.per_page = per_page
+        self.count = count
+        self.after = None
+
+        if cursor:
+            try:
+                self.after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={"error": {"message": "Invalid pagination cursor", "code": "INVALID_CURSOR"}},
+                )
+
+
+async def count_rows(
+    db: AsyncSession,
+    query,
+    mode: CountMode = CountMode.EXACT,
+    cap: int = COUNT_CAP
+) -> Tuple[int, bool]:
+    """Count rows matched by a query. Returns (total, is_exact)."""
+    # Count a single narrow column so wide Text columns are never touched
+    query = query.order_by(None).with_only_columns(query.selected_columns[0])
+
+    if mode == CountMode.ESTIMATED and db.get_bind().dialect.name == "postgresql":
+        estimate = await _planner_estimate(db, query)
+        if estimate > cap:
+            return estimate, False
+        mode = CountMode.EXACT
+
+    if mode == CountMode.CAPPED:
+        # Stop scanning as soon as we know the total exceeds the cap
+        limited = query.limit(cap + 1).subquery()
+        result = await db.execute(select(func.count()).select_from(limited))
+        total = result.scalar()
+        return min(total, cap), total <= cap
+
+    result = await db.execute(select(func.count()).select_from(query.subquery()))
+    return result.scalar(), True
+
+
+async def _planner_estimate(db: AsyncSession, query) -> int:
+    """Row estimate from the PostgreSQL planner, without running the query."""
+    compiled = query.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    params: PageParams,
+    sort_column,
+    id_column
+) -> dict[str, Any]:
+    """
+    Fetch one page of a query ordered by (sort_column, id_column) descending.
+    Returns {"items": [...], "meta": {...}} where meta matches PaginationMeta.
+
+    The sort column must be NOT NULL: a NULL cannot be encoded in a cursor
+    or compared in the keyset condition. Pages fetched by cursor are not
+    counted; their page and total fields are None.
+    """
+    if sort_column.nullable:
+        raise ValueError(f"Cannot paginate on nullable column {sort_column.key}")
+
+    page_query = query.order_by(sort_column.desc(), id_column.desc())
+    if params.after:
+        page_query = page_query.where(tuple_(sort_column, id_column) < params.after)
+    else:
+        page_query = page_query.offset((params.page - 1) * params.per_page)
+
+    # Fetch one extra row to know whether a next page exists
+    result = await db.execute(page_query.limit(params.per_page + 1))
+    items = list(result.scalars().all())
+
+    next_cursor = None
+    if len(items) > params.per_page:
+        items = items[:params.per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(
+            getattr(last, sort_column.key),
+            getattr(last, id_column.key),
+        )
+
+    meta = {
+        "page": None,
+        "per_page": params.per_page,
+        "total": None,
+        "total_pages": None,
+        "total_is_exact": None,
+        "next_cursor": next_cursor,
+    }
+    if not params.after:
+        total, is_exact = await count_rows(db, query, params.count)
+        meta.update(
+            page=params.page,
+            total=total,
+            total_pages=(total + params.per_page - 1) // params.per_page,
+            total_is_exact=is_exact,
+        )
+
+    return {"items": items, "meta": meta}
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,6 +9,11 @@ from app.core.config import settings
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool for bcrypt, created on first use. bcrypt releases the GIL,
+# so threads hash in parallel without blocking the event loop, and the pool
+# size caps how much CPU a login burst can take.
+_password_executor: Optional[ThreadPoolExecutor] = None
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -18,6 +25,41 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _get_password_executor() -> ThreadPoolExecutor:
+    """Return the bcrypt thread pool, creating it if needed."""
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="password-hash",
+        )
+    return _password_executor
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_password_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_password_executor(), get_password_hash, password
+    )
+
+
+def shutdown_password_executor() -> None:
+    """Wait for in-flight hashes and release the bcrypt thread pool."""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=True)
+        _password_executor = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -5,11 +5,17 @@ from contextlib import asynccontextmanager
 import structlog
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.security import shutdown_password_executor
+from app.services.ai_client import close_ai_client
+from app.services.github_client import close_github_client
+from app.services.mcp_client import mcp_connections
+from app.services.agent_queue import agent_workers
 from app.middleware import (
     AuthMiddleware,
     RateLimitMiddleware,
     RequestLoggingMiddleware,
     configure_cors_middleware,
+    create_rate_limiter,
 )
 from app.api.v1 import (
     health,
@@ -50,8 +56,23 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
     logger.info("Database initialized")
+    if settings.agent_queue_backend == "memory":
+        # Another process may still be running the unfinished executions;
+        # only the database queue is safe to share between processes
+        recover = settings.web_concurrency == 1
+        if not recover:
+            logger.warning("Not recovering unfinished agent executions: WEB_CONCURRENCY > 1")
+        await agent_workers.start(recover=recover)
+    mcp_connections.start()
     yield
     logger.info("Shutting down application")
+    # Let queued agent executions finish while their dependencies are still open
+    await agent_workers.stop()
+    await mcp_connections.stop()
+    await rate_limiter.close()
+    shutdown_password_executor()
+    await close_ai_client()
+    await close_github_client()
 
 
 # Create FastAPI application
@@ -71,10 +92,16 @@ configure_cors_middleware(
 )
 
 # Add rate limiting middleware
+rate_limiter = create_rate_limiter(
+    settings.rate_limit_backend,
+    sqlite_path=settings.rate_limit_sqlite_path,
+    redis_url=settings.rate_limit_redis_url,
+)
 app.add_middleware(
     RateLimitMiddleware,
     max_requests=settings.rate_limit_per_minute,
     window_seconds=60,
+    limiter=rate_limiter,
 )
 
 # Add request logging middleware
@@ -1,21 +1,33 @@
 from app.middleware.auth import (
     AuthMiddleware,
+    VerifiedTokenCache,
     get_current_user,
     get_optional_user,
 )
 from app.middleware.rate_limit import (
     RateLimitMiddleware,
+    RateLimitBackend,
     RateLimiter,
 )
+from app.middleware.rate_limit_backends import (
+    SQLiteRateLimiter,
+    RedisRateLimiter,
+    create_rate_limiter,
+)
 from app.middleware.logging import RequestLoggingMiddleware
 from app.middleware.cors import configure_cors_middleware
 
 __all__ = [
     "AuthMiddleware",
+    "VerifiedTokenCache",
     "get_current_user",
     "get_optional_user",
     "RateLimitMiddleware",
+    "RateLimitBackend",
     "RateLimiter",
+    "SQLiteRateLimiter",
+    "RedisRateLimiter",
+    "create_rate_limiter",
     "RequestLoggingMiddleware",
     "configure_cors_middleware",
 ]
@@ -3,77 +3,200 @@ Authentication Middleware
 
 Provides JWT authentication for protected routes.
 """
-from fastapi import Request, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from fastapi import Depends, Request, HTTPException, status
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.database import get_db
 from app.core.security import decode_token
 from app.models.user import User
+from app.services.identity_cache import user_identity_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle JWT authentication."""
-
-    async def dispatch(self, request: Request, call_next):
-        """Process request and validate JWT token."""
-        # Skip authentication for public endpoints
-        if request.url.path in [
-            "/",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/api/v1/health",
-            "/api/v1/health/ready",
-            "/api/v1/auth/login",
-            "/api/v1/auth/register",
-        ]:
-            return await call_next(request)
-
+# Endpoints reachable without a token
+PUBLIC_PATHS = frozenset([
+    "/",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/api/v1/health",
+    "/api/v1/health/ready",
+    "/api/v1/auth/login",
+    "/api/v1/auth/register",
+])
+
+
+# Upper bound on expired entries dropped per insert, keeping each call O(1)
+EXPIRED_EVICTIONS_PER_CALL = 8
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified JWT payloads keyed by token digest.
+
+    Clients reuse an access token until it expires, so after the first
+    request a token's signature check is a dict lookup. Only tokens that
+    passed full verification and carry an `exp` claim are stored, and an
+    entry is never served after its `exp`.
+    """
+
+    def __init__(self, max_size: int = 10_000, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.clock = clock
+        # digest -> (payload, exp), least recently used first
+        self.entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Cached payload for token, or None if absent or expired."""
+        digest = self._digest(token)
+        entry = self.entries.get(digest)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        payload, exp = entry
+        if exp <= self.clock():
+            del self.entries[digest]
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(digest)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        """Remember a verified payload until its exp."""
+        exp = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+
+        self.entries[self._digest(token)] = (payload, exp)
+        self._evict_expired()
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def _evict_expired(self) -> None:
+        """Drop a few expired entries from the least recently used end."""
+        now = self.clock()
+        for _ in range(EXPIRED_EVICTIONS_PER_CALL):
+            if not self.entries:
+                return
+            digest, (_, exp) = next(iter(self.entries.items()))
+            if exp > now:
+                return
+            del self.entries[digest]
+
+    def decode(self, token: str) -> Optional[dict]:
+        """decode_token with caching of successful verifications."""
+        payload = self.get(token)
+        if payload is None:
+            payload = decode_token(token)
+            if payload:
+                self.put(token, payload)
+        return payload
+
+    def stats(self) -> dict:
+        """Hit-rate metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Shared by AuthMiddleware instances unless one is given a cache of its own
+token_cache = VerifiedTokenCache(settings.auth_token_cache_size)
+
+
+def _unauthorized(message: str, code: str) -> JSONResponse:
+    """401 response in the API error format."""
+    return JSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"error": {"message": message, "code": code}}
+    )
+
+
+class AuthMiddleware:
+    """ASGI middleware to handle JWT authentication."""
+
+    def __init__(self, app: ASGIApp, cache: Optional[VerifiedTokenCache] = None):
+        self.app = app
+        self.cache = cache or token_cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Validate the JWT token before passing the request on."""
+        # Skip authentication for non-HTTP traffic and public endpoints
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        response = self.authenticate(scope)
+        if response:
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def authenticate(self, scope: Scope) -> JSONResponse | None:
+        """Store token claims in request state, or return a 401 response."""
         # Get token from Authorization header
-        authorization = request.headers.get("Authorization")
+        authorization = Headers(scope=scope).get("Authorization")
 
         if not authorization:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"error": {"message": "Missing authorization header", "code": "NO_AUTH_HEADER"}}
-            )
+            return _unauthorized("Missing authorization header", "NO_AUTH_HEADER")
 
         if not authorization.startswith("Bearer "):
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"error": {"message": "Invalid authorization format", "code": "INVALID_AUTH_FORMAT"}}
-            )
+            return _unauthorized("Invalid authorization format", "INVALID_AUTH_FORMAT")
 
         token = authorization.split(" ")[1]
 
         # Decode and validate token
-        payload = decode_token(token)
+        payload = self.cache.decode(token)
 
         if not payload:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"error": {"message": "Invalid or expired token", "code": "INVALID_TOKEN"}}
-            )
+            return _unauthorized("Invalid or expired token", "INVALID_TOKEN")
 
         # Check token type
         if payload.get("type") != "access":
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"error": {"message": "Invalid token type", "code": "INVALID_TOKEN_TYPE"}}
-            )
+            return _unauthorized("Invalid token type", "INVALID_TOKEN_TYPE")
 
         # Add user info to request state
-        request.state.user_id = payload.get("sub")
-        request.state.token_payload = payload
+        state = scope.setdefault("state", {})
+        state["user_id"] = payload.get("sub")
+        state["token_payload"] = payload
+        return None
+
 
-        return await call_next(request)
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_db)) -> User:
+    """
+    Get current authenticated user from request.
 
+    The user is memoized on request.state, so several dependencies in one
+    request share a single lookup, and served from the identity cache when
+    a recent snapshot exists. A cached user is detached; add it to the
+    session before relying on lazy-loaded relationships.
+    """
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is not None:
+        return current_user
 
-async def get_current_user(request: Request, db: AsyncSession) -> User:
-    """Get current authenticated user from request."""
-    user_id = request.state.user_id
+    user_id = getattr(request.state, "user_id", None)
 
     if not user_id:
         raise HTTPException(
@@ -81,20 +204,28 @@ async def get_current_user(request: Request, db: AsyncSession) -> User:
             detail="User not authenticated"
         )
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = user_identity_cache.get(user_id)
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+    if user is None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+
+        user_identity_cache.put(user)
 
+    request.state.current_user = user
     return user
 
 
 # Optional dependency for routes that can work without auth
-async def get_optional_user(request: Request, db: AsyncSession) -> User | None:
+async def get_optional_user(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> User | None:
     """Get current user if authenticated, otherwise return None."""
     try:
         return await get_current_user(request, db)
@@ -3,50 +3,63 @@ Request Logging Middleware
 
 Logs all requests and responses.
 """
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Log all requests with timing information."""
+class RequestLoggingMiddleware:
+    """ASGI middleware logging all requests with timing information."""
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request and log details."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
 
         # Log request
         logger.info(
-            f"Request: {request.method} {request.url.path}",
+            f"Request: {method} {path}",
             extra={
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": str(request.query_params),
-                "client_host": request.client.host if request.client else None,
+                "method": method,
+                "path": path,
+                "query_params": scope.get("query_string", b"").decode("latin-1"),
+                "client_host": client[0] if client else None,
             }
         )
 
-        # Process request
-        try:
-            response = await call_next(request)
-            duration = time.time() - start_time
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                duration = time.time() - start_time
 
-            # Log response
-            logger.info(
-                f"Response: {response.status_code} - {duration:.3f}s",
-                extra={
-                    "status_code": response.status_code,
-                    "duration_ms": round(duration * 1000, 2),
-                    "method": request.method,
-                    "path": request.url.path,
-                }
-            )
+                # Log response
+                logger.info(
+                    f"Response: {message['status']} - {duration:.3f}s",
+                    extra={
+                        "status_code": message["status"],
+                        "duration_ms": round(duration * 1000, 2),
+                        "method": method,
+                        "path": path,
+                    }
+                )
 
-            response.headers["X-Process-Time"] = f"{duration:.3f}"
-            return response
+                MutableHeaders(scope=message)["X-Process-Time"] = f"{duration:.3f}"
+            await send(message)
+
+        # Process request
+        try:
+            await self.app(scope, receive, send_with_timing)
 
         except Exception as e:
             duration = time.time() - start_time
@@ -55,8 +68,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 extra={
                     "error": str(e),
                     "duration_ms": round(duration * 1000, 2),
-                    "method": request.method,
-                    "path": request.url.path,
+                    "method": method,
+                    "path": path,
                 }
             )
             raise
@@ -1,21 +1,59 @@
 """
 Rate Limiting Middleware
 
-Simple in-memory rate limiting implementation.
+Token-bucket rate limiting with constant state per client. State lives in a
+pluggable backend; see rate_limit_backends for stores shared across workers.
 """
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
-from typing import Dict
-from datetime import datetime, timedelta
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
 import time
 
+# Upper bound on idle keys dropped per call, keeping each call O(1)
+EVICTIONS_PER_CALL = 8
 
-class RateLimiter:
-    """In-memory rate limiter."""
 
-    def __init__(self):
-        self.requests: Dict[str, list] = {}
+class RateLimitBackend(ABC):
+    """
+    Interface for rate limit state stores used by RateLimitMiddleware.
+
+    Every backend answers hit() with (allowed, remaining). In-process
+    stores also offer the synchronous check(), with the same result, and
+    is_allowed(), which returns only allowed.
+    """
+
+    @abstractmethod
+    async def hit(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int
+    ) -> Tuple[bool, int]:
+        """Record a request for key. Returns (allowed, remaining)."""
+
+    async def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class RateLimiter(RateLimitBackend):
+    """
+    In-memory token-bucket rate limiter (per process).
+
+    Each key holds (tokens, last_update). Buckets refill at
+    max_requests / window_seconds tokens per second up to max_requests, which
+    allows the same sustained rate as a sliding window of max_requests per
+    window_seconds. Keys are kept in least-recently-used order, and a bucket
+    untouched for a full window is full again, so it is evicted
+    incrementally from the front of the order.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
 
     def is_allowed(
         self,
@@ -24,55 +62,110 @@ class RateLimiter:
         window_seconds: int
     ) -> bool:
         """Check if request is allowed within rate limit."""
-        now = time.time()
-
-        # Clean old entries
-        if key in self.requests:
-            # Remove requests outside the time window
-            window_start = now - window_seconds
-            self.requests[key] = [
-                req_time for req_time in self.requests[key]
-                if req_time > window_start
-            ]
+        return self.check(key, max_requests, window_seconds)[0]
 
-        # Initialize if not exists
-        if key not in self.requests:
-            self.requests[key] = []
+    def check(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int
+    ) -> Tuple[bool, int]:
+        """Take a token for key. Returns (allowed, remaining)."""
+        now = self.clock()
+        self._evict_idle(now, window_seconds)
 
-        # Check if under limit
-        if len(self.requests[key]) < max_requests:
-            self.requests[key].append(now)
-            return True
+        tokens, updated = self.buckets.pop(key, (float(max_requests), now))
 
-        return False
+        # Refill for the time elapsed since the last request
+        rate = max_requests / window_seconds
+        tokens = min(float(max_requests), tokens + (now - updated) * rate)
 
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware."""
+        # Re-insert at the end so the dict stays ordered by last use
+        self.buckets[key] = (tokens, now)
+        return allowed, int(tokens)
 
-    def __init__(self, app, max_requests: int = 100, window_seconds: int = 60):
-        super().__init__(app)
-        self.rate_limiter = RateLimiter()
+    async def hit(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int
+    ) -> Tuple[bool, int]:
+        """Record a request for key. Returns (allowed, remaining)."""
+        return self.check(key, max_requests, window_seconds)
+
+    def remaining(self, key: str) -> int:
+        """Whole requests left in the key's bucket as of its last update."""
+        bucket = self.buckets.get(key)
+        return int(bucket[0]) if bucket else 0
+
+    def _evict_idle(self, now: float, window_seconds: int) -> None:
+        """Drop a bounded number of keys idle for at least a full window."""
+        for _ in range(EVICTIONS_PER_CALL):
+            if not self.buckets:
+                return
+            key, (_, updated) = next(iter(self.buckets.items()))
+            if now - updated < window_seconds:
+                return
+            del self.buckets[key]
+
+    def evict_idle(self, window_seconds: int) -> int:
+        """Drop every key idle for at least a full window. Returns count dropped."""
+        now = self.clock()
+        dropped = 0
+        while self.buckets:
+            key, (_, updated) = next(iter(self.buckets.items()))
+            if now - updated < window_seconds:
+                break
+            del self.buckets[key]
+            dropped += 1
+        return dropped
+
+
+class RateLimitMiddleware:
+    """ASGI rate limiting middleware."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_requests: int = 100,
+        window_seconds: int = 60,
+        limiter: Optional[RateLimitBackend] = None,
+    ):
+        self.app = app
+        self.rate_limiter = limiter or RateLimiter()
         self.max_requests = max_requests
         self.window_seconds = window_seconds
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request with rate limiting."""
-        # Skip rate limiting for health checks
-        if request.url.path in ["/api/v1/health", "/api/v1/health/ready"]:
-            return await call_next(request)
+        # Skip rate limiting for non-HTTP traffic and health checks
+        if scope["type"] != "http" or scope["path"] in [
+            "/api/v1/health",
+            "/api/v1/health/ready",
+        ]:
+            await self.app(scope, receive, send)
+            return
 
         # Get client identifier (IP or user ID)
-        if request.state.user_id:
+        user_id = scope.get("state", {}).get("user_id")
+        if user_id:
             # Use user ID if authenticated
-            key = f"user:{request.state.user_id}"
+            key = f"user:{user_id}"
         else:
             # Use IP address
-            key = f"ip:{request.client.host}"
+            client = scope.get("client")
+            key = f"ip:{client[0] if client else None}"
 
         # Check rate limit
-        if not self.rate_limiter.is_allowed(key, self.max_requests, self.window_seconds):
-            return JSONResponse(
+        allowed, remaining = await self.rate_limiter.hit(
+            key, self.max_requests, self.window_seconds
+        )
+        if not allowed:
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
                     "error": {
@@ -88,12 +181,15 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     "X-RateLimit-Reset": str(int(time.time()) + self.window_seconds),
                 }
             )
-
-        # Add rate limit headers
-        response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(self.max_requests)
-        response.headers["X-RateLimit-Remaining"] = str(
-            max(0, self.max_requests - len(self.rate_limiter.requests.get(key, [])))
-        )
-
-        return response
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            # Add rate limit headers
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(self.max_requests)
+                headers["X-RateLimit-Remaining"] = str(remaining)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
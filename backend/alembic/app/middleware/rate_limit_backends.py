@@ -0,0 +1,207 @@
+"""
+Rate Limit Backends
+
+Stores that let several worker processes enforce one shared limit:
+
+- SQLiteRateLimiter: token buckets in a WAL-mode SQLite file, for workers on
+  one host. One UPSERT per request, no network hop. It runs on the event
+  loop, so it waits only briefly for another process's write lock and
+  lets the request through if the file stays locked.
+- RedisRateLimiter: sliding-window counters in any Redis-protocol server,
+  for workers spread across hosts.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional, Tuple
+from app.middleware.rate_limit import RateLimitBackend, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Delete idle SQLite buckets once every this many requests
+SQLITE_SWEEP_INTERVAL = 1000
+
+# Seconds a request waits for another process's write lock; the wait
+# blocks the event loop, so it is kept far below a request's latency
+SQLITE_BUSY_TIMEOUT = 0.05
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    allowed INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+
+# Refill and take a token in a single atomic statement. `allowed` records
+# whether this request got a token so RETURNING can report it.
+SQLITE_HIT = """
+INSERT INTO rate_limit_buckets (key, tokens, updated, allowed)
+VALUES (:key, :capacity - 1, :now, 1)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = min(:capacity, tokens + max(0, :now - updated) * :rate)
+        - (min(:capacity, tokens + max(0, :now - updated) * :rate) >= 1),
+    allowed = min(:capacity, tokens + max(0, :now - updated) * :rate) >= 1,
+    updated = max(updated, :now)
+RETURNING allowed, tokens
+"""
+
+
+class SQLiteRateLimiter(RateLimitBackend):
+    """Token-bucket rate limiter stored in a SQLite file shared by processes."""
+
+    def __init__(
+        self,
+        path: str,
+        clock: Callable[[], float] = time.time,
+        busy_timeout: float = SQLITE_BUSY_TIMEOUT,
+    ):
+        self.path = path
+        self.clock = clock
+        self.calls = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Counters are cheap to lose on power failure; skip fsync per commit
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute(SQLITE_SCHEMA)
+
+    def is_allowed(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int
+    ) -> bool:
+        """Check if request is allowed within rate limit."""
+        return self.check(key, max_requests, window_seconds)[0]
+
+    def check(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int
+    ) -> Tuple[bool, int]:
+        """Take a token for key. Returns (allowed, remaining)."""
+        now = self.clock()
+        params = {
+            "key": key,
+            "capacity": float(max_requests),
+            "rate": max_requests / window_seconds,
+            "now": now,
+        }
+
+        with self.lock:
+            allowed, tokens = self.conn.execute(SQLITE_HIT, params).fetchone()
+
+            self.calls += 1
+            if self.calls % SQLITE_SWEEP_INTERVAL == 0:
+                # A bucket idle for a full window is full; dropping it is lossless
+                self.conn.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated < ?",
+                    (now - window_seconds,),
+                )
+
+        return bool(allowed), int(tokens)
+
+    async def hit(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int
+    ) -> Tuple[bool, int]:
+        """
+        Record a request for key. Returns (allowed, remaining).
+
+        Fails open: if the file stays locked past the busy timeout the
+        request is allowed rather than stalling every request behind it.
+        """
+        # A local WAL upsert takes microseconds; handing it to a thread
+        # would cost more than running it inline.
+        try:
+            return self.check(key, max_requests, window_seconds)
+        except sqlite3.OperationalError as exc:
+            self.failures += 1
+            logger.warning(f"SQLite rate limit store unavailable, allowing request: {exc}")
+            return True, max_requests - 1
+
+    async def close(self) -> None:
+        """Close the SQLite connection."""
+        self.conn.close()
+
+
+class RedisRateLimiter(RateLimitBackend):
+    """
+    Sliding-window-counter rate limiter on a Redis-protocol server.
+
+    Each key has one counter per window. The previous window's count,
+    weighted by how much of it still overlaps the sliding window, is added
+    to the current count. Counters expire on their own after two windows.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "ratelimit",
+        clock: Callable[[], float] = time.time,
+    ):
+        # Imported lazily so the dependency is only needed when configured
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.prefix = prefix
+        self.clock = clock
+
+    async def hit(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int
+    ) -> Tuple[bool, int]:
+        """Record a request for key. Returns (allowed, remaining)."""
+        now = self.clock()
+        window = int(now // window_seconds)
+        current_key = f"{self.prefix}:{key}:{window}"
+        previous_key = f"{self.prefix}:{key}:{window - 1}"
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, window_seconds * 2)
+            pipe.get(previous_key)
+            current, _, previous = await pipe.execute()
+
+        overlap = 1.0 - (now % window_seconds) / window_seconds
+        estimated = int(previous or 0) * overlap + current
+
+        if estimated > max_requests:
+            # Denied requests should not eat into the next window's budget
+            await self.redis.decr(current_key)
+            return False, 0
+
+        return True, int(max_requests - estimated)
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        await self.redis.aclose()
+
+
+def create_rate_limiter(
+    backend: str = "memory",
+    sqlite_path: Optional[str] = None,
+    redis_url: Optional[str] = None,
+) -> RateLimitBackend:
+    """Build the configured rate limit backend."""
+    if backend == "memory":
+        return RateLimiter()
+    if backend == "sqlite":
+        return SQLiteRateLimiter(sqlite_path)
+    if backend == "redis":
+        return RedisRateLimiter(redis_url)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
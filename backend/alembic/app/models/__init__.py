@@ -1,6 +1,7 @@
 from app.models.user import User
 from app.models.project import Project, ProjectStatus
 from app.models.ai_activity import AIActivity, AITool, ActivityCategory
+from app.models.ai_activity_rollup import AIActivityDailyRollup
 from app.models.agent import AgentExecution, AgentStatus
 from app.models.pipeline import PipelineExecution, PipelineStatus
 from app.models.mcp import MCPServer, MCPServerType, MCPServerStatus
@@ -12,6 +13,7 @@ __all__ = [
     "AIActivity",
     "AITool",
     "ActivityCategory",
+    "AIActivityDailyRollup",
     "AgentExecution",
     "AgentStatus",
     "PipelineExecution",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -30,6 +30,36 @@ class AgentExecution(Base):
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)
+    batch_id = Column(UUID(as_uuid=True), nullable=True)
+    # Digest of project_id, agent_type and normalized input_data, for deduplication
+    input_hash = Column(String(64), nullable=True)
+
+    # Job queue bookkeeping for out-of-process workers
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relationships
     project = relationship("Project", back_populates="agent_executions")
+
+
+# Workers claim the oldest claimable execution by status
+Index("ix_agent_executions_status_started_at", AgentExecution.status, AgentExecution.started_at)
+
+# Batch status counts a batch's executions
+Index("ix_agent_executions_batch_id", AgentExecution.batch_id)
+
+# Identical requests find a running or recent execution by digest
+Index("ix_agent_executions_input_hash_started_at", AgentExecution.input_hash, AgentExecution.started_at)
+
+# At most one active single execution per input, so concurrent identical
+# requests cannot both miss the lookup and start two (statuses are stored by name)
+ACTIVE_SINGLE_EXECUTION = text("batch_id IS NULL AND status IN ('PENDING', 'RUNNING')")
+Index(
+    "uq_agent_executions_active_input",
+    AgentExecution.project_id,
+    AgentExecution.input_hash,
+    unique=True,
+    postgresql_where=ACTIVE_SINGLE_EXECUTION,
+    sqlite_where=ACTIVE_SINGLE_EXECUTION,
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -35,10 +35,17 @@ class AIActivity(Base):
     prompt = Column(Text, nullable=False)
     response = Column(Text)
     code_changes = Column(ARRAY(String))
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     category = Column(SQLEnum(ActivityCategory), nullable=False)
 
     # Relationships
     project = relationship("Project", back_populates="ai_activities")
     user = relationship("User", back_populates="ai_activities")
+
+
+# Composite indexes for the listing and analytics query shapes
+Index("ix_ai_activities_project_id_timestamp", AIActivity.project_id, AIActivity.timestamp.desc())
+Index("ix_ai_activities_timestamp", AIActivity.timestamp)
+Index("ix_ai_activities_tool_used_timestamp", AIActivity.tool_used, AIActivity.timestamp)
+Index("ix_ai_activities_category_timestamp", AIActivity.category, AIActivity.timestamp)
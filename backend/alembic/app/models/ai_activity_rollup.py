@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Date, Integer, ForeignKey, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+from app.models.ai_activity import AITool, ActivityCategory
+
+
+class AIActivityDailyRollup(Base):
+    """Pre-aggregated AI activity counts per project, day, tool and category."""
+
+    __tablename__ = "ai_activity_daily_rollup"
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    tool_used = Column(SQLEnum(AITool), primary_key=True)
+    category = Column(SQLEnum(ActivityCategory), primary_key=True)
+    activity_count = Column(Integer, nullable=False, default=0)
+    lines_of_code_estimate = Column(Integer, nullable=False, default=0)
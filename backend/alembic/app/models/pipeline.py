@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index, Enum as SQLEnum, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -26,10 +26,13 @@ class PipelineExecution(Base):
     commit_sha = Column(String, nullable=False)
     branch = Column(String, nullable=False)
     triggered_by = Column(String, nullable=False)
-    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     test_results = Column(JSON)
     deployment_url = Column(String, nullable=True)
 
     # Relationships
     project = relationship("Project", back_populates="pipeline_executions")
+
+
+Index("ix_pipeline_executions_project_id_started_at", PipelineExecution.project_id, PipelineExecution.started_at)
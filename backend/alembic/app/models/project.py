@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -24,8 +24,8 @@ class Project(Base):
     repository_url = Column(String, nullable=False)
     tech_stack = Column(ARRAY(String))
     status = Column(SQLEnum(ProjectStatus), default=ProjectStatus.ACTIVE)
-    created_by = Column(UUID(as_uuid=True), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
@@ -9,7 +9,7 @@ from app.schemas.user import (
 )
 from app.schemas.project import ProjectCreate, ProjectUpdate, Project
 from app.schemas.ai_activity import AIActivityCreate, AIActivity
-from app.schemas.agent import AgentType, AgentExecutionCreate, AgentExecution
+from app.schemas.agent import AgentType, AgentExecutionCreate, AgentExecution, AgentBatchCreate, AgentBatch
 from app.schemas.pipeline import PipelineTrigger, PipelineExecution
 from app.schemas.mcp import MCPServerCreate, MCPServer, MCPToolExecute
 from app.schemas.analytics import UsageAnalytics, ProductivityMetrics
@@ -37,6 +37,8 @@ __all__ = [
     "AgentType",
     "AgentExecutionCreate",
     "AgentExecution",
+    "AgentBatchCreate",
+    "AgentBatch",
     "PipelineTrigger",
     "PipelineExecution",
     "MCPServerCreate",
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from uuid import UUID
-from typing import List, Any
+from typing import Dict, List, Any
 from app.models.agent import AgentStatus
 
 
@@ -22,6 +22,23 @@ class AgentExecutionCreate(BaseModel):
     input_data: dict[str, Any] | None = None
 
 
+class AgentBatchCreate(BaseModel):
+    """Batch of executions of one agent, one per input."""
+    project_id: UUID
+    agent_type: str = Field(..., description="Type of agent to execute")
+    task_description: str = Field(..., description="Description of the task to perform")
+    inputs: List[dict[str, Any]] = Field(..., min_length=1, description="input_data for each execution")
+    parallelism: int | None = Field(None, ge=1, description="Executions of this batch run at once")
+
+
+class AgentBatch(BaseModel):
+    """Aggregate status of a batch of executions."""
+    id: UUID
+    total: int
+    counts: Dict[AgentStatus, int]
+    done: bool
+
+
 class AgentExecution(BaseModel):
     """Agent execution response schema."""
     id: UUID
@@ -34,5 +51,6 @@ class AgentExecution(BaseModel):
     started_at: datetime
     completed_at: datetime | None = None
     error_message: str | None = None
+    batch_id: UUID | None = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -6,10 +6,13 @@ T = TypeVar("T")
 
 class PaginationMeta(BaseModel):
     """Pagination metadata."""
-    page: int
+    # None on cursor pages, which are not counted; the first page has the total
+    page: Optional[int] = None
     per_page: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    total_is_exact: Optional[bool] = True
+    next_cursor: Optional[str] = None
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
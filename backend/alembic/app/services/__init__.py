@@ -2,10 +2,15 @@ from app.services.base import BaseService
 from app.services.user_service import UserService
 from app.services.project_service import ProjectService
 from app.services.ai_activity_service import AIActivityService
+from app.services.activity_rollup_service import ActivityRollupService
+from app.services.identity_cache import UserIdentityCache, user_identity_cache
 
 __all__ = [
     "BaseService",
     "UserService",
     "ProjectService",
     "AIActivityService",
+    "ActivityRollupService",
+    "UserIdentityCache",
+    "user_identity_cache",
 ]
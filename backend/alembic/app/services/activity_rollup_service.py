@@ -0,0 +1,197 @@
+"""
+Activity Rollup Service
+
+Maintains the ai_activity_daily_rollup table and serves analytics from it,
+so dashboards read one row per (project, day, tool, category) instead of
+scanning raw activities.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, cast, Date
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.ai_activity import AIActivity, ActivityCategory
+from app.models.ai_activity_rollup import AIActivityDailyRollup
+from app.services.ai_activity_service import summarize_usage
+
+# Assume average of 50 lines per code change
+LOC_PER_CODE_CHANGE = 50
+
+ROLLUP_KEY = ["project_id", "day", "tool_used", "category"]
+
+
+class ActivityRollupService:
+    """Service for the pre-aggregated daily AI activity rollup."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _insert(self):
+        """Dialect-specific INSERT supporting ON CONFLICT."""
+        if self.db.get_bind().dialect.name == "sqlite":
+            return sqlite.insert(AIActivityDailyRollup)
+        return postgresql.insert(AIActivityDailyRollup)
+
+    async def record_activity(self, activity: AIActivity) -> None:
+        """Add a newly logged activity to its rollup bucket (no commit)."""
+        timestamp = activity.timestamp or datetime.utcnow()
+
+        stmt = self._insert().values(
+            project_id=activity.project_id,
+            day=timestamp.date(),
+            tool_used=activity.tool_used,
+            category=activity.category,
+            activity_count=1,
+            lines_of_code_estimate=len(activity.code_changes or []) * LOC_PER_CODE_CHANGE,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=ROLLUP_KEY,
+            set_={
+                "activity_count": AIActivityDailyRollup.activity_count
+                + stmt.excluded.activity_count,
+                "lines_of_code_estimate": AIActivityDailyRollup.lines_of_code_estimate
+                + stmt.excluded.lines_of_code_estimate,
+            },
+        )
+        await self.db.execute(stmt)
+
+    async def backfill(
+        self,
+        project_id: Optional[str] = None,
+        since: Optional[date] = None
+    ) -> int:
+        """Rebuild rollup rows from raw activities. Returns rows written."""
+        if self.db.get_bind().dialect.name == "sqlite":
+            # SQLite has no DATE type or arrays; code changes are stored as JSON
+            day = func.date(AIActivity.timestamp)
+            change_count = func.json_array_length(AIActivity.code_changes)
+        else:
+            day = cast(AIActivity.timestamp, Date)
+            change_count = func.array_length(AIActivity.code_changes, 1)
+
+        clear = delete(AIActivityDailyRollup)
+        source = select(
+            AIActivity.project_id,
+            day,
+            AIActivity.tool_used,
+            AIActivity.category,
+            func.count(),
+            func.coalesce(
+                func.sum(func.coalesce(change_count, 0)),
+                0,
+            ) * LOC_PER_CODE_CHANGE,
+        )
+
+        if project_id:
+            clear = clear.where(AIActivityDailyRollup.project_id == project_id)
+            source = source.where(AIActivity.project_id == project_id)
+        if since:
+            clear = clear.where(AIActivityDailyRollup.day >= since)
+            source = source.where(day >= since)
+
+        source = source.group_by(
+            AIActivity.project_id, day, AIActivity.tool_used, AIActivity.category
+        )
+
+        await self.db.execute(clear)
+        result = await self.db.execute(
+            insert(AIActivityDailyRollup).from_select(
+                ROLLUP_KEY + ["activity_count", "lines_of_code_estimate"],
+                source,
+            )
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    def _filtered(
+        self,
+        query,
+        project_id: Optional[str] = None,
+        start_day: Optional[date] = None,
+        end_day: Optional[date] = None
+    ):
+        """Apply the common project and day-range filters."""
+        if project_id:
+            query = query.where(AIActivityDailyRollup.project_id == project_id)
+        if start_day:
+            query = query.where(AIActivityDailyRollup.day >= start_day)
+        if end_day:
+            query = query.where(AIActivityDailyRollup.day <= end_day)
+        return query
+
+    async def get_tool_category_counts(
+        self,
+        project_id: Optional[str] = None,
+        start_day: Optional[date] = None,
+        end_day: Optional[date] = None
+    ) -> List[tuple]:
+        """(tool, category, count) rows for a day range."""
+        query = self._filtered(
+            select(
+                AIActivityDailyRollup.tool_used,
+                AIActivityDailyRollup.category,
+                func.sum(AIActivityDailyRollup.activity_count),
+            ),
+            project_id, start_day, end_day,
+        ).group_by(AIActivityDailyRollup.tool_used, AIActivityDailyRollup.category)
+
+        result = await self.db.execute(query)
+        return list(result.all())
+
+    async def get_usage_statistics(
+        self,
+        project_id: Optional[str] = None,
+        start_day: Optional[date] = None,
+        end_day: Optional[date] = None
+    ) -> dict:
+        """Usage statistics shaped like AIActivityService.get_statistics."""
+        rows = await self.get_tool_category_counts(project_id, start_day, end_day)
+        return summarize_usage(rows)
+
+    async def get_totals(self, project_id: Optional[str] = None) -> dict:
+        """Total activities, estimated LOC and test activities for a project."""
+        rollup = AIActivityDailyRollup
+        query = self._filtered(
+            select(
+                func.coalesce(func.sum(rollup.activity_count), 0),
+                func.coalesce(func.sum(rollup.lines_of_code_estimate), 0),
+                func.coalesce(
+                    func.sum(rollup.activity_count).filter(
+                        rollup.category == ActivityCategory.TEST
+                    ),
+                    0,
+                ),
+            ),
+            project_id,
+        )
+
+        result = await self.db.execute(query)
+        total, loc, tests = result.one()
+        return {
+            "total_activities": int(total),
+            "lines_of_code": int(loc),
+            "test_activities": int(tests),
+        }
+
+    async def get_daily_rows(
+        self,
+        project_id: Optional[str] = None,
+        start_day: Optional[date] = None
+    ) -> List[tuple]:
+        """(day, tool, category, count) rows, newest day first."""
+        query = self._filtered(
+            select(
+                AIActivityDailyRollup.day,
+                AIActivityDailyRollup.tool_used,
+                AIActivityDailyRollup.category,
+                func.sum(AIActivityDailyRollup.activity_count),
+            ),
+            project_id, start_day,
+        ).group_by(
+            AIActivityDailyRollup.day,
+            AIActivityDailyRollup.tool_used,
+            AIActivityDailyRollup.category,
+        ).order_by(AIActivityDailyRollup.day.desc())
+
+        result = await self.db.execute(query)
+        return list(result.all())
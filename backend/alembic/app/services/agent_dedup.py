@@ -0,0 +1,76 @@
+"""
+Agent Execution Deduplication
+
+Identical agent requests (same project, same agent type, same input once
+normalized) share one execution: a request arriving while an identical execution is
+pending or running attaches to it, and one arriving shortly after it
+completed gets its result without another model call.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from uuid import UUID
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.agent import AgentExecution, AgentStatus
+
+
+def _normalize(value: Any) -> Any:
+    """Drop None-valued keys and unify line endings, recursively."""
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, str):
+        return value.replace("\r\n", "\n")
+    return value
+
+
+def input_fingerprint(
+    project_id: UUID,
+    agent_type: str,
+    input_data: Optional[Dict[str, Any]],
+) -> str:
+    """Stable digest of a project, an agent type and its normalized input."""
+    raw = json.dumps(
+        {"project_id": str(project_id), "agent_type": agent_type, "input_data": _normalize(input_data or {})},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def find_duplicate(
+    db: AsyncSession,
+    project_id: UUID,
+    input_hash: str,
+    completed_within_seconds: float,
+) -> Optional[AgentExecution]:
+    """
+    Most recent execution of the project with this digest that is still
+    pending or running, or that completed within the reuse window.
+    """
+    reusable = AgentExecution.status.in_([AgentStatus.PENDING, AgentStatus.RUNNING])
+    if completed_within_seconds > 0:
+        cutoff = datetime.utcnow() - timedelta(seconds=completed_within_seconds)
+        reusable = or_(
+            reusable,
+            and_(
+                AgentExecution.status == AgentStatus.COMPLETED,
+                AgentExecution.completed_at >= cutoff,
+            ),
+        )
+
+    result = await db.execute(
+        select(AgentExecution)
+        .where(
+            AgentExecution.project_id == project_id,
+            AgentExecution.input_hash == input_hash,
+            reusable,
+        )
+        .order_by(AgentExecution.started_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
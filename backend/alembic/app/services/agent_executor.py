@@ -1,11 +1,17 @@
 """
 Real Agent Executor - Executes AI agents with actual AI API calls
 """
+import asyncio
 import os
-from typing import Dict, Any
+from contextlib import aclosing
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.ai_client import AIClient
+from app.services.ai_client import get_ai_client
+from app.services.code_chunker import CodeChunk, module_imports, split_python
 from app.services.github_service import GitHubService
+from app.services.activity_rollup_service import ActivityRollupService
+from app.services.execution_stream import ExecutionStream, execution_streams
 from app.models.agent import AgentExecution, AgentStatus
 from app.models.ai_activity import AIActivity, AITool, ActivityCategory
 import uuid
@@ -17,7 +23,82 @@ class AgentExecutor:
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.ai_client = AIClient()
+        self.ai_client = get_ai_client()
+        # Set while run_agent is executing; receives model output as it streams
+        self.stream: Optional[ExecutionStream] = None
+
+    async def _generate(self, prompt: str, **kwargs) -> str:
+        """Call the model, publishing output to the execution stream if any."""
+        if self.stream is None:
+            return await self.ai_client.call_model(prompt=prompt, **kwargs)
+
+        chunks = []
+        async with aclosing(self.ai_client.stream_model(prompt, **kwargs)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                self.stream.publish(chunk)
+        return "".join(chunks)
+
+    async def _generate_chunked(
+        self,
+        code_content: str,
+        build_prompt: Callable[[str, str], str],
+        **kwargs
+    ) -> List[Tuple[CodeChunk, str]]:
+        """
+        Run build_prompt(code, part) over each chunk of a Python file.
+
+        Small files get one prompt with an empty part note. Large files are
+        split along top-level definitions and the chunk prompts run
+        concurrently, as many at once as the AI client's per-model limit
+        allows; if one fails the others are cancelled and its error is
+        raised. Returns (chunk, response) pairs in source order.
+        """
+        chunks = split_python(code_content)
+        if len(chunks) == 1:
+            return [(chunks[0], await self._generate(prompt=build_prompt(code_content, ""), **kwargs))]
+
+        imports = module_imports(code_content)
+
+        async def run(index: int, chunk: CodeChunk) -> Tuple[CodeChunk, str]:
+            part = (
+                f"Part {index + 1} of {len(chunks)}: lines {chunk.start_line}-{chunk.end_line} "
+                f"of the file. Refer to lines by their number in the whole file.\n"
+            )
+            if imports and chunk.start_line > 1:
+                part += f"The module's imports, for context:\n```python\n{imports}\n```\n"
+            response = await self.ai_client.call_model(prompt=build_prompt(chunk.text, part), **kwargs)
+            if self.stream is not None:
+                # Chunks finish out of order; publish each as a whole section
+                self.stream.publish(self._chunk_heading(chunk) + response + "\n\n")
+            return chunk, response
+
+        # A failed chunk cancels the rest instead of leaving them running
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(run(i, chunk)) for i, chunk in enumerate(chunks)]
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0]
+        return [task.result() for task in tasks]
+
+    @staticmethod
+    def _chunk_heading(chunk: CodeChunk) -> str:
+        names = f" ({', '.join(chunk.names)})" if chunk.names else ""
+        return f"### Lines {chunk.start_line}-{chunk.end_line}{names}\n\n"
+
+    def _merge_chunks(self, parts: List[Tuple[CodeChunk, str]]) -> str:
+        """One document from per-chunk responses, in source order."""
+        if len(parts) == 1:
+            return parts[0][1]
+        return "\n\n".join(self._chunk_heading(chunk) + response for chunk, response in parts)
+
+    @staticmethod
+    def _chunk_info(chunk: CodeChunk) -> Dict[str, Any]:
+        return {
+            "start_line": chunk.start_line,
+            "end_line": chunk.end_line,
+            "definitions": chunk.names,
+        }
 
     async def execute_code_scaffolder(
         self,
@@ -41,7 +122,7 @@ Please provide:
 
 Format as JSON with keys: structure, files, config, instructions."""
 
-        response = await self.ai_client.call_model(
+        response = await self._generate(
             prompt=prompt,
             provider="anthropic",
             model="claude-3-sonnet-20240229",
@@ -60,14 +141,15 @@ Format as JSON with keys: structure, files, config, instructions."""
         code_content: str,
         file_path: str
     ) -> Dict[str, Any]:
-        """Execute Code Reviewer agent."""
-        prompt = f"""Review this code for bugs, security issues, and best practices:
+        """Execute Code Reviewer agent, one prompt per chunk of a large file."""
+        def build_prompt(code: str, part: str) -> str:
+            return f"""Review this code for bugs, security issues, and best practices:
 
 File: {file_path}
-
+{part}
 Code:
 ```python
-{code_content}
+{code}
 ```
 
 Please analyze:
@@ -79,17 +161,33 @@ Please analyze:
 
 Provide specific line references and code examples."""
 
-        response = await self.ai_client.call_model(
-            prompt=prompt,
+        parts = await self._generate_chunked(
+            code_content,
+            build_prompt,
             provider="anthropic",
             model="claude-3-sonnet-20240229",
-            max_tokens=2000
+            max_tokens=2000,
+            # Same code and prompt gives an equally good review; reuse it,
+            # so only edited chunks of a file are reviewed again
+            force_cache=True
         )
+        response = self._merge_chunks(parts)
+
+        structured_output = self._parse_review_output(response)
+        if len(parts) > 1:
+            structured_output["chunks"] = []
+            for chunk, part in parts:
+                review = self._parse_review_output(part)
+                structured_output["chunks"].append({
+                    **self._chunk_info(chunk),
+                    "issues_found": review["issues_found"],
+                    "suggestions": review["suggestions"],
+                })
 
         return {
             "agent_type": "code-reviewer",
             "result": response,
-            "structured_output": self._parse_review_output(response)
+            "structured_output": structured_output
         }
 
     async def execute_test_generator(
@@ -98,14 +196,15 @@ Provide specific line references and code examples."""
         code_content: str,
         file_path: str
     ) -> Dict[str, Any]:
-        """Execute Test Generator agent."""
-        prompt = f"""Generate comprehensive tests for this code:
+        """Execute Test Generator agent, one prompt per chunk of a large file."""
+        def build_prompt(code: str, part: str) -> str:
+            return f"""Generate comprehensive tests for this code:
 
 File: {file_path}
-
+{part}
 Code:
 ```python
-{code_content}
+{code}
 ```
 
 Generate:
@@ -117,17 +216,26 @@ Generate:
 
 Use pytest framework. Include proper assertions and comments."""
 
-        response = await self.ai_client.call_model(
-            prompt=prompt,
+        parts = await self._generate_chunked(
+            code_content,
+            build_prompt,
             provider="anthropic",
             model="claude-3-sonnet-20240229",
             max_tokens=3000
         )
+        response = self._merge_chunks(parts)
+
+        structured_output = self._parse_test_output(response)
+        if len(parts) > 1:
+            structured_output["chunks"] = [
+                {**self._chunk_info(chunk), "test_count": self._parse_test_output(part)["test_count"]}
+                for chunk, part in parts
+            ]
 
         return {
             "agent_type": "test-generator",
             "result": response,
-            "structured_output": self._parse_test_output(response)
+            "structured_output": structured_output
         }
 
     async def execute_doc_generator(
@@ -158,11 +266,13 @@ Provide:
 
 Format in Markdown."""
 
-        response = await self.ai_client.call_model(
+        response = await self._generate(
             prompt=prompt,
             provider="anthropic",
             model="claude-3-sonnet-20240229",
-            max_tokens=2000
+            max_tokens=2000,
+            # Unchanged code documents the same way; reuse earlier output
+            force_cache=True
         )
 
         return {
@@ -198,7 +308,7 @@ Provide:
 3. Suggestions for next steps
 4. Code quality assessment"""
 
-        response = await self.ai_client.call_model(
+        response = await self._generate(
             prompt=prompt,
             provider="anthropic",
             max_tokens=2000
@@ -218,20 +328,39 @@ Provide:
         agent_type: str,
         project_id: str,
         task_description: str,
-        input_data: Dict[str, Any]
+        input_data: Dict[str, Any],
+        execution_id: Optional[uuid.UUID] = None
     ) -> AgentExecution:
-        """Main method to execute any agent."""
-        # Create execution record
-        execution = AgentExecution(
-            id=uuid.uuid4(),
-            project_id=project_id,
-            agent_type=agent_type,
-            task_description=task_description,
-            status=AgentStatus.RUNNING,
-            input_data=input_data,
-        )
-        self.db.add(execution)
-        await self.db.commit()
+        """
+        Main method to execute any agent.
+
+        Runs the existing record execution_id if given, otherwise creates
+        one. Model output is published to the execution stream for the
+        record while it is generated. The outcome (status, output and the
+        AI activity log) is written in a single transaction.
+        """
+        # Take over the record created when the execution was queued
+        execution = None
+        if execution_id is not None:
+            execution = await self.db.get(AgentExecution, execution_id)
+
+        if execution is None:
+            execution = AgentExecution(
+                id=uuid.uuid4(),
+                project_id=project_id,
+                agent_type=agent_type,
+                task_description=task_description,
+                status=AgentStatus.RUNNING,
+                input_data=input_data,
+            )
+            self.db.add(execution)
+            await self.db.commit()
+        elif execution.status != AgentStatus.RUNNING:
+            # Queue workers claim rows as running already; skip the extra write
+            execution.status = AgentStatus.RUNNING
+            await self.db.commit()
+
+        self.stream = execution_streams.open(execution.id)
 
         try:
             # Route to appropriate agent
@@ -268,19 +397,21 @@ Provide:
             execution.output_data = result
             execution.completed_at = datetime.utcnow()
 
-            # Log AI activity
+            # Log AI activity in the same transaction as the result
             await self._log_agent_activity(execution, result)
 
             await self.db.commit()
-            await self.db.refresh(execution)
+            self.stream.close()
 
             return execution
 
         except Exception as e:
-            # Mark as failed
+            # Drop anything half-written (e.g. the activity log) before recording the failure
+            await self.db.rollback()
             execution.status = AgentStatus.FAILED
             execution.error_message = str(e)
             execution.completed_at = datetime.utcnow()
+            self.stream.close(error=str(e))
             await self.db.commit()
             raise
 
@@ -289,7 +420,7 @@ Provide:
         execution: AgentExecution,
         result: Dict[str, Any]
     ):
-        """Log agent execution as AI activity."""
+        """Log agent execution as AI activity (no commit)."""
         activity = AIActivity(
             id=uuid.uuid4(),
             project_id=execution.project_id,
@@ -302,7 +433,7 @@ Provide:
             category=ActivityCategory.FEATURE,
         )
         self.db.add(activity)
-        await self.db.commit()
+        await ActivityRollupService(self.db).record_activity(activity)
 
     def _parse_code_scaffolder_output(self, output: str) -> Dict:
         """Parse code scaffolder output."""
@@ -0,0 +1,202 @@
+"""
+Agent Worker Pool
+
+Runs agent executions on a fixed number of async workers on the
+application's event loop. The queue is bounded so a burst of requests is
+refused with 429 instead of piling up, shutdown lets queued work drain,
+and executions left pending or running by a previous process are picked
+up again on startup.
+
+Recovery assumes this is the only API process: with several, it would
+requeue executions the others are still running, so it is skipped when
+WEB_CONCURRENCY is above 1. Use the database queue to run several.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.agent import AgentExecution, AgentStatus
+from app.services.agent_executor import AgentExecutor
+
+logger = logging.getLogger(__name__)
+
+
+async def run_execution(execution_id: UUID, session_factory=AsyncSessionLocal) -> None:
+    """Run one stored execution in its own session, unless already finished."""
+    async with session_factory() as db:
+        execution = await db.get(AgentExecution, execution_id)
+        if execution is None or execution.status in (AgentStatus.COMPLETED, AgentStatus.FAILED):
+            return
+
+        await AgentExecutor(db).run_agent(
+            agent_type=execution.agent_type,
+            project_id=str(execution.project_id),
+            task_description=execution.task_description,
+            input_data=execution.input_data or {},
+            execution_id=execution.id,
+        )
+
+
+class AgentQueueFull(Exception):
+    """Raised when the agent queue cannot take another execution."""
+
+
+class AgentWorkerPool:
+    """Bounded queue of execution ids served by N async workers."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queue: int = 100,
+        drain_timeout: float = 30.0,
+        session_factory=AsyncSessionLocal,
+        runner: Optional[Callable[[UUID], Awaitable[None]]] = None,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.drain_timeout = drain_timeout
+        self.session_factory = session_factory
+        self.runner = runner or self.run_execution
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks: List[asyncio.Task] = []
+        self.accepting = False
+        # Batch executions admitted but not yet queued; they count against max_queue
+        self.reserved = 0
+        # Called when a batch execution finishes, freeing a slot of its batch
+        self.on_done: Dict[UUID, Callable[[], None]] = {}
+
+    async def start(self, recover: bool = True) -> None:
+        """Start the workers, then requeue unfinished executions."""
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.accepting = True
+        self.tasks = [
+            asyncio.create_task(self._worker(), name=f"agent-worker-{i}")
+            for i in range(self.workers)
+        ]
+        if recover:
+            await self.recover()
+
+    def free(self) -> int:
+        """Executions that can still be submitted."""
+        return self.max_queue - self.queue.qsize() - self.reserved
+
+    def full(self, count: int = 1) -> bool:
+        """True if submitting `count` more executions would be refused."""
+        return not self.accepting or self.free() < count
+
+    def submit(self, execution_id: UUID) -> None:
+        """Queue an execution. Raises AgentQueueFull if there is no room."""
+        if not self.accepting:
+            raise AgentQueueFull("Agent workers are shutting down")
+        if self.free() < 1:
+            raise AgentQueueFull(f"Agent queue is full ({self.max_queue} waiting)")
+        try:
+            self.queue.put_nowait(execution_id)
+        except asyncio.QueueFull:
+            raise AgentQueueFull(f"Agent queue is full ({self.max_queue} waiting)")
+
+    def submit_batch(self, execution_ids: List[UUID], parallelism: int) -> None:
+        """
+        Queue a batch, keeping at most `parallelism` of it queued or running.
+
+        The whole batch is admitted up front against the queue's capacity,
+        so it is fed in without ever waiting for room. Raises AgentQueueFull
+        if the pool is not accepting work or the batch does not fit.
+        """
+        if not self.accepting:
+            raise AgentQueueFull("Agent workers are shutting down")
+        if len(execution_ids) > self.free():
+            raise AgentQueueFull(
+                f"Agent queue has room for {max(self.free(), 0)} executions, not {len(execution_ids)}"
+            )
+        self.reserved += len(execution_ids)
+        self.tasks = [task for task in self.tasks if not task.done()]
+        self.tasks.append(asyncio.create_task(self._feed_batch(execution_ids, parallelism)))
+
+    async def _feed_batch(self, execution_ids: List[UUID], parallelism: int) -> None:
+        slots = asyncio.Semaphore(parallelism)
+        unfed = len(execution_ids)
+        try:
+            for execution_id in execution_ids:
+                await slots.acquire()
+                if not self.accepting:
+                    # The rest stay pending and are recovered on restart
+                    return
+                self.on_done[execution_id] = slots.release
+                # The reservation becomes the queue entry
+                unfed -= 1
+                self.reserved -= 1
+                await self.queue.put(execution_id)
+        finally:
+            self.reserved -= unfed
+
+    async def recover(self) -> int:
+        """Requeue executions left pending or running. Returns how many."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(AgentExecution.id)
+                .where(AgentExecution.status.in_([AgentStatus.PENDING, AgentStatus.RUNNING]))
+                .order_by(AgentExecution.started_at)
+            )
+            execution_ids = list(result.scalars().all())
+
+        if execution_ids:
+            logger.info(f"Recovering {len(execution_ids)} unfinished agent executions")
+            # Feed them in as room frees up rather than blocking startup
+            self.tasks.append(asyncio.create_task(self._requeue(execution_ids)))
+        return len(execution_ids)
+
+    async def _requeue(self, execution_ids: List[UUID]) -> None:
+        for execution_id in execution_ids:
+            await self.queue.put(execution_id)
+
+    async def _worker(self) -> None:
+        while True:
+            execution_id = await self.queue.get()
+            try:
+                await self.runner(execution_id)
+            except Exception:
+                logger.exception(f"Agent execution {execution_id} failed")
+            finally:
+                self.queue.task_done()
+                release = self.on_done.pop(execution_id, None)
+                if release is not None:
+                    release()
+
+    async def run_execution(self, execution_id: UUID) -> None:
+        await run_execution(execution_id, self.session_factory)
+
+    async def stop(self) -> None:
+        """Stop taking work, let queued executions finish, then stop workers."""
+        if self.queue is None:
+            return
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            # Unfinished executions stay pending/running and are recovered on restart
+            logger.warning(f"{self.queue.qsize()} agent executions still queued at shutdown")
+
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def stats(self) -> dict:
+        """Queue depth and worker count."""
+        return {
+            "workers": self.workers,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "reserved": self.reserved,
+            "max_queue": self.max_queue,
+        }
+
+
+agent_workers = AgentWorkerPool(
+    workers=settings.agent_workers,
+    max_queue=settings.agent_queue_size,
+    drain_timeout=settings.agent_drain_timeout_seconds,
+)
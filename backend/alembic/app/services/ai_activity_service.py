@@ -1,7 +1,7 @@
 from typing import List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc
+from sqlalchemy import select, and_, desc, func
 from app.models.ai_activity import AIActivity, AITool, ActivityCategory
 from app.schemas.ai_activity import AIActivityCreate
 from app.services.base import BaseService
@@ -107,34 +107,46 @@ class AIActivityService(BaseService[AIActivity, AIActivityCreate, dict]):
         """Get activity statistics for the past N days."""
         start_date = datetime.utcnow() - timedelta(days=days)
 
-        query = select(AIActivity).where(AIActivity.timestamp >= start_date)
+        # Aggregate in the database so only one row per (tool, category)
+        # pair comes back instead of every activity with its prompt/response.
+        query = (
+            select(
+                AIActivity.tool_used,
+                AIActivity.category,
+                func.count().label("count"),
+            )
+            .where(AIActivity.timestamp >= start_date)
+        )
         if project_id:
             query = query.where(AIActivity.project_id == project_id)
+        query = query.group_by(AIActivity.tool_used, AIActivity.category)
 
         result = await self.db.execute(query)
-        activities = list(result.scalars().all())
-
-        # Calculate statistics
-        total = len(activities)
-        by_tool = {}
-        by_category = {}
-        total_cost = 0.0
-
-        for activity in activities:
-            tool = activity.tool_used.value
-            category = activity.category.value
-
-            by_tool[tool] = by_tool.get(tool, 0) + 1
-            by_category[category] = by_category.get(category, 0) + 1
-
-            # Rough cost estimation (adjust based on actual pricing)
-            total_cost += 0.002
-
-        return {
-            "total_prompts": total,
-            "prompts_by_tool": by_tool,
-            "prompts_by_category": by_category,
-            "total_cost_estimate": round(total_cost, 4),
-            "avg_tokens_per_prompt": 150.0,  # Placeholder
-            "time_saved_hours": round(total * 0.25, 2)
-        }
+        return summarize_usage(result.all())
+
+
+def summarize_usage(rows) -> dict:
+    """Build usage statistics from (tool, category, count) aggregate rows."""
+    total = 0
+    by_tool = {}
+    by_category = {}
+
+    for tool_used, category, count in rows:
+        tool = tool_used.value
+        category = category.value
+
+        by_tool[tool] = by_tool.get(tool, 0) + count
+        by_category[category] = by_category.get(category, 0) + count
+        total += count
+
+    # Rough cost estimation (adjust based on actual pricing)
+    total_cost = total * 0.002
+
+    return {
+        "total_prompts": total,
+        "prompts_by_tool": by_tool,
+        "prompts_by_category": by_category,
+        "total_cost_estimate": round(total_cost, 4),
+        "avg_tokens_per_prompt": 150.0,  # Placeholder
+        "time_saved_hours": round(total * 0.25, 2)
+    }
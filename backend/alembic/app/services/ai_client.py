@@ -2,19 +2,150 @@
 AI Client Service - Real Integration with OpenAI and Anthropic
 
 This service provides actual AI model invocations for agents and features.
+One AIClient per process holds an HTTP/2 connection pool, so model
+calls reuse warm TLS connections instead of handshaking every time, and
+queues calls within provider concurrency and token limits, retrying rate
+limits and server errors with backoff.
+With a response cache configured, repeated deterministic prompts are
+answered from the cache instead of the model.
 """
+import json
 import os
-from typing import Dict, List, Optional, Any
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Any
 import httpx
 from app.core.config import settings
+from app.services.ai_limits import (
+    ProviderLimiter,
+    RetryPolicy,
+    create_provider_limiter,
+    create_retry_policy,
+)
+from app.services.response_cache import (
+    ResponseCacheBackend,
+    cache_key,
+    create_response_cache,
+)
+
+# Request defaults, mirrored here so cache keys match what is actually sent
+DEFAULT_MODELS = {"openai": "gpt-4", "anthropic": "claude-3-sonnet-20240229"}
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_MAX_TOKENS = 2000
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Pooled HTTP client configured from settings."""
+    return httpx.AsyncClient(
+        http2=settings.ai_http2,
+        timeout=settings.ai_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.ai_max_connections,
+            max_keepalive_connections=settings.ai_max_keepalive_connections,
+            keepalive_expiry=settings.ai_keepalive_expiry_seconds,
+        ),
+    )
 
 
 class AIClient:
     """Client for AI model APIs (OpenAI, Anthropic)."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[ResponseCacheBackend] = None,
+        limiter: Optional[ProviderLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+    ):
         self.openai_key = settings.openai_api_key
         self.anthropic_key = settings.anthropic_api_key
+        self.openai_base_url = settings.openai_base_url
+        self.anthropic_base_url = settings.anthropic_base_url
+        self.http = http_client or create_http_client()
+        self.cache = cache
+        self.limiter = limiter or create_provider_limiter()
+        self.retry = retry or create_retry_policy()
+
+    async def close(self) -> None:
+        """Close pooled connections and the response cache."""
+        await self.http.aclose()
+        if self.cache is not None:
+            await self.cache.close()
+
+    def _cache_key(
+        self,
+        prompt: str,
+        provider: str,
+        force_cache: bool,
+        kwargs: Dict[str, Any]
+    ) -> Optional[str]:
+        """Cache key for a call, or None if it should go to the model."""
+        if self.cache is None:
+            return None
+
+        temperature = kwargs.get("temperature", DEFAULT_TEMPERATURE)
+        if temperature > 0 and not force_cache:
+            # Sampled output differs run to run; only cache when asked to
+            self.cache.bypasses += 1
+            return None
+
+        extra = {
+            name: value for name, value in kwargs.items()
+            if name not in ("model", "temperature", "max_tokens")
+        }
+        return cache_key(
+            provider,
+            kwargs.get("model", DEFAULT_MODELS.get(provider)),
+            prompt,
+            temperature,
+            kwargs.get("max_tokens", DEFAULT_MAX_TOKENS),
+            **extra
+        )
+
+    async def _cached(self, key: Optional[str]) -> Optional[str]:
+        """Cached completion for key, counting the hit or miss."""
+        if key is None:
+            return None
+        entry = await self.cache.get(key)
+        if entry is None:
+            self.cache.misses += 1
+            return None
+        self.cache.record_hit(entry)
+        return entry["content"]
+
+    @staticmethod
+    def _estimate_tokens(data: Dict[str, Any]) -> int:
+        """Tokens a request counts against the budget: prompt plus max output."""
+        prompt_chars = len(json.dumps(data.get("messages", [])))
+        return prompt_chars // 4 + data.get("max_tokens", DEFAULT_MAX_TOKENS)
+
+    async def _post(
+        self,
+        provider: str,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any]
+    ) -> httpx.Response:
+        """POST within provider limits, retrying rate limits and server errors."""
+        tokens = self._estimate_tokens(data)
+
+        for attempt in range(self.retry.max_retries + 1):
+            last_attempt = attempt == self.retry.max_retries
+            async with self.limiter.slot(provider, data["model"], tokens):
+                try:
+                    response = await self.http.post(url, headers=headers, json=data)
+                except httpx.TransportError:
+                    if last_attempt:
+                        raise
+                    response = None
+
+            if last_attempt or not self.retry.retryable(response):
+                break
+            # Back off outside the slot so other calls can proceed meanwhile
+            await self.retry.wait(attempt, response)
+
+        response.raise_for_status()
+        return response
 
     async def call_openai(
         self,
@@ -41,21 +172,20 @@ class AIClient:
             **kwargs
         }
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=data
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            return {
-                "content": result["choices"][0]["message"]["content"],
-                "model": result["model"],
-                "usage": result.get("usage", {}),
-                "provider": "openai",
-            }
+        response = await self._post(
+            "openai",
+            f"{self.openai_base_url}/chat/completions",
+            headers,
+            data
+        )
+        result = response.json()
+
+        return {
+            "content": result["choices"][0]["message"]["content"],
+            "model": result["model"],
+            "usage": result.get("usage", {}),
+            "provider": "openai",
+        }
 
     async def call_anthropic(
         self,
@@ -85,37 +215,210 @@ class AIClient:
             **kwargs
         }
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers=headers,
-                json=data
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            return {
-                "content": result["content"][0]["text"],
-                "model": result["model"],
-                "usage": result.get("usage", {}),
-                "provider": "anthropic",
-            }
+        response = await self._post(
+            "anthropic",
+            f"{self.anthropic_base_url}/messages",
+            headers,
+            data
+        )
+        result = response.json()
+
+        return {
+            "content": result["content"][0]["text"],
+            "model": result["model"],
+            "usage": result.get("usage", {}),
+            "provider": "anthropic",
+        }
+
+    async def _stream_sse(
+        self,
+        provider: str,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        POST a streaming request and yield each server-sent JSON event.
+
+        Retries happen only before the first event, since events already
+        yielded cannot be taken back. The limiter slot is held until the
+        generator finishes, so consumers that may stop early must close
+        it (contextlib.aclosing).
+        """
+        tokens = self._estimate_tokens(data)
+        request = self.http.build_request("POST", url, headers=headers, json=data)
+
+        for attempt in range(self.retry.max_retries + 1):
+            last_attempt = attempt == self.retry.max_retries
+            async with self.limiter.slot(provider, data["model"], tokens):
+                try:
+                    response = await self.http.send(request, stream=True)
+                except httpx.TransportError:
+                    if last_attempt:
+                        raise
+                    response = None
+
+                if last_attempt or not self.retry.retryable(response):
+                    try:
+                        if response.is_error:
+                            await response.aread()
+                            response.raise_for_status()
+
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            payload = line[len("data:"):].strip()
+                            if payload == "[DONE]":
+                                return
+                            yield json.loads(payload)
+                    finally:
+                        await response.aclose()
+                    return
+
+                if response is not None:
+                    await response.aclose()
+
+            await self.retry.wait(attempt, response)
+
+    async def stream_openai(
+        self,
+        messages: List[Dict],
+        model: str = "gpt-4",
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream an OpenAI completion, yielding text as it is generated."""
+        if not self.openai_key:
+            raise ValueError("OpenAI API key not configured")
+
+        headers = {
+            "Authorization": f"Bearer {self.openai_key}",
+            "Content-Type": "application/json",
+        }
+
+        data = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            **kwargs
+        }
+
+        async with aclosing(self._stream_sse(
+            "openai", f"{self.openai_base_url}/chat/completions", headers, data
+        )) as events:
+            async for event in events:
+                choices = event.get("choices") or [{}]
+                text = choices[0].get("delta", {}).get("content")
+                if text:
+                    yield text
+
+    async def stream_anthropic(
+        self,
+        message: str,
+        model: str = "claude-3-sonnet-20240229",
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream an Anthropic completion, yielding text as it is generated."""
+        if not self.anthropic_key:
+            raise ValueError("Anthropic API key not configured")
+
+        headers = {
+            "x-api-key": self.anthropic_key,
+            "Content-Type": "application/json",
+            "anthropic-version": "2023-06-01",
+        }
+
+        data = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "user", "content": message}
+            ],
+            "temperature": temperature,
+            "stream": True,
+            **kwargs
+        }
+
+        async with aclosing(self._stream_sse(
+            "anthropic", f"{self.anthropic_base_url}/messages", headers, data
+        )) as events:
+            async for event in events:
+                if event.get("type") == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        yield text
+                elif event.get("type") == "message_stop":
+                    return
 
     async def call_model(
         self,
         prompt: str,
         provider: str = "anthropic",
+        force_cache: bool = False,
         **kwargs
     ) -> str:
-        """Convenient method to call any AI model."""
+        """
+        Convenient method to call any AI model.
+
+        With a response cache configured, calls at temperature 0 (or any
+        temperature when force_cache is set) are served from the cache.
+        """
+        key = self._cache_key(prompt, provider, force_cache, kwargs)
+        cached = await self._cached(key)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
         if provider == "openai":
             messages = [{"role": "user", "content": prompt}]
             result = await self.call_openai(messages, **kwargs)
         else:
             result = await self.call_anthropic(prompt, **kwargs)
 
+        if key is not None:
+            await self.cache.set(key, result["content"], time.perf_counter() - start)
         return result["content"]
 
+    async def stream_model(
+        self,
+        prompt: str,
+        provider: str = "anthropic",
+        force_cache: bool = False,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Streaming counterpart of call_model, yielding text chunks.
+
+        Close the generator (contextlib.aclosing) when not reading it to
+        the end, to release the provider request right away.
+        """
+        key = self._cache_key(prompt, provider, force_cache, kwargs)
+        cached = await self._cached(key)
+        if cached is not None:
+            yield cached
+            return
+
+        start = time.perf_counter()
+        if provider == "openai":
+            messages = [{"role": "user", "content": prompt}]
+            chunks = self.stream_openai(messages, **kwargs)
+        else:
+            chunks = self.stream_anthropic(prompt, **kwargs)
+
+        received = []
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                received.append(chunk)
+                yield chunk
+
+        if key is not None:
+            await self.cache.set(key, "".join(received), time.perf_counter() - start)
+
     async def estimate_cost(
         self,
         provider: str,
@@ -144,3 +447,28 @@ class AIClient:
         output_cost = output_tokens * rates["output"] / 1000
 
         return input_cost + output_cost
+
+
+# Process-wide client, created on first use and closed in the app lifespan
+_ai_client: Optional[AIClient] = None
+
+
+def get_ai_client() -> AIClient:
+    """Return the shared AIClient, creating it if needed."""
+    global _ai_client
+    if _ai_client is None:
+        _ai_client = AIClient(cache=create_response_cache(
+            settings.ai_cache_backend,
+            max_entries=settings.ai_cache_max_entries,
+            ttl_seconds=settings.ai_cache_ttl_seconds,
+            sqlite_path=settings.ai_cache_sqlite_path,
+        ))
+    return _ai_client
+
+
+async def close_ai_client() -> None:
+    """Close the shared AIClient's connections and cache."""
+    global _ai_client
+    if _ai_client is not None:
+        await _ai_client.close()
+        _ai_client = None
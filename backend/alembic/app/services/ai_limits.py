@@ -0,0 +1,181 @@
+"""
+AI Provider Limits
+
+Keeps model calls inside provider rate limits instead of failing on them:
+
+- ProviderLimiter caps concurrent requests per (provider, model) and
+  spends a per-provider tokens-per-minute budget. Callers over either
+  limit wait their turn.
+- RetryPolicy retries 429s, 5xx responses and connection errors with
+  exponential backoff and full jitter, honoring retry-after.
+"""
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+import httpx
+from app.core.config import settings
+
+RETRYABLE_STATUS = frozenset([408, 409, 429, 500, 502, 503, 504, 529])
+
+
+class TokenBudget:
+    """Token bucket of model tokens refilled at tokens_per_minute."""
+
+    def __init__(
+        self,
+        tokens_per_minute: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        # Waiters are served in arrival order
+        self.lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until `tokens` are available, then spend them."""
+        # A single request larger than the whole budget would never fit
+        needed = min(float(tokens), self.capacity)
+        async with self.lock:
+            self._refill()
+            while self.tokens < needed:
+                await self.sleep((needed - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= needed
+
+
+class ProviderLimiter:
+    """Per-model concurrency caps and per-provider token budgets."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        tokens_per_minute: Optional[Dict[str, int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.max_concurrency = max_concurrency
+        self.semaphores: Dict[Tuple[str, str], asyncio.Semaphore] = {}
+        self.in_flight: Dict[Tuple[str, str], int] = {}
+        self.budgets = {
+            provider: TokenBudget(limit, clock=clock, sleep=sleep)
+            for provider, limit in (tokens_per_minute or {}).items()
+            if limit > 0
+        }
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def slot(self, provider: str, model: str, tokens: int) -> AsyncIterator[None]:
+        """Hold one request slot for provider/model, waiting if none is free."""
+        key = (provider, model)
+        if key not in self.semaphores:
+            self.semaphores[key] = asyncio.Semaphore(self.max_concurrency)
+            self.in_flight[key] = 0
+
+        self.waiting += 1
+        try:
+            budget = self.budgets.get(provider)
+            if budget is not None:
+                await budget.acquire(tokens)
+            await self.semaphores[key].acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight[key] += 1
+        try:
+            yield
+        finally:
+            self.in_flight[key] -= 1
+            self.semaphores[key].release()
+
+    def stats(self) -> dict:
+        """Requests in flight and queued."""
+        return {
+            "waiting": self.waiting,
+            "in_flight": {
+                f"{provider}/{model}": count
+                for (provider, model), count in self.in_flight.items()
+            },
+        }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for retryable provider errors."""
+
+    def __init__(
+        self,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        jitter: Callable[[], float] = random.random,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.jitter = jitter
+
+    @staticmethod
+    def retryable(response: Optional[httpx.Response]) -> bool:
+        """True for connection errors (no response) and retryable statuses."""
+        return response is None or response.status_code in RETRYABLE_STATUS
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Seconds to wait before retry number attempt + 1."""
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return self.jitter() * min(self.max_delay, self.base_delay * 2 ** attempt)
+
+    async def wait(self, attempt: int, response: Optional[httpx.Response] = None) -> None:
+        await self.sleep(self.delay(attempt, response))
+
+    @staticmethod
+    def _retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+        """retry-after header as seconds (delta or HTTP date), if present."""
+        value = response.headers.get("retry-after") if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def create_provider_limiter() -> ProviderLimiter:
+    """ProviderLimiter configured from settings."""
+    return ProviderLimiter(
+        max_concurrency=settings.ai_max_concurrency_per_model,
+        tokens_per_minute={
+            "openai": settings.openai_tokens_per_minute,
+            "anthropic": settings.anthropic_tokens_per_minute,
+        },
+    )
+
+
+def create_retry_policy() -> RetryPolicy:
+    """RetryPolicy configured from settings."""
+    return RetryPolicy(
+        max_retries=settings.ai_max_retries,
+        base_delay=settings.ai_retry_base_delay_seconds,
+        max_delay=settings.ai_retry_max_delay_seconds,
+    )
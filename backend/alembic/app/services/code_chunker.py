@@ -0,0 +1,120 @@
+"""
+Code Chunker
+
+Splits Python source into chunks along top-level definitions so a large
+file can be sent to a model as several prompts of bounded size. Comments
+and decorators stay with the definition that follows them, and the
+module's imports are kept aside so every chunk can be shown with them.
+"""
+import ast
+from typing import List, Optional
+from app.core.config import settings
+
+
+class CodeChunk:
+    """A run of whole source lines and the top-level names defined in it."""
+
+    def __init__(self, text: str, start_line: int, end_line: int, names: List[str]):
+        self.text = text
+        self.start_line = start_line
+        self.end_line = end_line
+        self.names = names
+
+    def __repr__(self) -> str:
+        return f"CodeChunk(lines {self.start_line}-{self.end_line}, {self.names})"
+
+
+def module_imports(source: str) -> str:
+    """Top-level import statements of a module, one per line."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return ""
+    lines = source.splitlines()
+    return "\n".join(
+        "\n".join(lines[node.lineno - 1:node.end_lineno])
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def split_python(source: str, max_chars: Optional[int] = None) -> List[CodeChunk]:
+    """
+    Split source into chunks of at most about max_chars
+    (default: settings.agent_chunk_chars).
+
+    Consecutive top-level statements are packed together; a statement is
+    only broken up when it alone exceeds max_chars, in which case it is
+    cut at line boundaries. Source that does not parse is cut by lines.
+    """
+    max_chars = max_chars or settings.agent_chunk_chars
+    lines = source.splitlines(keepends=True)
+    if len(source) <= max_chars:
+        return [CodeChunk(source, 1, len(lines), _names(source))]
+
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return _split_lines(lines, 1, len(lines), max_chars, [])
+
+    # (start, end, name) per top-level statement; leading comments,
+    # blank lines and decorators belong to the statement after them
+    segments = []
+    start = 1
+    for node in tree.body:
+        segments.append((start, node.end_lineno, getattr(node, "name", None)))
+        start = node.end_lineno + 1
+    if not segments:
+        return _split_lines(lines, 1, len(lines), max_chars, [])
+    if start <= len(lines):
+        first, _, name = segments[-1]
+        segments[-1] = (first, len(lines), name)
+
+    chunks: List[CodeChunk] = []
+    group: List[tuple] = []
+    group_size = 0
+
+    def flush():
+        if group:
+            first, last = group[0][0], group[-1][1]
+            names = [name for _, _, name in group if name]
+            chunks.append(CodeChunk("".join(lines[first - 1:last]), first, last, names))
+
+    for segment in segments:
+        seg_start, seg_end, name = segment
+        size = sum(len(line) for line in lines[seg_start - 1:seg_end])
+        if group and group_size + size > max_chars:
+            flush()
+            group, group_size = [], 0
+
+        if size > max_chars:
+            chunks.extend(_split_lines(lines, seg_start, seg_end, max_chars, [name] if name else []))
+            continue
+
+        group.append(segment)
+        group_size += size
+
+    flush()
+    return chunks
+
+
+def _split_lines(lines: List[str], start: int, end: int, max_chars: int, names: List[str]) -> List[CodeChunk]:
+    """Cut lines start..end (1-based, inclusive) into chunks of whole lines."""
+    chunks = []
+    chunk_start, size = start, 0
+    for number in range(start, end + 1):
+        length = len(lines[number - 1])
+        if size and size + length > max_chars:
+            chunks.append(CodeChunk("".join(lines[chunk_start - 1:number - 1]), chunk_start, number - 1, names))
+            chunk_start, size = number, 0
+        size += length
+    chunks.append(CodeChunk("".join(lines[chunk_start - 1:end]), chunk_start, end, names))
+    return chunks
+
+
+def _names(source: str) -> List[str]:
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+    return [node.name for node in tree.body if hasattr(node, "name")]
@@ -0,0 +1,92 @@
+"""
+Execution Stream Service
+
+In-process channels carrying model output from a running agent to SSE
+subscribers. Agents run on the application's event loop, the same one
+that serves the stream, so publishing needs no locking.
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+# Finished streams stay readable this long for late subscribers
+STREAM_RETENTION_SECONDS = 60
+
+
+class ExecutionStream:
+    """Append-only buffer of text chunks for one agent execution."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[str] = None
+        self.closed_at: Optional[float] = None
+        self.waiters: List[asyncio.Event] = []
+
+    def publish(self, chunk: str) -> None:
+        """Append a chunk and wake subscribers."""
+        self.chunks.append(chunk)
+        self._wake()
+
+    def close(self, error: Optional[str] = None) -> None:
+        """Mark the stream finished, optionally with an error."""
+        self.done = True
+        self.error = error
+        self.closed_at = time.monotonic()
+        self._wake()
+
+    def _wake(self) -> None:
+        waiters, self.waiters = self.waiters, []
+        for event in waiters:
+            event.set()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Yield every chunk from the start, then new ones until closed."""
+        index = 0
+
+        while True:
+            new = self.chunks[index:]
+            for chunk in new:
+                yield chunk
+            index += len(new)
+
+            if new:
+                continue
+            if self.done:
+                return
+            event = asyncio.Event()
+            self.waiters.append(event)
+            await event.wait()
+
+
+class ExecutionStreamRegistry:
+    """Streams by execution id for this process."""
+
+    def __init__(self, retention_seconds: float = STREAM_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+        self.streams: Dict[str, ExecutionStream] = {}
+
+    def open(self, execution_id) -> ExecutionStream:
+        """Return the stream for an execution, creating it if needed."""
+        self._purge()
+        stream = self.streams.get(str(execution_id))
+        if stream is None:
+            stream = self.streams[str(execution_id)] = ExecutionStream()
+        return stream
+
+    def get(self, execution_id) -> Optional[ExecutionStream]:
+        """Stream for an execution, or None if it is not running here."""
+        return self.streams.get(str(execution_id))
+
+    def _purge(self) -> None:
+        """Drop streams that finished longer ago than the retention period."""
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [
+            key for key, stream in self.streams.items()
+            if stream.closed_at is not None and stream.closed_at < cutoff
+        ]
+        for key in expired:
+            del self.streams[key]
+
+
+execution_streams = ExecutionStreamRegistry()
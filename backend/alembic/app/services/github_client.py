@@ -0,0 +1,278 @@
+"""
+GitHub HTTP Client
+
+Shared machinery behind GitHubService:
+
+- One pooled httpx.AsyncClient per worker, so API calls reuse
+  connections instead of paying a TCP/TLS handshake each.
+- GitHubETagCache keeps the ETag/Last-Modified validators and bodies of
+  GET responses. Repeat requests are sent conditionally; GitHub answers
+  unchanged resources with 304 Not Modified, which does not count
+  against the rate limit, and the stored body is served.
+- GitHubRateLimit tracks X-RateLimit-Remaining/Reset per token and,
+  once the remaining quota drops to a reserve, spaces requests out
+  until the window resets instead of running into 403s.
+- GitHubRepoCache remembers default branches for a while and recursive
+  trees by SHA, so get_repo_tree skips requests for unchanged commits.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import httpx
+from app.core.config import settings
+
+# Response headers kept with a cached body, so a 304 can be answered
+# with a response equivalent to the original
+CACHED_HEADERS = ("content-type", "etag", "last-modified", "link")
+
+
+def token_key(token: Optional[str]) -> str:
+    """Identifier for a token's quota and cache entries that does not expose it."""
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+class GitHubRateLimitExceeded(Exception):
+    """The quota is exhausted and resets later than callers are willing to wait."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"GitHub rate limit exhausted, resets in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class GitHubETagCache:
+    """LRU of GET responses with their validators, keyed by token and URL."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored {"content", "headers"} for key, or None."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, response: httpx.Response) -> None:
+        """Store a 200 response if it carries a validator."""
+        if self.max_entries <= 0:
+            return
+        if "etag" not in response.headers and "last-modified" not in response.headers:
+            return
+        self.entries[key] = {
+            "content": response.content,
+            "headers": {
+                name: response.headers[name]
+                for name in CACHED_HEADERS
+                if name in response.headers
+            },
+        }
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+            # hits are 304s: served from cache without spending quota
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class GitHubRepoCache:
+    """
+    Default branches and recursive trees of repositories.
+
+    Default branches rarely change and are kept for `branch_ttl` seconds
+    per token. Trees are immutable for a given SHA, so they are kept
+    until evicted (LRU) and never revalidated; they are also kept per
+    token, so a tree is only served to a token GitHub has shown it to.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 200,
+        branch_ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.branch_ttl = branch_ttl
+        self.clock = clock
+        self.branches: "OrderedDict[Tuple[str, str, str], Tuple[str, float]]" = OrderedDict()
+        self.trees: "OrderedDict[Tuple[str, str, str, str], Dict[str, Any]]" = OrderedDict()
+        self.tree_hits = 0
+        self.tree_misses = 0
+
+    def _store(self, entries: OrderedDict, key: Tuple, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def get_default_branch(self, token: str, owner: str, repo: str) -> Optional[str]:
+        key = (token, owner.lower(), repo.lower())
+        entry = self.branches.get(key)
+        if entry is None:
+            return None
+        branch, expires = entry
+        if self.clock() >= expires:
+            del self.branches[key]
+            return None
+        return branch
+
+    def set_default_branch(self, token: str, owner: str, repo: str, branch: str) -> None:
+        if self.branch_ttl > 0:
+            self._store(self.branches, (token, owner.lower(), repo.lower()), (branch, self.clock() + self.branch_ttl))
+
+    def get_tree(self, token: str, owner: str, repo: str, sha: str) -> Optional[Dict[str, Any]]:
+        key = (token, owner.lower(), repo.lower(), sha)
+        tree = self.trees.get(key)
+        if tree is None:
+            self.tree_misses += 1
+            return None
+        self.trees.move_to_end(key)
+        self.tree_hits += 1
+        return tree
+
+    def set_tree(self, token: str, owner: str, repo: str, sha: str, tree: Dict[str, Any]) -> None:
+        self._store(self.trees, (token, owner.lower(), repo.lower(), sha), tree)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "branches": len(self.branches),
+            "trees": len(self.trees),
+            "max_entries": self.max_entries,
+            "tree_hits": self.tree_hits,
+            "tree_misses": self.tree_misses,
+        }
+
+
+class GitHubRateLimit:
+    """
+    Per-token view of GitHub's rate limit, updated from response headers.
+
+    Above `reserve` remaining requests nothing waits. At or below it,
+    requests are paced so the remaining quota lasts until the reset.
+    With no quota left, callers wait for the reset, or get
+    GitHubRateLimitExceeded if that is more than `max_wait` away.
+    """
+
+    def __init__(
+        self,
+        reserve: int = 100,
+        max_wait: float = 60.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        # token key -> {"limit", "remaining", "reset"}
+        self.quotas: Dict[str, Dict[str, float]] = {}
+        # token key -> earliest time the next paced request may start
+        self.next_slot: Dict[str, float] = {}
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def update(self, key: str, headers: httpx.Headers) -> None:
+        """Record the quota reported by a response."""
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset = float(headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+        quota = self.quotas.setdefault(key, {})
+        quota["remaining"] = remaining
+        quota["reset"] = reset
+        if "x-ratelimit-limit" in headers:
+            quota["limit"] = int(headers["x-ratelimit-limit"])
+
+    def delay(self, key: str) -> float:
+        """Seconds the next request for key should wait, reserving its slot."""
+        quota = self.quotas.get(key)
+        if quota is None or quota["remaining"] > self.reserve:
+            return 0.0
+
+        now = self.clock()
+        until_reset = quota["reset"] - now
+        if until_reset <= 0:
+            # The window has rolled over; the next response reports the new quota
+            return 0.0
+        if quota["remaining"] <= 0:
+            return until_reset
+
+        # Spread what is left evenly over the rest of the window
+        interval = until_reset / quota["remaining"]
+        slot = max(now, self.next_slot.get(key, now))
+        self.next_slot[key] = slot + interval
+        return slot - now
+
+    async def acquire(self, key: str) -> None:
+        """Wait until a request for key may be sent."""
+        wait = self.delay(key)
+        if wait <= 0:
+            return
+        if wait > self.max_wait:
+            raise GitHubRateLimitExceeded(wait)
+        self.throttled += 1
+        self.throttled_seconds += wait
+        await self.sleep(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "reserve": self.reserve,
+            "throttled": self.throttled,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "quotas": {key: dict(quota) for key, quota in self.quotas.items()},
+        }
+
+
+def create_github_http_client() -> httpx.AsyncClient:
+    """Pooled HTTP client for the GitHub API configured from settings."""
+    return httpx.AsyncClient(
+        timeout=settings.github_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.github_max_connections,
+            max_keepalive_connections=settings.github_max_connections,
+        ),
+    )
+
+
+github_etag_cache = GitHubETagCache(max_entries=settings.github_cache_max_entries)
+github_repo_cache = GitHubRepoCache(
+    max_entries=settings.github_tree_cache_max_entries,
+    branch_ttl=settings.github_default_branch_ttl_seconds,
+)
+github_rate_limit = GitHubRateLimit(
+    reserve=settings.github_rate_limit_reserve,
+    max_wait=settings.github_rate_limit_max_wait_seconds,
+)
+
+_github_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_github_http_client() -> httpx.AsyncClient:
+    """Return the shared GitHub HTTP client, creating it if needed."""
+    global _github_http_client
+    if _github_http_client is None:
+        _github_http_client = create_github_http_client()
+    return _github_http_client
+
+
+async def close_github_client() -> None:
+    """Close the shared GitHub HTTP client's connections."""
+    global _github_http_client
+    if _github_http_client is not None:
+        await _github_http_client.aclose()
+        _github_http_client = None
@@ -2,25 +2,107 @@
 GitHub Integration Service
 
 This service handles GitHub API interactions for the platform.
+Requests go through the worker's shared connection pool, GETs are
+revalidated with ETag/Last-Modified, and calls are paced when the
+token's quota runs low (see github_client). The iter_* methods stream
+every page of a list endpoint.
 """
-import os
-from typing import Dict, List, Optional
+import asyncio
+import re
+from collections import deque
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 import httpx
 from app.core.config import settings
+from app.services.github_client import (
+    GitHubETagCache,
+    GitHubRateLimit,
+    GitHubRepoCache,
+    get_github_http_client,
+    github_etag_cache,
+    github_rate_limit,
+    github_repo_cache,
+    token_key,
+)
+
+# A full commit or tree SHA, as opposed to a branch or tag name
+SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
 
 
 class GitHubService:
     """Service for GitHub API operations."""
 
-    def __init__(self, token: Optional[str] = None):
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[GitHubETagCache] = None,
+        rate_limit: Optional[GitHubRateLimit] = None,
+        page_concurrency: Optional[int] = None,
+        repo_cache: Optional[GitHubRepoCache] = None,
+    ):
         """Initialize GitHub service."""
         self.token = token or settings.github_token
-        self.base_url = "https://api.github.com"
+        self.base_url = settings.github_api_url
         self.headers = {
             "Accept": "application/vnd.github.v3+json",
         }
         if self.token:
             self.headers["Authorization"] = f"token {self.token}"
+        self.http_client = http_client or get_github_http_client()
+        self.cache = cache if cache is not None else github_etag_cache
+        self.rate_limit = rate_limit if rate_limit is not None else github_rate_limit
+        self.token_key = token_key(self.token)
+        self.page_concurrency = page_concurrency or settings.github_page_concurrency
+        self.repo_cache = repo_cache if repo_cache is not None else github_repo_cache
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        conditional: bool = True,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Make authenticated request to GitHub API and return the response.
+
+        A GET whose validators are cached is sent conditionally; on 304
+        the cached response is returned in its place. Pass
+        conditional=False for responses cached elsewhere.
+        """
+        if "://" in endpoint:
+            # Link header URLs are absolute; never send the token elsewhere
+            if not endpoint.startswith(f"{self.base_url}/"):
+                raise ValueError(f"Refusing to follow link outside {self.base_url}: {endpoint}")
+            url = endpoint
+        else:
+            url = f"{self.base_url}/{endpoint}"
+        request = self.http_client.build_request(method, url, headers=self.headers, **kwargs)
+
+        cache_key = None
+        cached = None
+        if method == "GET" and conditional:
+            # Cache per token: private resources differ between users
+            cache_key = f"{self.token_key} {request.url}"
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if "etag" in cached["headers"]:
+                    request.headers["If-None-Match"] = cached["headers"]["etag"]
+                if "last-modified" in cached["headers"]:
+                    request.headers["If-Modified-Since"] = cached["headers"]["last-modified"]
+
+        await self.rate_limit.acquire(self.token_key)
+        response = await self.http_client.send(request)
+        self.rate_limit.update(self.token_key, response.headers)
+
+        if cached is not None and response.status_code == 304:
+            self.cache.hits += 1
+            return httpx.Response(200, headers=cached["headers"], content=cached["content"], request=request)
+
+        response.raise_for_status()
+        if cache_key is not None:
+            self.cache.misses += 1
+            self.cache.set(cache_key, response)
+        return response
 
     async def _request(
         self,
@@ -29,17 +111,68 @@ class GitHubService:
         **kwargs
     ) -> Dict:
         """Make authenticated request to GitHub API."""
-        url = f"{self.base_url}/{endpoint}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method,
-                url,
-                headers=self.headers,
-                **kwargs
+        response = await self._send(method, endpoint, **kwargs)
+        return response.json()
+
+    async def _paginate(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        per_page: int = 100
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield the items of every page of a list endpoint, in order.
+
+        When the first page's Link header names the last page, the rest
+        are fetched concurrently, at most page_concurrency at a time;
+        otherwise rel="next" links are followed one by one.
+        """
+        response = await self._send("GET", endpoint, params={**(params or {}), "per_page": per_page})
+        for item in response.json():
+            yield item
+
+        last = response.links.get("last", {}).get("url")
+        if last and "page" in httpx.URL(last).params:
+            last_url = httpx.URL(last)
+            urls = (
+                str(last_url.copy_set_param("page", page))
+                for page in range(2, int(last_url.params["page"]) + 1)
             )
-            response.raise_for_status()
-            return response.json()
+            async for items in self._fetch_pages(urls):
+                for item in items:
+                    yield item
+            return
+
+        next_url = response.links.get("next", {}).get("url")
+        while next_url:
+            response = await self._send("GET", next_url)
+            for item in response.json():
+                yield item
+            next_url = response.links.get("next", {}).get("url")
+
+    async def _fetch_pages(self, urls: Iterable[str]) -> AsyncIterator[List[Dict]]:
+        """Fetch pages with a bounded number in flight, yielding them in order."""
+        urls = iter(urls)
+        pending = deque()
+
+        def schedule() -> None:
+            url = next(urls, None)
+            if url is not None:
+                pending.append(asyncio.ensure_future(self._send("GET", url)))
+
+        try:
+            for _ in range(self.page_concurrency):
+                schedule()
+            while pending:
+                response = await pending.popleft()
+                # Keep the window full while the caller works through this page
+                schedule()
+                yield response.json()
+        finally:
+            # The caller stopped early or a page failed
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
 
     async def get_user(self, username: str) -> Dict:
         """Get user information."""
@@ -76,6 +209,15 @@ class GitHubService:
             params=params
         )
 
+    def iter_repo_commits(
+        self,
+        owner: str,
+        repo: str,
+        per_page: int = 100
+    ) -> AsyncIterator[Dict]:
+        """Iterate over all commits, newest first."""
+        return self._paginate(f"repos/{owner}/{repo}/commits", per_page=per_page)
+
     async def get_commit_diff(
         self,
         owner: str,
@@ -102,6 +244,16 @@ class GitHubService:
             params=params
         )
 
+    def iter_repo_issues(
+        self,
+        owner: str,
+        repo: str,
+        state: str = "open",
+        per_page: int = 100
+    ) -> AsyncIterator[Dict]:
+        """Iterate over all repository issues."""
+        return self._paginate(f"repos/{owner}/{repo}/issues", {"state": state}, per_page)
+
     async def get_repo_pulls(
         self,
         owner: str,
@@ -116,6 +268,16 @@ class GitHubService:
             params=params
         )
 
+    def iter_repo_pulls(
+        self,
+        owner: str,
+        repo: str,
+        state: str = "open",
+        per_page: int = 100
+    ) -> AsyncIterator[Dict]:
+        """Iterate over all repository pull requests."""
+        return self._paginate(f"repos/{owner}/{repo}/pulls", {"state": state}, per_page)
+
     async def get_pull_files(
         self,
         owner: str,
@@ -128,6 +290,16 @@ class GitHubService:
             f"repos/{owner}/{repo}/pulls/{pull_number}/files"
         )
 
+    def iter_pull_files(
+        self,
+        owner: str,
+        repo: str,
+        pull_number: int,
+        per_page: int = 100
+    ) -> AsyncIterator[Dict]:
+        """Iterate over all files changed in a pull request."""
+        return self._paginate(f"repos/{owner}/{repo}/pulls/{pull_number}/files", per_page=per_page)
+
     async def create_issue(
         self,
         owner: str,
@@ -226,19 +398,41 @@ class GitHubService:
 
         raise ValueError(f"Invalid GitHub repository URL: {repo_url}")
 
+    async def get_default_branch(self, owner: str, repo: str) -> str:
+        """Name of the repository's default branch, cached for a while."""
+        branch = self.repo_cache.get_default_branch(self.token_key, owner, repo)
+        if branch is None:
+            repo_info = await self.get_repo(owner, repo)
+            branch = repo_info.get("default_branch", "main")
+            self.repo_cache.set_default_branch(self.token_key, owner, repo, branch)
+        return branch
+
     async def get_repo_tree(
         self,
         owner: str,
         repo: str,
-        branch: str = "main"
-    ) -> List[Dict]:
-        """Get repository tree structure."""
-        # First get the default branch commit
-        repo_info = await self.get_repo(owner, repo)
-        default_branch = repo_info.get("default_branch", "main")
+        branch: Optional[str] = None
+    ) -> Dict:
+        """
+        Get the recursive tree of a branch (the default branch if None)
+        or of a commit or tree SHA.
 
-        # Get the tree
-        return await self._request(
-            "GET",
-            f"repos/{owner}/{repo}/git/trees/{default_branch}?recursive=1"
-        )
+        The tree is requested by ref directly, conditionally once it has
+        been read, so an unchanged branch costs no quota. Trees are also
+        kept by SHA per token, and a SHA this token has read before is
+        served without a request.
+        """
+        ref = branch or await self.get_default_branch(owner, repo)
+        is_sha = SHA_PATTERN.fullmatch(ref) is not None
+        if is_sha:
+            tree = self.repo_cache.get_tree(self.token_key, owner, repo, ref)
+            if tree is not None:
+                return tree
+
+        response = await self._send("GET", f"repos/{owner}/{repo}/git/trees/{ref}", params={"recursive": 1})
+        tree = response.json()
+        self.repo_cache.set_tree(self.token_key, owner, repo, tree["sha"], tree)
+        if is_sha and ref != tree["sha"]:
+            # A commit SHA names the same tree forever
+            self.repo_cache.set_tree(self.token_key, owner, repo, ref, tree)
+        return tree
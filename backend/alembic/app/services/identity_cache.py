@@ -0,0 +1,89 @@
+"""
+User Identity Cache
+
+Short-lived snapshots of User rows so authenticated requests can resolve
+the caller without a database round-trip. Entries expire after a few
+seconds and are dropped as soon as the user is updated or deleted through
+UserService; other workers converge within the TTL.
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from sqlalchemy.orm import make_transient_to_detached
+from app.core.config import settings
+from app.models.user import User
+
+# Columns copied into a snapshot. The password hash is left out so it is
+# never held in the cache; it loads on demand once the user is attached.
+SNAPSHOT_COLUMNS = ["id", "email", "username", "full_name", "created_at", "updated_at"]
+
+
+class UserIdentityCache:
+    """Bounded LRU of User column snapshots with a TTL."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        max_size: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.clock = clock
+        # str(user id) -> (snapshot, expires_at), least recently used first
+        self.entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        """Detached User built from a fresh snapshot, or None."""
+        entry = self.entries.get(user_id)
+
+        if entry is None or entry[1] <= self.clock():
+            self.entries.pop(user_id, None)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(user_id)
+        self.hits += 1
+
+        # A new instance per request so callers never share mutable state
+        user = User(**entry[0])
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, user: User) -> None:
+        """Snapshot a loaded user."""
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        snapshot = {column: getattr(user, column) for column in SNAPSHOT_COLUMNS}
+        self.entries[str(user.id)] = (snapshot, self.clock() + self.ttl_seconds)
+        self.entries.move_to_end(str(user.id))
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id) -> None:
+        """Forget a user after it changes."""
+        self.entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        """Forget all users."""
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        """Hit-rate metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+user_identity_cache = UserIdentityCache(
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    max_size=settings.user_cache_size,
+)
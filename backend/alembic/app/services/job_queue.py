@@ -0,0 +1,251 @@
+"""
+Agent Job Queue
+
+Durable queue of agent executions kept in the agent_executions table, so
+queued work survives restarts and can be served by worker processes on
+any host (scripts/agent_worker.py).
+
+A worker claims the oldest pending execution, or a running one whose
+lease has lapsed, by stamping it with its id and a lease deadline. It
+renews the lease while the agent runs. If the worker dies the lease
+lapses and another worker retries the execution, up to max_attempts.
+
+On PostgreSQL the claim picks its row with FOR UPDATE SKIP LOCKED, so
+concurrent workers each take a different row without waiting on each
+other. SQLite has no row locks and drops that clause; the claim is one
+UPDATE ... RETURNING, which SQLite runs under its database write lock,
+so two workers still never take the same row.
+"""
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.agent import AgentExecution, AgentStatus
+from app.services.agent_queue import run_execution
+
+logger = logging.getLogger(__name__)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class AgentJobQueue:
+    """Claims, lease renewal and release for queued agent executions."""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        clock: Callable[[], datetime] = utcnow,
+    ):
+        self.session_factory = session_factory
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.clock = clock
+
+    @staticmethod
+    def _claimable(now: datetime):
+        return or_(
+            AgentExecution.status == AgentStatus.PENDING,
+            and_(
+                AgentExecution.status == AgentStatus.RUNNING,
+                AgentExecution.lease_expires_at < now,
+            ),
+        )
+
+    async def claim(self, worker_id: str) -> Optional[UUID]:
+        """Take the oldest claimable execution. Returns its id, or None."""
+        now = self.clock()
+        candidate = (
+            select(AgentExecution.id)
+            .where(self._claimable(now), AgentExecution.attempts < self.max_attempts)
+            .order_by(AgentExecution.started_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        statement = (
+            update(AgentExecution)
+            .where(AgentExecution.id == candidate)
+            .values(
+                status=AgentStatus.RUNNING,
+                claimed_by=worker_id,
+                lease_expires_at=now + self.lease,
+                attempts=AgentExecution.attempts + 1,
+            )
+            .returning(AgentExecution.id)
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session_factory() as db:
+            execution_id = (await db.execute(statement)).scalar()
+            await db.commit()
+        return execution_id
+
+    async def heartbeat(self, execution_id: UUID, worker_id: str) -> bool:
+        """Extend the lease. False if another worker has taken the execution."""
+        statement = (
+            update(AgentExecution)
+            .where(AgentExecution.id == execution_id, AgentExecution.claimed_by == worker_id)
+            .values(lease_expires_at=self.clock() + self.lease)
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(statement)
+            await db.commit()
+        return result.rowcount == 1
+
+    async def release(self, execution_id: UUID, worker_id: str) -> None:
+        """Hand an unfinished execution back to the queue without using up an attempt."""
+        statement = (
+            update(AgentExecution)
+            .where(
+                AgentExecution.id == execution_id,
+                AgentExecution.claimed_by == worker_id,
+                AgentExecution.status == AgentStatus.RUNNING,
+            )
+            .values(
+                status=AgentStatus.PENDING,
+                claimed_by=None,
+                lease_expires_at=None,
+                attempts=AgentExecution.attempts - 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session_factory() as db:
+            await db.execute(statement)
+            await db.commit()
+
+    async def fail_exhausted(self) -> int:
+        """Fail executions whose last allowed attempt lost its lease."""
+        now = self.clock()
+        statement = (
+            update(AgentExecution)
+            .where(
+                AgentExecution.status == AgentStatus.RUNNING,
+                AgentExecution.lease_expires_at < now,
+                AgentExecution.attempts >= self.max_attempts,
+            )
+            .values(
+                status=AgentStatus.FAILED,
+                error_message=f"Agent worker lost its lease {self.max_attempts} times",
+                completed_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(statement)
+            await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def depth(db: AsyncSession) -> int:
+        """Executions waiting for a worker."""
+        result = await db.execute(
+            select(func.count())
+            .select_from(AgentExecution)
+            .where(AgentExecution.status == AgentStatus.PENDING)
+        )
+        return result.scalar() or 0
+
+
+class AgentJobWorker:
+    """Runs up to `concurrency` claimed executions at a time until stopped."""
+
+    def __init__(
+        self,
+        queue: AgentJobQueue,
+        worker_id: Optional[str] = None,
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        drain_timeout: float = 30.0,
+        runner: Optional[Callable[[UUID], Awaitable[None]]] = None,
+    ):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.drain_timeout = drain_timeout
+        self.runner = runner or (lambda execution_id: run_execution(execution_id, queue.session_factory))
+        self.stopping = asyncio.Event()
+        self.processed = 0
+
+    def stop(self) -> None:
+        """Stop claiming work; executions in progress finish or are released."""
+        self.stopping.set()
+
+    async def run(self) -> None:
+        """Serve the queue until stop() is called."""
+        slots = [asyncio.create_task(self._slot()) for _ in range(self.concurrency)]
+        await self.stopping.wait()
+
+        _, running = await asyncio.wait(slots, timeout=self.drain_timeout)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*slots, return_exceptions=True)
+
+    async def _slot(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                execution_id = await self.queue.claim(self.worker_id)
+                if execution_id is None:
+                    await self.queue.fail_exhausted()
+            except Exception:
+                logger.exception("Failed to claim an agent execution")
+                execution_id = None
+
+            if execution_id is None:
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(execution_id)
+
+    async def _run(self, execution_id: UUID) -> None:
+        """Run one claimed execution, renewing its lease until it finishes."""
+        job = asyncio.create_task(self.runner(execution_id))
+        interval = self.queue.lease.total_seconds() / 3
+        try:
+            while True:
+                done, _ = await asyncio.wait({job}, timeout=interval)
+                if done:
+                    break
+                if not await self._heartbeat(execution_id):
+                    logger.warning(f"Lost lease on agent execution {execution_id}")
+                    job.cancel()
+                    await asyncio.gather(job, return_exceptions=True)
+                    return
+            await job
+            self.processed += 1
+        except asyncio.CancelledError:
+            # Shutting down mid-execution: let another worker pick it up now
+            job.cancel()
+            await asyncio.gather(job, return_exceptions=True)
+            await self.queue.release(execution_id, self.worker_id)
+            raise
+        except Exception:
+            logger.exception(f"Agent execution {execution_id} failed")
+
+    async def _heartbeat(self, execution_id: UUID) -> bool:
+        try:
+            return await self.queue.heartbeat(execution_id, self.worker_id)
+        except Exception:
+            # Keep running; the lease has two more renewals before it lapses
+            logger.exception(f"Failed to renew lease on agent execution {execution_id}")
+            return True
+
+
+agent_job_queue = AgentJobQueue(
+    lease_seconds=settings.agent_lease_seconds,
+    max_attempts=settings.agent_max_attempts,
+)
@@ -0,0 +1,407 @@
+"""
+MCP Connection Manager
+
+Tool calls to registered MCP servers over MCP's streamable HTTP transport
+(JSON-RPC 2.0 messages POSTed to the server's endpoint):
+
+- MCPSession: one per MCPServer. Keeps a pooled HTTP client and the
+  session established by the initialize handshake, so tool calls reuse
+  both instead of setting them up per call. A session the server has
+  forgotten (404) is re-initialized transparently.
+- CircuitBreaker: after repeated failures a server's calls fail fast
+  for a while, then a single trial call decides whether it is back.
+- MCPConnectionManager: sessions by server, plus a periodic ping of every
+  registered server that updates its status and last_health_check. Calls
+  to a server whose last health check failed are refused, and sessions
+  of servers that were removed or deactivated are closed.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+import httpx
+from sqlalchemy import select, update
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.mcp import MCPServer, MCPServerStatus
+
+logger = logging.getLogger(__name__)
+
+MCP_PROTOCOL_VERSION = "2025-03-26"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MCPError(Exception):
+    """An MCP request could not be completed."""
+
+
+class MCPToolError(MCPError):
+    """The server answered with a JSON-RPC error, e.g. an unknown tool."""
+
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+
+class MCPServerError(MCPError):
+    """The server could not be reached or gave an invalid response."""
+
+
+class MCPServerUnavailable(MCPError):
+    """The server's circuit breaker is open; the call was not attempted."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _SessionExpired(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Closed until `failure_threshold` consecutive failures, then open for
+    `reset_timeout` seconds. After that it is half-open: one trial call
+    goes through, and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self.trial:
+            return False
+        self.trial = True
+        return True
+
+    def trip(self) -> None:
+        """Open the breaker now, e.g. for a server known to be down."""
+        self.trial = False
+        self.opened_at = self.clock()
+
+    def release(self) -> None:
+        """Give up a trial call that ended without an outcome (cancelled)."""
+        self.trial = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+
+class MCPSession:
+    """Pooled connection and MCP session to one server endpoint."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.endpoint = endpoint
+        self.http_client = http_client or httpx.AsyncClient(
+            timeout=settings.mcp_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=settings.mcp_max_connections_per_server,
+                max_keepalive_connections=settings.mcp_max_connections_per_server,
+            ),
+        )
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=settings.mcp_breaker_failure_threshold,
+            reset_timeout=settings.mcp_breaker_reset_seconds,
+        )
+        self.session_id: Optional[str] = None
+        self.initialized = False
+        self.init_lock = asyncio.Lock()
+        self.ids = itertools.count(1)
+        self.calls = 0
+        self.failures = 0
+        self.initializations = 0
+
+    async def _post(self, message: Dict[str, Any]) -> httpx.Response:
+        headers = {"Accept": "application/json, text/event-stream"}
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+            headers["MCP-Protocol-Version"] = MCP_PROTOCOL_VERSION
+        response = await self.http_client.post(self.endpoint, json=message, headers=headers)
+        if response.status_code == 404 and self.session_id:
+            raise _SessionExpired()
+        response.raise_for_status()
+        return response
+
+    def _reply(self, response: httpx.Response, request_id: int) -> Dict[str, Any]:
+        """The JSON-RPC response to request_id, from a JSON or SSE body."""
+        try:
+            if response.headers.get("content-type", "").startswith("text/event-stream"):
+                for line in response.text.splitlines():
+                    if line.startswith("data:"):
+                        message = json.loads(line[5:])
+                        if message.get("id") == request_id:
+                            break
+                else:
+                    raise MCPServerError("Event stream ended without a response")
+            else:
+                message = response.json()
+        except ValueError as exc:
+            raise MCPServerError(f"Invalid response from MCP server: {exc}") from exc
+
+        if "error" in message:
+            error = message["error"]
+            raise MCPToolError(error.get("message", "MCP request failed"), error.get("code"))
+        return message.get("result", {})
+
+    async def _rpc(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = next(self.ids)
+        response = await self._post({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        return self._reply(response, request_id)
+
+    async def _initialize(self, stale: Optional[str] = None) -> None:
+        async with self.init_lock:
+            # Another caller already replaced the session that expired
+            if self.initialized and self.session_id != stale:
+                return
+            self.initialized = False
+            self.session_id = None
+            request_id = next(self.ids)
+            response = await self._post({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "initialize",
+                "params": {
+                    "protocolVersion": MCP_PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": {"name": settings.app_name, "version": settings.app_version},
+                },
+            })
+            self._reply(response, request_id)
+            self.session_id = response.headers.get("mcp-session-id")
+            await self._post({"jsonrpc": "2.0", "method": "notifications/initialized"})
+            self.initialized = True
+            self.initializations += 1
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Send a request on the session, establishing it first if needed."""
+        if not self.initialized:
+            await self._initialize()
+        session_id = self.session_id
+        try:
+            return await self._rpc(method, params or {})
+        except _SessionExpired:
+            await self._initialize(stale=session_id)
+            return await self._rpc(method, params or {})
+
+    async def _guarded(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """request(), with the outcome recorded on the breaker."""
+        try:
+            result = await self.request(method, params)
+        except MCPToolError:
+            # The server is up and answered; the request itself was wrong
+            self.breaker.record_success()
+            raise
+        except (httpx.HTTPError, _SessionExpired, MCPServerError) as exc:
+            self.failures += 1
+            self.breaker.record_failure()
+            raise MCPServerError(f"MCP server {self.endpoint} failed: {exc!r}") from exc
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a tool, failing fast while the server's breaker is open."""
+        if not self.breaker.allow():
+            raise MCPServerUnavailable(
+                f"MCP server {self.endpoint} is failing, not calling it",
+                self.breaker.retry_after(),
+            )
+        self.calls += 1
+        return await self._guarded("tools/call", {"name": name, "arguments": arguments})
+
+    async def ping(self) -> bool:
+        """Health check; runs even while the breaker is open, and feeds it."""
+        try:
+            await self._guarded("ping", {})
+        except MCPServerError:
+            return False
+        except MCPToolError:
+            # Answered, just without ping support
+            return True
+        return True
+
+    async def close(self) -> None:
+        await self.http_client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "breaker": self.breaker.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "initializations": self.initializations,
+        }
+
+
+class MCPConnectionManager:
+    """Sessions to registered MCP servers and their periodic health checks."""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        health_check_interval: float = 30.0,
+        session_class: Callable[[str], MCPSession] = MCPSession,
+        clock: Callable[[], datetime] = utcnow,
+    ):
+        self.session_factory = session_factory
+        self.health_check_interval = health_check_interval
+        self.session_class = session_class
+        self.clock = clock
+        self.sessions: Dict[UUID, MCPSession] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    async def session(
+        self,
+        server_id: UUID,
+        endpoint: str,
+        status: Optional[MCPServerStatus] = None,
+    ) -> MCPSession:
+        """
+        The session for a server, replacing it if the endpoint changed.
+
+        A new session for a server in ERROR status starts with its
+        breaker open, so it is not called until it answers a ping.
+        """
+        session = self.sessions.get(server_id)
+        if session is not None and session.endpoint != endpoint:
+            await session.close()
+            session = None
+        if session is None:
+            session = self.sessions[server_id] = self.session_class(endpoint)
+            if status == MCPServerStatus.ERROR:
+                session.breaker.trip()
+        return session
+
+    async def evict(self, server_id: UUID) -> None:
+        """Close the session of a server that was removed or deactivated."""
+        session = self.sessions.pop(server_id, None)
+        if session is not None:
+            await session.close()
+
+    async def call_tool(self, server: MCPServer, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a tool on a registered server through its pooled session."""
+        if server.status == MCPServerStatus.ERROR:
+            raise MCPServerUnavailable(
+                f"MCP server {server.endpoint} failed its last health check",
+                self.health_check_interval,
+            )
+        session = await self.session(server.id, server.endpoint, server.status)
+        return await session.call_tool(name, arguments)
+
+    async def check_health(self) -> Dict[UUID, bool]:
+        """
+        Ping every server not marked inactive and record the outcome.
+
+        Sessions of servers no longer among them are closed.
+        """
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(MCPServer.id, MCPServer.endpoint, MCPServer.status)
+                .where(MCPServer.status != MCPServerStatus.INACTIVE)
+            )
+            servers = result.all()
+
+        checked = {server_id for server_id, _, _ in servers}
+        for server_id in [server_id for server_id in self.sessions if server_id not in checked]:
+            await self.evict(server_id)
+        if not servers:
+            return {}
+
+        # Ping without holding a database connection
+        sessions = [await self.session(server_id, endpoint, status) for server_id, endpoint, status in servers]
+        healthy = await asyncio.gather(*(session.ping() for session in sessions))
+
+        checked_at = self.clock()
+        async with self.session_factory() as db:
+            for (server_id, _, _), ok in zip(servers, healthy):
+                await db.execute(
+                    update(MCPServer)
+                    .where(MCPServer.id == server_id)
+                    .values(
+                        status=MCPServerStatus.ACTIVE if ok else MCPServerStatus.ERROR,
+                        last_health_check=checked_at,
+                    )
+                )
+            await db.commit()
+        return {server_id: ok for (server_id, _, _), ok in zip(servers, healthy)}
+
+    async def _health_loop(self) -> None:
+        while True:
+            try:
+                await self.check_health()
+            except Exception:
+                logger.exception("MCP server health check failed")
+            await asyncio.sleep(self.health_check_interval)
+
+    def start(self) -> None:
+        """Start periodic health checks."""
+        if self.health_check_interval > 0 and self.task is None:
+            self.task = asyncio.create_task(self._health_loop(), name="mcp-health-check")
+
+    async def stop(self) -> None:
+        """Stop health checks and close every session."""
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        sessions, self.sessions = list(self.sessions.values()), {}
+        for session in sessions:
+            await session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {str(server_id): session.stats() for server_id, session in self.sessions.items()}
+
+
+mcp_connections = MCPConnectionManager(
+    health_check_interval=settings.mcp_health_check_interval_seconds,
+)
@@ -0,0 +1,256 @@
+"""
+AI Response Cache
+
+Content-addressed cache of model completions. Keys are a hash of
+everything that determines the output (provider, model, prompt,
+temperature, max_tokens and any extra request parameters), so an
+unchanged prompt returns the stored completion without a model call.
+
+- MemoryResponseCache: LRU in this process.
+- SQLiteResponseCache: table in a SQLite file shared by workers on a host.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Trim the SQLite cache to its size cap once every this many writes
+SQLITE_TRIM_INTERVAL = 100
+
+# Seconds a lookup or write waits for another process's write lock
+SQLITE_BUSY_TIMEOUT = 0.5
+
+# A hit refreshes its row's LRU timestamp at most this often (seconds)
+SQLITE_TOUCH_INTERVAL = 60
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_response_cache (
+    key TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    latency REAL NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def cache_key(
+    provider: str,
+    model: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    **extra: Any
+) -> str:
+    """Stable digest of the inputs that determine a completion."""
+    raw = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "prompt": prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "extra": extra,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCacheBackend(ABC):
+    """Interface for completion stores, with hit/miss accounting."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.latency_saved = 0.0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored {"content", "latency"} for key, or None."""
+
+    @abstractmethod
+    async def set(self, key: str, content: str, latency: float) -> None:
+        """Store a completion and how long the model took to produce it."""
+
+    async def close(self) -> None:
+        """Release resources held by the backend."""
+
+    def record_hit(self, entry: Dict[str, Any]) -> None:
+        self.hits += 1
+        self.latency_saved += entry["latency"]
+
+    def stats(self) -> dict:
+        """Hit/miss counts and model time saved."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+        }
+
+
+class MemoryResponseCache(ResponseCacheBackend):
+    """In-process LRU of completions with a TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        # key -> (entry, expires_at), least recently used first
+        self.entries: OrderedDict[str, tuple[Dict[str, Any], float]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self.entries.get(key)
+        if item is None or item[1] <= self.clock():
+            self.entries.pop(key, None)
+            return None
+        self.entries.move_to_end(key)
+        return item[0]
+
+    async def set(self, key: str, content: str, latency: float) -> None:
+        entry = {"content": content, "latency": latency}
+        self.entries[key] = (entry, self.clock() + self.ttl_seconds)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "size": len(self.entries)}
+
+
+class SQLiteResponseCache(ResponseCacheBackend):
+    """
+    Completions in a SQLite file shared by processes on one host.
+
+    File I/O runs in a worker thread, off the event loop. A store locked
+    by another process past the busy timeout counts as a miss (or a
+    skipped write) instead of holding up the model call. Lookups only
+    refresh a row's LRU timestamp when it is older than
+    SQLITE_TOUCH_INTERVAL, so most hits take no write lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400,
+        clock: Callable[[], float] = time.time,
+        busy_timeout: float = SQLITE_BUSY_TIMEOUT,
+    ):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.writes = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent without an fsync per commit; a cache can
+        # afford to lose its last writes on power failure
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SQLITE_SCHEMA)
+        # Row count as of the last trim, so stats() needs no query
+        self.size = self.conn.execute("SELECT count(*) FROM ai_response_cache").fetchone()[0]
+
+    def _get(self, key: str, now: float) -> Optional[tuple]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT content, latency, accessed FROM ai_response_cache "
+                "WHERE key = ? AND created > ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is not None and now - row[2] >= SQLITE_TOUCH_INTERVAL:
+                self.conn.execute("UPDATE ai_response_cache SET accessed = ? WHERE key = ?", (now, key))
+        return row
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = await asyncio.to_thread(self._get, key, self.clock())
+        except sqlite3.OperationalError as exc:
+            self.errors += 1
+            logger.warning(f"AI response cache unavailable, treating lookup as a miss: {exc}")
+            return None
+        if row is None:
+            return None
+        return {"content": row[0], "latency": row[1]}
+
+    def _set(self, key: str, content: str, latency: float, now: float) -> None:
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO ai_response_cache (key, content, latency, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "content = excluded.content, latency = excluded.latency, "
+                "created = excluded.created, accessed = excluded.accessed",
+                (key, content, latency, now, now),
+            )
+            self.writes += 1
+            if self.writes % SQLITE_TRIM_INTERVAL == 0:
+                self._trim(now)
+
+    async def set(self, key: str, content: str, latency: float) -> None:
+        try:
+            await asyncio.to_thread(self._set, key, content, latency, self.clock())
+        except sqlite3.OperationalError as exc:
+            self.errors += 1
+            logger.warning(f"AI response cache unavailable, completion not stored: {exc}")
+
+    def _trim(self, now: float) -> None:
+        """Drop expired rows, then least recently used rows over the cap."""
+        self.conn.execute(
+            "DELETE FROM ai_response_cache WHERE created <= ?",
+            (now - self.ttl_seconds,),
+        )
+        self.conn.execute(
+            "DELETE FROM ai_response_cache WHERE key IN ("
+            "SELECT key FROM ai_response_cache ORDER BY accessed DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self.size = self.conn.execute("SELECT count(*) FROM ai_response_cache").fetchone()[0]
+
+    async def close(self) -> None:
+        self.conn.close()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "size": self.size, "errors": self.errors}
+
+
+def create_response_cache(
+    backend: str = "none",
+    max_entries: int = 1000,
+    ttl_seconds: float = 86400,
+    sqlite_path: Optional[str] = None,
+) -> Optional[ResponseCacheBackend]:
+    """Build the configured response cache, or None when caching is off."""
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryResponseCache(max_entries, ttl_seconds)
+    if backend == "sqlite":
+        return SQLiteResponseCache(sqlite_path, max_entries, ttl_seconds)
+    raise ValueError(f"Unknown AI response cache backend: {backend}")
@@ -4,7 +4,8 @@ from sqlalchemy import select
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.services.base import BaseService
-from app.core.security import get_password_hash, verify_password
+from app.services.identity_cache import user_identity_cache
+from app.core.security import get_password_hash_async, verify_password_async
 
 
 class UserService(BaseService[User, UserCreate, UserUpdate]):
@@ -30,13 +31,25 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
     async def create(self, obj_in: UserCreate) -> User:
         """Create a new user with hashed password."""
         user_data = obj_in.model_dump()
-        user_data["hashed_password"] = get_password_hash(user_data.pop("password"))
+        user_data["hashed_password"] = await get_password_hash_async(user_data.pop("password"))
         db_obj = User(**user_data)
         self.db.add(db_obj)
         await self.db.commit()
         await self.db.refresh(db_obj)
         return db_obj
 
+    async def update(self, id: str, obj_in: UserUpdate) -> Optional[User]:
+        """Update a user and drop its cached identity."""
+        user = await super().update(id, obj_in)
+        user_identity_cache.invalidate(id)
+        return user
+
+    async def delete(self, id: str) -> bool:
+        """Delete a user and drop its cached identity."""
+        deleted = await super().delete(id)
+        user_identity_cache.invalidate(id)
+        return deleted
+
     async def authenticate(
         self, email: str, password: str
     ) -> Optional[User]:
@@ -44,7 +57,7 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         user = await self.get_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
@@ -0,0 +1,31 @@
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ai_activity_daily_rollup',
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('tool_used', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('activity_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lines_of_code_estimate', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('project_id', 'day', 'tool_used', 'category'),
+    )
+    op.create_index('ix_ai_activity_daily_rollup_day', 'ai_activity_daily_rollup', ['day'])
+    op.create_foreign_key(
+        'fk_ai_activity_daily_rollup_project', 'ai_activity_daily_rollup', 'projects',
+        ['project_id'], ['id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ai_activity_daily_rollup')
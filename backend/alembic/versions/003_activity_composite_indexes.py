@@ -0,0 +1,49 @@
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction; building without it
+    # would block writes to ai_activities for the whole build.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_ai_activities_project_id_timestamp', 'ai_activities',
+            ['project_id', sa.text('timestamp DESC')], postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_ai_activities_timestamp', 'ai_activities',
+            ['timestamp'], postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_ai_activities_tool_used_timestamp', 'ai_activities',
+            ['tool_used', 'timestamp'], postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_ai_activities_category_timestamp', 'ai_activities',
+            ['category', 'timestamp'], postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_pipeline_executions_project_id_started_at', 'pipeline_executions',
+            ['project_id', 'started_at'], postgresql_concurrently=True
+        )
+
+        # Superseded by the composites above, which share the same leading column
+        op.drop_index('ix_ai_activities_project_id', 'ai_activities', postgresql_concurrently=True)
+        op.drop_index('ix_pipeline_executions_project_id', 'pipeline_executions', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index('ix_pipeline_executions_project_id', 'pipeline_executions', ['project_id'])
+    op.create_index('ix_ai_activities_project_id', 'ai_activities', ['project_id'])
+
+    op.drop_index('ix_pipeline_executions_project_id_started_at', 'pipeline_executions')
+    op.drop_index('ix_ai_activities_category_timestamp', 'ai_activities')
+    op.drop_index('ix_ai_activities_tool_used_timestamp', 'ai_activities')
+    op.drop_index('ix_ai_activities_timestamp', 'ai_activities')
+    op.drop_index('ix_ai_activities_project_id_timestamp', 'ai_activities')
@@ -0,0 +1,28 @@
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('agent_executions', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('agent_executions', sa.Column('claimed_by', sa.String(), nullable=True))
+    op.add_column('agent_executions', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_agent_executions_status_started_at', 'agent_executions',
+            ['status', 'started_at'], postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_agent_executions_status_started_at', 'agent_executions')
+
+    op.drop_column('agent_executions', 'lease_expires_at')
+    op.drop_column('agent_executions', 'claimed_by')
+    op.drop_column('agent_executions', 'attempts')
@@ -0,0 +1,24 @@
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('agent_executions', sa.Column('batch_id', postgresql.UUID(as_uuid=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_agent_executions_batch_id', 'agent_executions',
+            ['batch_id'], postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_agent_executions_batch_id', 'agent_executions')
+    op.drop_column('agent_executions', 'batch_id')
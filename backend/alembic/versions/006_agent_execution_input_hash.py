@@ -0,0 +1,30 @@
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('agent_executions', sa.Column('input_hash', sa.String(length=64), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_agent_executions_input_hash_started_at', 'agent_executions',
+            ['input_hash', 'started_at'], postgresql_concurrently=True
+        )
+        # Statuses are stored by enum name
+        op.create_index(
+            'uq_agent_executions_active_input', 'agent_executions',
+            ['project_id', 'input_hash'], unique=True, postgresql_concurrently=True,
+            postgresql_where=sa.text("batch_id IS NULL AND status IN ('PENDING', 'RUNNING')")
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_agent_executions_active_input', 'agent_executions')
+    op.drop_index('ix_agent_executions_input_hash_started_at', 'agent_executions')
+    op.drop_column('agent_executions', 'input_hash')
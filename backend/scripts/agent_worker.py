@@ -0,0 +1,52 @@
+"""
+Run queued agent executions from the database.
+Run with: python scripts/agent_worker.py [--concurrency N] [--worker-id ID]
+
+Start as many of these as needed on any host that can reach the database;
+the API must run with AGENT_QUEUE_BACKEND=database so it leaves executions
+to them. SIGINT/SIGTERM stop claiming new work and let running executions
+finish for up to AGENT_DRAIN_TIMEOUT_SECONDS.
+"""
+import argparse
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.ai_client import close_ai_client
+from app.services.github_client import close_github_client
+from app.services.job_queue import AgentJobWorker, agent_job_queue
+
+
+async def main(concurrency: int, worker_id: str | None):
+    """Serve the agent queue until signalled."""
+    worker = AgentJobWorker(
+        agent_job_queue,
+        worker_id=worker_id,
+        concurrency=concurrency,
+        poll_interval=settings.agent_poll_interval_seconds,
+        drain_timeout=settings.agent_drain_timeout_seconds,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    print(f"Agent worker {worker.worker_id} started with {concurrency} slots")
+    try:
+        await worker.run()
+    finally:
+        await close_ai_client()
+        await close_github_client()
+    print(f"Agent worker {worker.worker_id} stopped after {worker.processed} executions")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run agent executions from the database queue")
+    parser.add_argument("--concurrency", type=int, default=settings.agent_workers, help="Executions run at once")
+    parser.add_argument("--worker-id", help="Name recorded on claimed executions (default host:pid)")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.worker_id))
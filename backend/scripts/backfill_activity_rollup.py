@@ -0,0 +1,41 @@
+"""
+Backfill the ai_activity_daily_rollup table from raw AI activities.
+Run with: python scripts/backfill_activity_rollup.py [--project-id ID] [--since YYYY-MM-DD]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import AsyncSessionLocal, init_db
+from app.services.activity_rollup_service import ActivityRollupService
+
+
+async def main(project_id: str | None, since: date | None):
+    """Rebuild rollup rows for the requested scope."""
+    print("Starting activity rollup backfill...")
+
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        try:
+            written = await ActivityRollupService(db).backfill(
+                project_id=project_id,
+                since=since,
+            )
+            print(f"Backfill completed: {written} rollup rows written")
+        except Exception as e:
+            print(f"Error during backfill: {e}")
+            await db.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the AI activity daily rollup")
+    parser.add_argument("--project-id", help="Only rebuild rows for this project")
+    parser.add_argument("--since", type=date.fromisoformat, help="Only rebuild days on or after this date")
+    args = parser.parse_args()
+    asyncio.run(main(args.project_id, args.since))
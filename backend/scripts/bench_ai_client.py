@@ -0,0 +1,106 @@
+"""
+Benchmark for AI client connection reuse.
+
+Calls a local stub provider sequentially, first opening a new
+httpx.AsyncClient per call (the old behaviour) and then through one pooled
+AIClient, and reports the mean per-call time and connections opened. The
+stub speaks plain HTTP on loopback, so the gap shown is only the TCP
+setup and client construction; against the real APIs each fresh call also
+pays a TLS handshake and a network round trip.
+
+Run with: python scripts/bench_ai_client.py [--calls 500]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from app.core.config import settings
+from app.services.ai_client import AIClient
+
+REPLY = json.dumps({
+    "model": "bench",
+    "content": [{"text": "stub reply"}],
+    "usage": {"input_tokens": 10, "output_tokens": 5},
+}).encode()
+
+
+class StubProvider:
+    """Loopback HTTP/1.1 server answering every request with an Anthropic-style reply."""
+
+    def __init__(self):
+        self.connections = 0
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    async def stop(self):
+        self.server.close()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while await reader.readline():
+                length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+                    + f"content-length: {len(REPLY)}\r\n\r\n".encode()
+                    + REPLY
+                )
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class FreshConnectionAIClient(AIClient):
+    """AIClient that opens a new HTTP client for every call."""
+
+    async def call_anthropic(self, message: str, **kwargs):
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            self.http = client
+            return await super().call_anthropic(message, **kwargs)
+
+
+async def per_call_ms(client: AIClient, calls: int) -> float:
+    """Mean milliseconds per sequential call_model."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        await client.call_model("Summarize this diff", provider="anthropic")
+    return (time.perf_counter() - start) / calls * 1000
+
+
+async def main(calls: int):
+    """Report per-call overhead with and without connection reuse."""
+    provider = StubProvider()
+    settings.anthropic_base_url = await provider.start()
+    settings.anthropic_api_key = "bench"
+
+    print(f"{'client':>8} {'ms_per_call':>12} {'connections':>12}")
+    for name, client in [("fresh", FreshConnectionAIClient()), ("pooled", AIClient())]:
+        provider.connections = 0
+        ms = await per_call_ms(client, calls)
+        await client.close()
+        print(f"{name:>8} {ms:>12.3f} {provider.connections:>12}")
+
+    await provider.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls))
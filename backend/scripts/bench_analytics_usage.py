@@ -0,0 +1,120 @@
+"""
+Benchmark for the /analytics/usage aggregation.
+
+Seeds the configured database with growing numbers of AI activities and
+measures latency and peak Python memory of AIActivityService.get_statistics.
+Because the aggregation runs as GROUP BY in the database, both numbers should
+stay flat as the table grows.
+
+Run with: python scripts/bench_analytics_usage.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, insert
+from app.core.database import AsyncSessionLocal, init_db
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.models.project import Project
+from app.models.ai_activity import AIActivity, AITool, ActivityCategory
+from app.services.ai_activity_service import AIActivityService
+
+BATCH_SIZE = 5000
+PROMPT = "Generate a REST API for user management " * 20
+RESPONSE = "Here is a FastAPI implementation... " * 100
+
+
+async def seed_fixture(db) -> tuple[uuid.UUID, uuid.UUID]:
+    """Create a throwaway user and project to attach activities to."""
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        email=f"bench-{suffix}@example.com",
+        username=f"bench-{suffix}",
+        hashed_password=get_password_hash("Bench123!"),
+    )
+    db.add(user)
+    await db.flush()
+
+    project = Project(
+        name=f"Bench {suffix}",
+        repository_url=f"https://github.com/bench/{suffix}",
+        created_by=user.id,
+    )
+    db.add(project)
+    await db.commit()
+    return user.id, project.id
+
+
+async def grow_table(db, user_id, project_id, count: int):
+    """Insert `count` activities in bulk batches."""
+    tools = list(AITool)
+    categories = list(ActivityCategory)
+
+    for offset in range(0, count, BATCH_SIZE):
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "project_id": project_id,
+                "user_id": user_id,
+                "tool_used": random.choice(tools),
+                "category": random.choice(categories),
+                "prompt": PROMPT,
+                "response": RESPONSE,
+            }
+            for _ in range(min(BATCH_SIZE, count - offset))
+        ]
+        await db.execute(insert(AIActivity), rows)
+    await db.commit()
+
+
+async def measure(db, project_id, repeats: int = 5) -> tuple[float, float]:
+    """Return (median latency ms, peak traced memory KiB) for get_statistics."""
+    service = AIActivityService(db)
+    timings = []
+
+    tracemalloc.start()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await service.get_statistics(project_id=project_id, days=30)
+        timings.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return timings[len(timings) // 2], peak / 1024
+
+
+async def main(sizes: list[int]):
+    """Grow the table to each size and report the aggregation cost."""
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        user_id, project_id = await seed_fixture(db)
+        try:
+            print(f"{'rows':>10} {'latency_ms':>12} {'peak_kib':>10}")
+            current = 0
+            for size in sorted(sizes):
+                await grow_table(db, user_id, project_id, size - current)
+                current = size
+                latency, peak = await measure(db, project_id)
+                print(f"{size:>10} {latency:>12.2f} {peak:>10.1f}")
+        finally:
+            await db.execute(delete(AIActivity).where(AIActivity.project_id == project_id))
+            await db.execute(delete(Project).where(Project.id == project_id))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes))
@@ -0,0 +1,114 @@
+"""
+Benchmark for the database agent queue.
+
+Loads a SQLite file with pending executions, then drains it with 1, 2 and
+4 worker processes. Each execution stands in for a model call by sleeping,
+so throughput should grow with the number of processes until the claim
+query becomes the bottleneck.
+
+Run with: python scripts/bench_job_queue.py [--executions 200] [--latency 0.2] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.models.agent import AgentExecution, AgentStatus
+from app.services.job_queue import AgentJobQueue, AgentJobWorker
+
+
+# Lets the PostgreSQL-typed model create its table in SQLite
+@compiles(postgresql.UUID, "sqlite")
+def compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+def sessions_for(path: str) -> async_sessionmaker:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 30})
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def load(path: str, executions: int) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        await conn.run_sync(lambda c: AgentExecution.__table__.create(c))
+    sessions = async_sessionmaker(engine, class_=AsyncSession)
+    async with sessions() as db:
+        db.add_all(
+            AgentExecution(
+                id=uuid.uuid4(),
+                project_id=uuid.uuid4(),
+                agent_type="code-reviewer",
+                task_description="Review",
+                status=AgentStatus.PENDING,
+            )
+            for _ in range(executions)
+        )
+        await db.commit()
+    await engine.dispose()
+
+
+async def serve(path: str, concurrency: int, latency: float) -> int:
+    """Work the queue until it stays empty; return executions run."""
+    sessions = sessions_for(path)
+
+    async def runner(execution_id):
+        await asyncio.sleep(latency)
+        async with sessions() as db:
+            execution = await db.get(AgentExecution, execution_id)
+            execution.status = AgentStatus.COMPLETED
+            await db.commit()
+
+    queue = AgentJobQueue(sessions)
+    worker = AgentJobWorker(queue, concurrency=concurrency, poll_interval=0.05, runner=runner)
+    task = asyncio.create_task(worker.run())
+    while True:
+        await asyncio.sleep(0.2)
+        async with sessions() as db:
+            if await queue.depth(db) == 0:
+                break
+    worker.stop()
+    await task
+    return worker.processed
+
+
+def process(path: str, concurrency: int, latency: float) -> int:
+    return asyncio.run(serve(path, concurrency, latency))
+
+
+def main(executions: int, latency: float, concurrency: int) -> None:
+    print(f"{executions} executions, {latency * 1000:.0f} ms each, {concurrency} slots per process")
+    for processes in (1, 2, 4):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "queue.db")
+            asyncio.run(load(path, executions))
+
+            start = time.perf_counter()
+            with multiprocessing.Pool(processes) as pool:
+                counts = pool.starmap(process, [(path, concurrency, latency)] * processes)
+            elapsed = time.perf_counter() - start
+
+        print(
+            f"  {processes} process(es): {sum(counts)} run in {elapsed:.2f}s "
+            f"({sum(counts) / elapsed:.0f}/s)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the database agent queue")
+    parser.add_argument("--executions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per execution")
+    parser.add_argument("--concurrency", type=int, default=4, help="Slots per worker process")
+    args = parser.parse_args()
+    main(args.executions, args.latency, args.concurrency)
@@ -0,0 +1,67 @@
+"""
+Benchmark for the rate limit backends.
+
+Measures the per-request cost of the in-memory and SQLite backends, then
+starts several processes hitting one SQLite file to check that together
+they are held to a single limit.
+
+Run with: python scripts/bench_rate_limit_backends.py [--calls 50000] [--workers 4]
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.middleware.rate_limit import RateLimiter
+from app.middleware.rate_limit_backends import SQLiteRateLimiter
+
+MAX_REQUESTS = 100
+WINDOW_SECONDS = 60
+KEYS = 1000
+
+
+def per_call_us(limiter, calls: int) -> float:
+    """Average microseconds per is_allowed call across KEYS keys."""
+    start = time.perf_counter()
+    for i in range(calls):
+        limiter.is_allowed(f"ip:{i % KEYS}", MAX_REQUESTS, WINDOW_SECONDS)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def worker(path: str, attempts: int) -> int:
+    """Hit one shared key from a separate process; return allowed count."""
+    limiter = SQLiteRateLimiter(path)
+    return sum(
+        limiter.is_allowed("user:shared", MAX_REQUESTS, WINDOW_SECONDS)
+        for _ in range(attempts)
+    )
+
+
+def main(calls: int, workers: int):
+    """Report per-call latency and the limit enforced across processes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'backend':>10} {'us_per_call':>12}")
+        print(f"{'memory':>10} {per_call_us(RateLimiter(), calls):>12.2f}")
+        sqlite_path = str(Path(tmp) / "bench.db")
+        print(f"{'sqlite':>10} {per_call_us(SQLiteRateLimiter(sqlite_path), calls):>12.2f}")
+
+        shared_path = str(Path(tmp) / "shared.db")
+        SQLiteRateLimiter(shared_path)
+        with multiprocessing.Pool(workers) as pool:
+            allowed = pool.starmap(worker, [(shared_path, MAX_REQUESTS)] * workers)
+        print(
+            f"\n{workers} processes x {MAX_REQUESTS} requests against a limit of "
+            f"{MAX_REQUESTS}: {sum(allowed)} allowed {allowed}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.calls, args.workers)
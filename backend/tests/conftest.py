@@ -1,7 +1,9 @@
 import pytest
 import asyncio
 from typing import AsyncGenerator, Generator
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.pool import StaticPool
 from httpx import AsyncClient, ASGITransport
 
@@ -34,8 +36,25 @@ TestSessionLocal = async_sessionmaker(
 )
 
 
+@pytest.fixture(scope="module")
+def sqlite_postgres_types():
+    """
+    Render PostgreSQL-only column types in SQLite DDL, so the models can
+    create their tables in SQLite test databases.
+
+    The renderings are registered for the requesting module only and
+    removed afterwards, so no other test sees SQLite compile differently.
+    """
+    renderings = {postgresql.UUID: "CHAR(32)", postgresql.ARRAY: "JSON"}
+    for type_, ddl in renderings.items():
+        compiles(type_, "sqlite")(lambda element, compiler, ddl=ddl, **kw: ddl)
+    yield
+    for type_ in renderings:
+        del type_._compiler_dispatcher.specs["sqlite"]
+
+
 @pytest.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
+async def db_session(sqlite_postgres_types) -> AsyncGenerator[AsyncSession, None]:
     """Create a test database session."""
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
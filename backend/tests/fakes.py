@@ -0,0 +1,472 @@
+"""Lightweight stand-ins for database sessions and external services used by unit tests."""
+import asyncio
+import hashlib
+import json
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from sqlalchemy.dialects import postgresql, sqlite
+
+DIALECTS = {
+    "postgresql": postgresql.dialect(),
+    "sqlite": sqlite.dialect(),
+}
+
+
+class FakeClock:
+    """
+    Manually advanced clock; pass the start value each test needs.
+
+    sleep() records the wait and advances the clock instead of waiting.
+    """
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResult:
+    """Minimal stand-in for a SQLAlchemy result."""
+
+    def __init__(self, rows=None, rowcount=0):
+        self.rows = list(rows or [])
+        self.rowcount = rowcount
+
+    def all(self):
+        return self.rows
+
+    def one(self):
+        return self.rows[0]
+
+    def scalar(self):
+        return self.rows[0][0] if self.rows else None
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+    def scalars(self):
+        return self
+
+
+class FakeBind:
+    """Engine stand-in exposing only the dialect."""
+
+    def __init__(self, dialect_name: str):
+        self.dialect = DIALECTS[dialect_name]
+
+
+class FakeSession:
+    """Records executed statements and returns canned results in order."""
+
+    def __init__(self, *results, dialect: str = "postgresql"):
+        self.results = [
+            r if isinstance(r, FakeResult) else FakeResult(r) for r in results
+        ]
+        self.statements = []
+        self.added = []
+        self.deleted = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.bind = FakeBind(dialect)
+
+    def get_bind(self):
+        return self.bind
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return self.results.pop(0) if self.results else FakeResult()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def get(self, model, ident):
+        """Look up an object previously passed to add()."""
+        for obj in self.added:
+            if isinstance(obj, model) and obj.id == ident:
+                return obj
+        return None
+
+    async def delete(self, obj):
+        self.deleted.append(obj)
+
+    async def refresh(self, obj):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    def sql(self, index: int = 0) -> str:
+        """Render an executed statement in this session's dialect."""
+        return str(self.statements[index].compile(dialect=self.bind.dialect))
+
+
+class FakeAIProvider:
+    """
+    Local HTTP/1.1 server answering OpenAI and Anthropic style requests.
+
+    Counts accepted TCP connections and requests so tests can check
+    connection reuse. Bodies are canned; `delay` adds server think time.
+    Requests with "stream": true get `stream_tokens` as server-sent events,
+    one every `token_delay` seconds. Entries in `failures`, each a
+    (status, headers) pair, are answered first, one per request.
+    """
+
+    def __init__(self, delay: float = 0.0, token_delay: float = 0.0):
+        self.delay = delay
+        self.token_delay = token_delay
+        self.stream_tokens = ["Hello", ", ", "world"]
+        self.connections = 0
+        self.requests = []
+        self.server = None
+        self.handlers = set()
+        self.failures = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def start(self) -> str:
+        """Start listening and return the base URL."""
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    async def stop(self):
+        self.server.close()
+        # Idle keep-alive connections would otherwise outlive the test
+        for task in self.handlers:
+            task.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def respond(self, path: str, body: dict) -> dict:
+        if path.endswith("/chat/completions"):
+            return {
+                "model": body.get("model"),
+                "choices": [{"message": {"content": "openai reply"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+            }
+        return {
+            "model": body.get("model"),
+            "content": [{"text": "anthropic reply"}],
+            "usage": {"input_tokens": 10, "output_tokens": 5},
+        }
+
+    def stream_events(self, path: str):
+        if path.endswith("/chat/completions"):
+            for token in self.stream_tokens:
+                yield {"choices": [{"delta": {"content": token}}]}
+            yield "[DONE]"
+            return
+        yield {"type": "message_start", "message": {}}
+        for token in self.stream_tokens:
+            yield {"type": "content_block_delta", "delta": {"type": "text_delta", "text": token}}
+        yield {"type": "message_stop"}
+
+    async def write_stream(self, writer, path: str):
+        """Send SSE events as HTTP chunks, pausing between tokens."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\n"
+            b"transfer-encoding: chunked\r\n\r\n"
+        )
+        for event in self.stream_events(path):
+            data = event if isinstance(event, str) else json.dumps(event)
+            chunk = f"data: {data}\n\n".encode()
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, path, _ = request_line.decode().split(" ", 2)
+
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = json.loads(await reader.readexactly(int(headers.get("content-length", 0))) or b"{}")
+                self.requests.append((path, headers, body))
+
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                finally:
+                    self.in_flight -= 1
+
+                if self.failures:
+                    status, headers = self.failures.pop(0)
+                    payload = b'{"error": {"type": "injected"}}'
+                    extra = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+                    writer.write(
+                        f"HTTP/1.1 {status} Injected\r\ncontent-type: application/json\r\n"
+                        f"{extra}content-length: {len(payload)}\r\n\r\n".encode()
+                        + payload
+                    )
+                    await writer.drain()
+                    continue
+
+                if body.get("stream"):
+                    await self.write_stream(writer, path)
+                    continue
+
+                payload = json.dumps(self.respond(path, body)).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+                    + f"content-length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class FakeGitHub:
+    """
+    Local HTTP/1.1 server answering GitHub REST API requests from `routes`.
+
+    `routes` maps a path such as "/repos/o/r" to the JSON it returns;
+    unknown paths get 404. Responses carry an ETag derived from the body
+    and a fixed Last-Modified, and a request whose If-None-Match matches
+    gets 304 Not Modified. As on GitHub, 304s do not spend the quota that
+    X-RateLimit-* headers report. List bodies are paginated with
+    per_page/page and a Link header, which names the last page unless
+    `link_last` is False.
+    """
+
+    LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    def __init__(self, limit: int = 5000, reset_in: float = 3600, delay: float = 0.0):
+        self.routes = {}
+        self.limit = limit
+        self.remaining = limit
+        self.reset = int(time.time() + reset_in)
+        self.delay = delay
+        self.link_last = True
+        self.connections = 0
+        self.requests = []
+        self.server = None
+        self.handlers = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def start(self) -> str:
+        """Start listening and return the API base URL."""
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        self.server.close()
+        for task in self.handlers:
+            task.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def paths(self):
+        """Paths requested so far, in order."""
+        return [path for _, path, _, _ in self.requests]
+
+    def respond(self, path: str, query: dict, host: str):
+        """(status, body, extra headers) for a GET."""
+        if path not in self.routes:
+            return 404, {"message": "Not Found"}, {}
+        body = self.routes[path]
+        if not isinstance(body, list):
+            return 200, body, {}
+
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        last = max(1, -(-len(body) // per_page))
+        links = []
+        for rel, number in (("next", page + 1), ("last", last)):
+            if page < last and (rel == "next" or self.link_last):
+                link_query = urlencode({**query, "page": number})
+                links.append(f'<http://{host}{path}?{link_query}>; rel="{rel}"')
+        headers = {"link": ", ".join(links)} if links else {}
+        return 200, body[(page - 1) * per_page:page * per_page], headers
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(" ", 2)
+                url = urlsplit(target)
+                query = dict(parse_qsl(url.query))
+
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append((method, url.path, query, headers))
+
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                finally:
+                    self.in_flight -= 1
+
+                status, body, extra = self.respond(url.path, query, headers.get("host", ""))
+                payload = json.dumps(body).encode()
+                etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+                if status == 200 and headers.get("if-none-match") == etag:
+                    status, payload = 304, b""
+                else:
+                    self.remaining = max(0, self.remaining - 1)
+
+                extra.update({
+                    "etag": etag,
+                    "last-modified": self.LAST_MODIFIED,
+                    "x-ratelimit-limit": self.limit,
+                    "x-ratelimit-remaining": self.remaining,
+                    "x-ratelimit-reset": self.reset,
+                })
+                if status == 404:
+                    del extra["etag"], extra["last-modified"]
+                lines = "".join(f"{name}: {value}\r\n" for name, value in extra.items())
+                writer.write(
+                    f"HTTP/1.1 {status} Fake\r\ncontent-type: application/json\r\n"
+                    f"{lines}content-length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class FakeMCPServer:
+    """
+    Local MCP server speaking JSON-RPC over streamable HTTP.
+
+    initialize issues an Mcp-Session-Id that later requests must send;
+    unknown session ids get 404, as after a server restart, which
+    `expire_sessions()` simulates. tools/call answers from `tools` (name
+    to function of the arguments) and unknown tools get a JSON-RPC
+    error. While `failing` is set every request gets a 500. With `sse`
+    set, responses are sent as a server-sent event stream.
+    """
+
+    def __init__(self):
+        self.tools = {"echo": lambda arguments: {"content": [{"type": "text", "text": json.dumps(arguments)}]}}
+        self.sessions = set()
+        self.failing = False
+        self.sse = False
+        self.connections = 0
+        self.requests = []
+        self.server = None
+        self.handlers = set()
+
+    async def start(self) -> str:
+        """Start listening and return the endpoint URL."""
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/mcp"
+
+    async def stop(self):
+        self.server.close()
+        for task in self.handlers:
+            task.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def expire_sessions(self):
+        self.sessions.clear()
+
+    def methods(self):
+        """JSON-RPC methods received so far, in order."""
+        return [message["method"] for message, _ in self.requests]
+
+    def respond(self, message: dict, headers: dict):
+        """(status, reply or None, extra headers)."""
+        method = message["method"]
+        if method == "initialize":
+            session_id = f"session-{len(self.sessions) + 1}-{len(self.requests)}"
+            self.sessions.add(session_id)
+            result = {"protocolVersion": message["params"]["protocolVersion"], "capabilities": {"tools": {}}}
+            return 200, {"jsonrpc": "2.0", "id": message["id"], "result": result}, {"mcp-session-id": session_id}
+        if headers.get("mcp-session-id") not in self.sessions:
+            return 404, None, {}
+        if "id" not in message:
+            return 202, None, {}
+        if method == "ping":
+            return 200, {"jsonrpc": "2.0", "id": message["id"], "result": {}}, {}
+        tool = self.tools.get(message["params"]["name"])
+        if method != "tools/call" or tool is None:
+            error = {"code": -32602, "message": f"Unknown tool: {message['params'].get('name')}"}
+            return 200, {"jsonrpc": "2.0", "id": message["id"], "error": error}, {}
+        result = tool(message["params"]["arguments"])
+        return 200, {"jsonrpc": "2.0", "id": message["id"], "result": result}, {}
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                message = json.loads(await reader.readexactly(int(headers.get("content-length", 0))))
+                self.requests.append((message, headers))
+
+                if self.failing:
+                    status, reply, extra = 500, {"error": "injected"}, {}
+                else:
+                    status, reply, extra = self.respond(message, headers)
+
+                content_type = "application/json"
+                payload = b""
+                if reply is not None:
+                    payload = json.dumps(reply).encode()
+                    if self.sse and status == 200:
+                        content_type = "text/event-stream"
+                        payload = b"event: message\ndata: " + payload + b"\n\n"
+                lines = "".join(f"{name}: {value}\r\n" for name, value in extra.items())
+                writer.write(
+                    f"HTTP/1.1 {status} Fake\r\ncontent-type: {content_type}\r\n"
+                    f"{lines}content-length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,154 @@
+import json
+import uuid
+from datetime import date, datetime
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.database import Base
+from app.models.ai_activity import AIActivity, AITool, ActivityCategory
+from app.models.ai_activity_rollup import AIActivityDailyRollup
+from app.services.activity_rollup_service import ActivityRollupService
+from tests.fakes import FakeResult, FakeSession
+
+
+def make_activity(**overrides) -> AIActivity:
+    """Build an unsaved AI activity."""
+    data = {
+        "project_id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "tool_used": AITool.CLAUDE,
+        "category": ActivityCategory.FEATURE,
+        "prompt": "Generate a REST API",
+        "code_changes": ["app/main.py", "app/api.py"],
+        "timestamp": datetime(2024, 5, 1, 23, 59),
+    }
+    data.update(overrides)
+    return AIActivity(**data)
+
+
+PROJECT_ID = uuid.uuid4()
+
+
+@pytest.fixture
+async def sessions(sqlite_postgres_types):
+    """SQLite database with the activity and rollup tables."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Base.metadata.create_all(
+            c, tables=[AIActivity.__table__, AIActivityDailyRollup.__table__],
+        ))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def add_activities(sessions, *activities):
+    """Insert raw activities, with code changes written as SQLite stores them (JSON)."""
+    async with sessions() as db:
+        for timestamp, tool, code_changes in activities:
+            activity_id = uuid.uuid4()
+            await db.execute(insert(AIActivity).values(
+                id=activity_id,
+                project_id=PROJECT_ID,
+                user_id=PROJECT_ID,
+                tool_used=tool,
+                category=ActivityCategory.FEATURE,
+                prompt="prompt",
+                timestamp=timestamp,
+            ))
+            if code_changes is not None:
+                await db.execute(
+                    text("UPDATE ai_activities SET code_changes = :changes WHERE id = :id"),
+                    {"changes": json.dumps(code_changes), "id": activity_id.hex},
+                )
+        await db.commit()
+
+
+class TestActivityRollupService:
+    """Unit tests for the daily activity rollup."""
+
+    async def test_record_activity_upserts_postgres(self):
+        """Test recording an activity increments its bucket on Postgres."""
+        db = FakeSession()
+        await ActivityRollupService(db).record_activity(make_activity())
+
+        sql = db.sql()
+        assert "INSERT INTO ai_activity_daily_rollup" in sql
+        assert "ON CONFLICT (project_id, day, tool_used, category) DO UPDATE" in sql
+        assert "activity_count = (ai_activity_daily_rollup.activity_count + excluded.activity_count)" in sql
+
+        params = db.statements[0].compile().params
+        assert params["day"] == date(2024, 5, 1)
+        assert params["activity_count"] == 1
+        assert params["lines_of_code_estimate"] == 100
+
+    async def test_record_activity_upserts_sqlite(self):
+        """Test recording an activity uses SQLite's upsert syntax."""
+        db = FakeSession(dialect="sqlite")
+        await ActivityRollupService(db).record_activity(make_activity(code_changes=None))
+
+        assert "ON CONFLICT (project_id, day, tool_used, category) DO UPDATE" in db.sql()
+        assert db.statements[0].compile().params["lines_of_code_estimate"] == 0
+
+    async def test_backfill_rebuilds_from_grouped_activities(self):
+        """Test backfill clears the scope and re-inserts grouped counts."""
+        db = FakeSession(FakeResult(), FakeResult(rowcount=4))
+        written = await ActivityRollupService(db).backfill(since=date(2024, 1, 1))
+
+        assert written == 4
+        assert db.commits == 1
+        assert db.sql(0).startswith("DELETE FROM ai_activity_daily_rollup")
+        insert_sql = db.sql(1)
+        assert "INSERT INTO ai_activity_daily_rollup" in insert_sql
+        assert "FROM ai_activities" in insert_sql
+        assert "GROUP BY ai_activities.project_id, CAST(ai_activities.timestamp AS DATE)" in insert_sql
+
+    async def test_usage_statistics_read_rollup(self):
+        """Test usage statistics are served from the rollup table."""
+        db = FakeSession([
+            (AITool.CLAUDE, ActivityCategory.FEATURE, 40),
+            (AITool.CHATGPT, ActivityCategory.DOCS, 10),
+        ])
+        stats = await ActivityRollupService(db).get_usage_statistics(
+            start_day=date(2024, 1, 1),
+            end_day=date(2024, 1, 31),
+        )
+
+        assert "FROM ai_activity_daily_rollup" in db.sql()
+        assert "ai_activities" not in db.sql().replace("ai_activity_daily_rollup", "")
+        assert stats["total_prompts"] == 50
+        assert stats["prompts_by_tool"] == {"claude": 40, "chatgpt": 10}
+
+    async def test_totals(self):
+        """Test productivity totals come from one aggregate row."""
+        db = FakeSession([(12, 600, 3)])
+        totals = await ActivityRollupService(db).get_totals()
+
+        assert totals == {"total_activities": 12, "lines_of_code": 600, "test_activities": 3}
+        assert "FILTER (WHERE ai_activity_daily_rollup.category =" in db.sql()
+
+    async def test_backfill_runs_on_sqlite(self, sessions):
+        """Test backfill groups activities by day on SQLite."""
+        await add_activities(
+            sessions,
+            (datetime(2024, 5, 1, 9, 0), AITool.CLAUDE, ["a.py", "b.py"]),
+            (datetime(2024, 5, 1, 23, 59), AITool.CLAUDE, None),
+            (datetime(2024, 5, 2, 0, 1), AITool.CLAUDE, ["a.py"]),
+            (datetime(2024, 4, 30, 12, 0), AITool.CHATGPT, ["c.py"]),
+        )
+
+        async with sessions() as db:
+            written = await ActivityRollupService(db).backfill(since=date(2024, 5, 1))
+            result = await db.execute(
+                select(
+                    AIActivityDailyRollup.day,
+                    AIActivityDailyRollup.tool_used,
+                    AIActivityDailyRollup.activity_count,
+                    AIActivityDailyRollup.lines_of_code_estimate,
+                ).order_by(AIActivityDailyRollup.day)
+            )
+
+        assert written == 2
+        assert result.all() == [
+            (date(2024, 5, 1), AITool.CLAUDE, 2, 100),
+            (date(2024, 5, 2), AITool.CLAUDE, 1, 50),
+        ]
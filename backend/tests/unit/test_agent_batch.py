@@ -0,0 +1,180 @@
+import asyncio
+import uuid
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.api.v1 import agents
+from app.core.database import get_db
+from app.models.agent import AgentExecution, AgentStatus
+from app.services.agent_queue import AgentWorkerPool
+from tests.fakes import FakeSession
+
+
+@pytest.fixture
+async def sessions(tmp_path, sqlite_postgres_types):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'batch.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: AgentExecution.__table__.create(c))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class Runner:
+    """Completes executions on release, tracking how many run at once."""
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.running = 0
+        self.max_running = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, execution_id):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await self.release.wait()
+            async with self.sessions() as db:
+                execution = await db.get(AgentExecution, execution_id)
+                execution.status = AgentStatus.COMPLETED
+                await db.commit()
+        finally:
+            self.running -= 1
+
+
+def make_app(sessions) -> FastAPI:
+    app = FastAPI()
+    app.include_router(agents.router, prefix="/api/v1/agents")
+
+    async def db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = db
+    return app
+
+
+def batch(count: int, **extra) -> dict:
+    return {
+        "project_id": str(uuid.uuid4()),
+        "agent_type": "code-reviewer",
+        "task_description": "Review",
+        "inputs": [{"code_content": f"x = {i}", "file_path": f"f{i}.py"} for i in range(count)],
+        **extra,
+    }
+
+
+class TestBatchEndpoints:
+    """Unit tests for POST /agents/batch and GET /agents/batch/{id}."""
+
+    async def test_batch_runs_with_bounded_parallelism(self, sessions, monkeypatch):
+        runner = Runner(sessions)
+        pool = AgentWorkerPool(workers=8, max_queue=20, runner=runner)
+        await pool.start(recover=False)
+        monkeypatch.setattr(agents, "agent_workers", pool)
+
+        async with AsyncClient(transport=ASGITransport(app=make_app(sessions)), base_url="http://test") as c:
+            response = await c.post("/api/v1/agents/batch", json=batch(20, parallelism=3))
+            assert response.status_code == 202
+            batch_id = response.json()["data"]["id"]
+            assert len(response.json()["execution_ids"]) == 20
+
+            await asyncio.sleep(0.05)
+            status = (await c.get(f"/api/v1/agents/batch/{batch_id}")).json()["data"]
+            assert status["total"] == 20
+            assert status["counts"] == {"pending": 20}
+            assert runner.running == 3
+
+            runner.release.set()
+            for _ in range(100):
+                status = (await c.get(f"/api/v1/agents/batch/{batch_id}")).json()["data"]
+                if status["done"]:
+                    break
+                await asyncio.sleep(0.01)
+            await pool.stop()
+
+        assert status["counts"] == {"completed": 20}
+        assert status["done"] is True
+        assert runner.max_running == 3
+
+    async def test_parallelism_capped_by_settings(self, sessions, monkeypatch):
+        monkeypatch.setattr(agents.settings, "agent_batch_parallelism", 2)
+        runner = Runner(sessions)
+        pool = AgentWorkerPool(workers=8, runner=runner)
+        await pool.start(recover=False)
+        monkeypatch.setattr(agents, "agent_workers", pool)
+
+        async with AsyncClient(transport=ASGITransport(app=make_app(sessions)), base_url="http://test") as c:
+            await c.post("/api/v1/agents/batch", json=batch(6, parallelism=50))
+        await asyncio.sleep(0.05)
+
+        assert runner.running == 2
+        runner.release.set()
+        await pool.stop()
+
+    async def test_single_insert_for_whole_batch(self, monkeypatch):
+        monkeypatch.setattr(agents.settings, "agent_queue_backend", "database")
+        session = FakeSession([[0]])
+        app = FastAPI()
+        app.include_router(agents.router, prefix="/api/v1/agents")
+
+        async def db():
+            yield session
+
+        app.dependency_overrides[get_db] = db
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            response = await c.post("/api/v1/agents/batch", json=batch(50))
+
+        assert response.status_code == 202
+        # Queue depth, then the rows
+        assert len(session.statements) == 2
+        assert session.sql(1).startswith("INSERT INTO agent_executions")
+        assert session.commits == 1
+
+    async def test_durable_queue_counts_the_whole_batch(self, monkeypatch):
+        monkeypatch.setattr(agents.settings, "agent_queue_backend", "database")
+        monkeypatch.setattr(agents.settings, "agent_queue_size", 50)
+        session = FakeSession([[10]])
+        app = FastAPI()
+        app.include_router(agents.router, prefix="/api/v1/agents")
+
+        async def db():
+            yield session
+
+        app.dependency_overrides[get_db] = db
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            response = await c.post("/api/v1/agents/batch", json=batch(41))
+
+        assert response.status_code == 429
+        assert response.json()["detail"]["error"]["code"] == "AGENT_QUEUE_FULL"
+        assert len(session.statements) == 1
+        assert session.commits == 0
+
+    async def test_batch_larger_than_free_room_returns_429(self, sessions, monkeypatch):
+        pool = AgentWorkerPool(workers=1, max_queue=4, runner=Runner(sessions))
+        await pool.start(recover=False)
+        monkeypatch.setattr(agents, "agent_workers", pool)
+
+        async with AsyncClient(transport=ASGITransport(app=make_app(sessions)), base_url="http://test") as c:
+            response = await c.post("/api/v1/agents/batch", json=batch(5))
+        pool.drain_timeout = 0
+        await pool.stop()
+
+        assert response.status_code == 429
+        async with sessions() as db:
+            assert (await db.execute(select(func.count()).select_from(AgentExecution))).scalar() == 0
+
+    async def test_rejects_oversized_batch(self, sessions, monkeypatch):
+        monkeypatch.setattr(agents.settings, "agent_batch_max_size", 5)
+        async with AsyncClient(transport=ASGITransport(app=make_app(sessions)), base_url="http://test") as c:
+            response = await c.post("/api/v1/agents/batch", json=batch(6))
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"]["code"] == "BATCH_TOO_LARGE"
+
+    async def test_unknown_batch(self, sessions):
+        async with AsyncClient(transport=ASGITransport(app=make_app(sessions)), base_url="http://test") as c:
+            response = await c.get(f"/api/v1/agents/batch/{uuid.uuid4()}")
+        assert response.status_code == 404
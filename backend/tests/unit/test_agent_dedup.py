@@ -0,0 +1,163 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.api.v1 import agents
+from app.core.database import get_db
+from app.models.agent import AgentExecution, AgentStatus
+from app.services.agent_dedup import find_duplicate, input_fingerprint
+from app.services.agent_queue import AgentWorkerPool
+
+PROJECT_ID = uuid.uuid4()
+
+
+@pytest.fixture
+async def sessions(tmp_path, sqlite_postgres_types):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dedup.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: AgentExecution.__table__.create(c))
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def submitted(monkeypatch):
+    """Execution ids handed to the worker pool."""
+    ids = []
+
+    async def runner(execution_id):
+        ids.append(execution_id)
+
+    pool = AgentWorkerPool(workers=1, runner=runner)
+    await pool.start(recover=False)
+    monkeypatch.setattr(agents, "agent_workers", pool)
+    yield ids
+    await pool.stop()
+
+
+@pytest.fixture
+async def client(sessions):
+    app = FastAPI()
+    app.include_router(agents.router, prefix="/api/v1/agents")
+
+    async def db():
+        async with sessions() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+
+def request(code: str = "x = 1", project_id: uuid.UUID = PROJECT_ID) -> dict:
+    return {
+        "project_id": str(project_id),
+        "agent_type": "code-reviewer",
+        "task_description": "Review",
+        "input_data": {"code_content": code, "file_path": "x.py"},
+    }
+
+
+async def finish(sessions, execution_id: str, status: AgentStatus, age: timedelta = timedelta()):
+    async with sessions() as db:
+        execution = await db.get(AgentExecution, uuid.UUID(execution_id))
+        execution.status = status
+        execution.output_data = {"result": "looks good"}
+        execution.completed_at = datetime.utcnow() - age
+        await db.commit()
+
+
+class TestInputFingerprint:
+    """Unit tests for the request digest."""
+
+    def test_normalizes_input(self):
+        a = input_fingerprint(PROJECT_ID, "code-reviewer", {"file_path": "x.py", "code_content": "a\r\nb", "context": None})
+        b = input_fingerprint(PROJECT_ID, "code-reviewer", {"code_content": "a\nb", "file_path": "x.py"})
+        assert a == b
+
+    def test_depends_on_project_agent_and_input(self):
+        base = input_fingerprint(PROJECT_ID, "code-reviewer", {"code_content": "a"})
+        assert input_fingerprint(uuid.uuid4(), "code-reviewer", {"code_content": "a"}) != base
+        assert input_fingerprint(PROJECT_ID, "test-generator", {"code_content": "a"}) != base
+        assert input_fingerprint(PROJECT_ID, "code-reviewer", {"code_content": "b"}) != base
+
+
+class TestExecuteDedup:
+    """POST /agents reuses identical executions."""
+
+    async def test_attaches_to_execution_in_progress(self, client, submitted):
+        first = await client.post("/api/v1/agents", json=request())
+        second = await client.post("/api/v1/agents", json=request())
+
+        assert second.status_code == 202
+        assert second.headers["x-agent-dedup"] == "hit"
+        assert second.json()["data"]["id"] == first.json()["data"]["id"]
+        assert len(submitted) == 1
+
+    async def test_returns_recent_result(self, client, sessions, submitted):
+        first = await client.post("/api/v1/agents", json=request())
+        await finish(sessions, first.json()["data"]["id"], AgentStatus.COMPLETED)
+
+        second = await client.post("/api/v1/agents", json=request())
+
+        assert second.status_code == 200
+        assert second.json()["data"]["output_data"] == {"result": "looks good"}
+        assert len(submitted) == 1
+
+    async def test_old_or_failed_results_are_not_reused(self, client, sessions, submitted):
+        first = await client.post("/api/v1/agents", json=request("a = 1"))
+        await finish(sessions, first.json()["data"]["id"], AgentStatus.COMPLETED, age=timedelta(hours=1))
+        second = await client.post("/api/v1/agents", json=request("b = 1"))
+        await finish(sessions, second.json()["data"]["id"], AgentStatus.FAILED)
+
+        assert (await client.post("/api/v1/agents", json=request("a = 1"))).status_code == 202
+        assert (await client.post("/api/v1/agents", json=request("b = 1"))).status_code == 202
+        assert len(submitted) == 4
+
+    async def test_projects_do_not_share_executions(self, client, submitted):
+        first = await client.post("/api/v1/agents", json=request())
+        second = await client.post("/api/v1/agents", json=request(project_id=uuid.uuid4()))
+
+        assert second.status_code == 202
+        assert "x-agent-dedup" not in second.headers
+        assert second.json()["data"]["id"] != first.json()["data"]["id"]
+        assert len(submitted) == 2
+
+    async def test_header_opts_out(self, client, submitted):
+        first = await client.post("/api/v1/agents", json=request())
+        second = await client.post("/api/v1/agents", json=request(), headers={"X-Agent-Dedup": "off"})
+
+        assert second.json()["data"]["id"] != first.json()["data"]["id"]
+        assert "x-agent-dedup" not in second.headers
+        assert len(submitted) == 2
+
+    async def test_request_racing_an_identical_one_attaches(self, client, submitted, monkeypatch):
+        first = await client.post("/api/v1/agents", json=request())
+
+        # The second request's lookup ran before the first row was committed
+        lookups = []
+
+        async def racing_find_duplicate(*args):
+            lookups.append(args)
+            return None if len(lookups) == 1 else await find_duplicate(*args)
+
+        monkeypatch.setattr(agents, "find_duplicate", racing_find_duplicate)
+        second = await client.post("/api/v1/agents", json=request())
+
+        assert len(lookups) == 2
+        assert second.status_code == 202
+        assert second.headers["x-agent-dedup"] == "hit"
+        assert second.json()["data"]["id"] == first.json()["data"]["id"]
+        assert len(submitted) == 1
+
+    async def test_batches_are_not_deduplicated(self, client, submitted):
+        await client.post("/api/v1/agents", json=request())
+        body = request()
+        body["inputs"] = [body.pop("input_data")] * 2
+        batch = await client.post("/api/v1/agents/batch", json=body)
+
+        assert batch.status_code == 202
+        assert len(batch.json()["execution_ids"]) == 2
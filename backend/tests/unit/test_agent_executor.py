@@ -0,0 +1,165 @@
+import asyncio
+import time
+import uuid
+import pytest
+from app.models.agent import AgentExecution, AgentStatus
+from app.models.ai_activity import AIActivity
+from app.services import ai_client as ai_client_module
+from app.services import code_chunker as code_chunker_module
+from app.services.agent_executor import AgentExecutor
+from app.services.execution_stream import ExecutionStream
+from app.services.ai_client import close_ai_client
+from tests.fakes import FakeAIProvider, FakeSession
+
+
+@pytest.fixture
+async def provider(monkeypatch):
+    server = FakeAIProvider(delay=0.1)
+    base_url = await server.start()
+    monkeypatch.setattr(ai_client_module.settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(ai_client_module.settings, "anthropic_base_url", base_url)
+    yield server
+    await close_ai_client()
+    await server.stop()
+
+
+def queued(session: FakeSession, status: AgentStatus = AgentStatus.PENDING) -> AgentExecution:
+    execution = AgentExecution(
+        id=uuid.uuid4(),
+        project_id=uuid.uuid4(),
+        agent_type="doc-generator",
+        task_description="Document",
+        status=status,
+    )
+    session.add(execution)
+    return execution
+
+
+async def run(session: FakeSession, execution: AgentExecution, agent_type: str = "doc-generator"):
+    return await AgentExecutor(session).run_agent(
+        agent_type=agent_type,
+        project_id=str(execution.project_id),
+        task_description=execution.task_description,
+        input_data={"code_content": "x = 1", "file_path": "x.py"},
+        execution_id=execution.id,
+    )
+
+
+class TestRunAgent:
+    """Unit tests for AgentExecutor.run_agent persistence."""
+
+    async def test_completes_the_queued_row(self, provider):
+        session = FakeSession()
+        execution = queued(session)
+
+        result = await run(session, execution)
+
+        assert result is execution
+        assert execution.status == AgentStatus.COMPLETED
+        assert execution.output_data["result"] == "Hello, world"
+        executions = [obj for obj in session.added if isinstance(obj, AgentExecution)]
+        assert executions == [execution]
+        # Running, then result and activity log together
+        assert session.commits == 2
+
+    async def test_activity_logged_in_final_transaction(self, provider):
+        session = FakeSession()
+        execution = queued(session, AgentStatus.RUNNING)
+
+        await run(session, execution)
+
+        [activity] = [obj for obj in session.added if isinstance(obj, AIActivity)]
+        assert activity.project_id == execution.project_id
+        # Claimed rows are already running, so the result is the only write
+        assert session.commits == 1
+
+    async def test_failure_rolls_back_then_records_error(self, provider):
+        session = FakeSession()
+        execution = queued(session)
+
+        with pytest.raises(ValueError):
+            await run(session, execution, agent_type="unknown")
+
+        assert execution.status == AgentStatus.FAILED
+        assert "Unknown agent type" in execution.error_message
+        assert session.rollbacks == 1
+        assert session.commits == 2
+
+
+LARGE_FILE = "import os\n\n" + "\n".join(
+    f"def handler_{i}(event):\n    return os.getenv('KEY_{i}', event)\n" for i in range(8)
+)
+
+
+class TestChunkedAgents:
+    """Large files are split into concurrent chunk prompts."""
+
+    @pytest.fixture(autouse=True)
+    def small_chunks(self, monkeypatch):
+        monkeypatch.setattr(code_chunker_module.settings, "agent_chunk_chars", 150)
+
+    async def test_code_reviewer_runs_chunks_concurrently(self, provider):
+        executor = AgentExecutor(FakeSession())
+
+        start = time.perf_counter()
+        result = await executor.execute_code_reviewer(None, code_content=LARGE_FILE, file_path="handlers.py")
+        elapsed = time.perf_counter() - start
+
+        chunks = result["structured_output"]["chunks"]
+        assert len(chunks) == len(provider.requests) > 2
+        assert provider.max_in_flight == len(chunks)
+        # Wall-clock time of one model call, not one per chunk
+        assert elapsed < 0.1 * len(chunks) / 2
+        assert sorted(name for c in chunks for name in c["definitions"]) == sorted(
+            f"handler_{i}" for i in range(8)
+        )
+        assert result["result"].startswith("### Lines 1-")
+        assert result["result"].count("anthropic reply") == len(chunks)
+
+    async def test_chunk_prompts_carry_position_and_imports(self, provider):
+        executor = AgentExecutor(FakeSession())
+        await executor.execute_test_generator(None, code_content=LARGE_FILE, file_path="handlers.py")
+
+        prompts = [body["messages"][0]["content"] for _, _, body in provider.requests]
+        assert all(f"of {len(prompts)}: lines" in p for p in prompts)
+        later = [p for p in prompts if "Part 1 of" not in p]
+        assert all("imports, for context:\n```python\nimport os\n```" in p for p in later)
+
+    async def test_chunk_results_stream_as_sections(self, provider):
+        executor = AgentExecutor(FakeSession())
+        executor.stream = stream = ExecutionStream()
+        await executor.execute_code_reviewer(None, code_content=LARGE_FILE, file_path="handlers.py")
+
+        assert len(stream.chunks) == len(provider.requests)
+        assert all(c.startswith("### Lines ") for c in stream.chunks)
+
+    async def test_small_file_keeps_single_prompt(self, provider, monkeypatch):
+        monkeypatch.setattr(code_chunker_module.settings, "agent_chunk_chars", 12000)
+        executor = AgentExecutor(FakeSession())
+        result = await executor.execute_code_reviewer(None, code_content=LARGE_FILE, file_path="handlers.py")
+
+        assert len(provider.requests) == 1
+        assert "chunks" not in result["structured_output"]
+        assert "Part 1" not in provider.requests[0][2]["messages"][0]["content"]
+
+    async def test_failed_chunk_cancels_the_rest(self, provider, monkeypatch):
+        executor = AgentExecutor(FakeSession())
+        calls = []
+        cancelled = []
+
+        async def call_model(prompt, **kwargs):
+            calls.append(prompt)
+            if len(calls) == 1:
+                raise ValueError("model refused")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(prompt)
+                raise
+
+        monkeypatch.setattr(executor.ai_client, "call_model", call_model)
+
+        with pytest.raises(ValueError, match="model refused"):
+            await executor.execute_code_reviewer(None, code_content=LARGE_FILE, file_path="handlers.py")
+        assert len(calls) > 2
+        assert len(cancelled) == len(calls) - 1
@@ -0,0 +1,226 @@
+import asyncio
+import uuid
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from app.api.v1 import agents
+from app.core.database import get_db
+from app.models.agent import AgentExecution, AgentStatus
+from app.services.agent_queue import AgentQueueFull, AgentWorkerPool
+from tests.fakes import FakeResult, FakeSession
+
+
+class Runner:
+    """Records executions; each one waits until released."""
+
+    def __init__(self):
+        self.started = []
+        self.finished = []
+        self.running = 0
+        self.max_running = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, execution_id):
+        self.started.append(execution_id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await self.release.wait()
+            self.finished.append(execution_id)
+        finally:
+            self.running -= 1
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAgentWorkerPool:
+    """Unit tests for the in-process agent worker pool."""
+
+    async def test_runs_at_most_n_at_once(self):
+        runner = Runner()
+        pool = AgentWorkerPool(workers=2, max_queue=10, runner=runner)
+        await pool.start(recover=False)
+        for i in range(5):
+            pool.submit(i)
+        await settle()
+
+        assert runner.started == [0, 1]
+        assert runner.max_running == 2
+
+        runner.release.set()
+        await pool.stop()
+        assert sorted(runner.finished) == [0, 1, 2, 3, 4]
+        assert runner.max_running == 2
+
+    async def test_refuses_when_full(self):
+        pool = AgentWorkerPool(workers=1, max_queue=2, runner=Runner())
+        await pool.start(recover=False)
+        pool.submit(1)
+        await settle()
+        pool.submit(2)
+        pool.submit(3)
+
+        assert pool.full()
+        with pytest.raises(AgentQueueFull):
+            pool.submit(4)
+
+        pool.drain_timeout = 0
+        await pool.stop()
+
+    async def test_refuses_after_stop(self):
+        pool = AgentWorkerPool(workers=1, runner=Runner())
+        await pool.start(recover=False)
+        await pool.stop()
+
+        with pytest.raises(AgentQueueFull):
+            pool.submit(1)
+
+    async def test_stop_cancels_after_drain_timeout(self):
+        runner = Runner()
+        pool = AgentWorkerPool(workers=1, drain_timeout=0.05, runner=runner)
+        await pool.start(recover=False)
+        pool.submit(1)
+        pool.submit(2)
+
+        await asyncio.wait_for(pool.stop(), 1)
+        assert runner.started == [1]
+        assert runner.finished == []
+        assert pool.tasks == []
+
+    async def test_runner_errors_do_not_kill_workers(self):
+        seen = []
+
+        async def runner(execution_id):
+            seen.append(execution_id)
+            raise RuntimeError("boom")
+
+        pool = AgentWorkerPool(workers=1, runner=runner)
+        await pool.start(recover=False)
+        pool.submit(1)
+        pool.submit(2)
+        await pool.stop()
+
+        assert seen == [1, 2]
+
+    async def test_recovers_unfinished_executions(self):
+        ids = [uuid.uuid4(), uuid.uuid4()]
+        session = FakeSession(FakeResult(ids))
+        runner = Runner()
+        runner.release.set()
+        pool = AgentWorkerPool(workers=1, session_factory=lambda: session, runner=runner)
+
+        await pool.start()
+        await pool.stop()
+
+        assert runner.finished == ids
+        sql = session.sql()
+        assert "agent_executions.status IN" in sql
+
+    async def test_skips_finished_executions(self):
+        execution = AgentExecution(id=uuid.uuid4(), status=AgentStatus.COMPLETED)
+        session = FakeSession()
+        session.add(execution)
+        pool = AgentWorkerPool(session_factory=lambda: session)
+
+        await pool.run_execution(execution.id)
+
+        assert session.commits == 0
+
+
+class TestExecuteEndpoint:
+    """Unit tests for POST /agents backpressure."""
+
+    def make_app(self, session) -> FastAPI:
+        app = FastAPI()
+        app.include_router(agents.router, prefix="/api/v1/agents")
+
+        async def fake_db():
+            yield session
+
+        app.dependency_overrides[get_db] = fake_db
+        return app
+
+    def body(self) -> dict:
+        return {
+            "project_id": str(uuid.uuid4()),
+            "agent_type": "code-reviewer",
+            "task_description": "Review",
+            "input_data": {"code_content": "x = 1", "file_path": "x.py"},
+        }
+
+    async def test_queues_execution(self, monkeypatch):
+        runner = Runner()
+        pool = AgentWorkerPool(workers=1, max_queue=1, runner=runner)
+        await pool.start(recover=False)
+        monkeypatch.setattr(agents, "agent_workers", pool)
+        session = FakeSession()
+
+        async with AsyncClient(transport=ASGITransport(app=self.make_app(session)), base_url="http://test") as c:
+            response = await c.post("/api/v1/agents", json=self.body())
+        await settle()
+
+        assert response.status_code == 202
+        assert runner.started == [session.added[0].id]
+        runner.release.set()
+        await pool.stop()
+
+    async def test_full_queue_returns_429(self, monkeypatch):
+        pool = AgentWorkerPool(workers=1, max_queue=1, drain_timeout=0, runner=Runner())
+        await pool.start(recover=False)
+        pool.submit(1)
+        await settle()
+        pool.submit(2)
+        monkeypatch.setattr(agents, "agent_workers", pool)
+        session = FakeSession()
+
+        async with AsyncClient(transport=ASGITransport(app=self.make_app(session)), base_url="http://test") as c:
+            response = await c.post("/api/v1/agents", json=self.body())
+
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "5"
+        assert response.json()["detail"]["error"]["code"] == "AGENT_QUEUE_FULL"
+        assert session.added == []
+        await pool.stop()
+
+
+class TestBatchFeeding:
+    """Unit tests for AgentWorkerPool.submit_batch."""
+
+    async def test_stop_leaves_unfed_batch_pending(self):
+        runner = Runner()
+        pool = AgentWorkerPool(workers=4, runner=runner)
+        await pool.start(recover=False)
+        pool.submit_batch(list(range(10)), parallelism=2)
+        await settle()
+        assert runner.started == [0, 1]
+
+        runner.release.set()
+        await pool.stop()
+
+        # Whatever was not yet queued stays pending for recovery
+        assert runner.finished == runner.started
+        assert len(runner.finished) < 10
+
+    async def test_batch_reserves_room_in_the_queue(self):
+        runner = Runner()
+        pool = AgentWorkerPool(workers=1, max_queue=5, drain_timeout=0, runner=runner)
+        await pool.start(recover=False)
+        pool.submit_batch([0, 1, 2], parallelism=1)
+        await settle()
+
+        # 0 runs; 1 and 2 still hold their places
+        assert runner.started == [0]
+        assert pool.free() == 3
+        with pytest.raises(AgentQueueFull):
+            pool.submit_batch([3, 4, 5, 6], parallelism=1)
+        for execution_id in [7, 8, 9]:
+            pool.submit(execution_id)
+        assert pool.full()
+        with pytest.raises(AgentQueueFull):
+            pool.submit(10)
+
+        await pool.stop()
+        assert pool.reserved == 0
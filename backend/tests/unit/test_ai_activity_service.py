@@ -0,0 +1,53 @@
+import pytest
+from app.models.ai_activity import AITool, ActivityCategory
+from app.services.ai_activity_service import AIActivityService
+from tests.fakes import FakeSession
+
+
+class TestAIActivityServiceStatistics:
+    """Unit tests for AIActivityService.get_statistics."""
+
+    async def test_statistics_aggregates_in_database(self):
+        """Test statistics query groups by tool and category."""
+        db = FakeSession()
+        await AIActivityService(db).get_statistics(days=7)
+
+        sql = db.sql()
+        assert "count(*)" in sql
+        assert "GROUP BY ai_activities.tool_used, ai_activities.category" in sql
+        assert "ai_activities.prompt" not in sql
+        assert "ai_activities.response" not in sql
+
+    async def test_statistics_filters_by_project(self):
+        """Test statistics query filters by project when given."""
+        db = FakeSession()
+        await AIActivityService(db).get_statistics(
+            project_id="00000000-0000-0000-0000-000000000001"
+        )
+
+        sql = db.sql()
+        assert "ai_activities.project_id =" in sql
+
+    async def test_statistics_folds_grouped_rows(self):
+        """Test grouped rows are folded into per-tool and per-category totals."""
+        db = FakeSession([
+            (AITool.CLAUDE, ActivityCategory.FEATURE, 3),
+            (AITool.CLAUDE, ActivityCategory.TEST, 2),
+            (AITool.COPILOT, ActivityCategory.FEATURE, 5),
+        ])
+        stats = await AIActivityService(db).get_statistics()
+
+        assert stats["total_prompts"] == 10
+        assert stats["prompts_by_tool"] == {"claude": 5, "copilot": 5}
+        assert stats["prompts_by_category"] == {"feature": 8, "test": 2}
+        assert stats["total_cost_estimate"] == pytest.approx(0.02)
+        assert stats["time_saved_hours"] == 2.5
+
+    async def test_statistics_empty(self):
+        """Test statistics with no activities."""
+        stats = await AIActivityService(FakeSession()).get_statistics()
+
+        assert stats["total_prompts"] == 0
+        assert stats["prompts_by_tool"] == {}
+        assert stats["prompts_by_category"] == {}
+        assert stats["total_cost_estimate"] == 0.0
@@ -0,0 +1,116 @@
+import asyncio
+from contextlib import aclosing
+import pytest
+from app.services import ai_client as ai_client_module
+from app.services.ai_client import AIClient, close_ai_client, get_ai_client
+from app.services.agent_executor import AgentExecutor
+from tests.fakes import FakeAIProvider, FakeSession
+
+
+@pytest.fixture
+async def provider(monkeypatch):
+    """Local fake provider with both APIs pointed at it."""
+    server = FakeAIProvider()
+    base_url = await server.start()
+    monkeypatch.setattr(ai_client_module.settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(ai_client_module.settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(ai_client_module.settings, "openai_base_url", base_url)
+    monkeypatch.setattr(ai_client_module.settings, "anthropic_base_url", base_url)
+    yield server
+    await close_ai_client()
+    await server.stop()
+
+
+class TestAIClient:
+    """Unit tests for the pooled AI client."""
+
+    async def test_calls_reuse_one_connection(self, provider):
+        client = AIClient()
+        try:
+            for provider_name in ["openai", "anthropic"] * 5:
+                await client.call_model("hi", provider=provider_name)
+        finally:
+            await client.close()
+
+        assert len(provider.requests) == 10
+        assert provider.connections == 1
+
+    async def test_concurrent_calls_bounded_by_pool(self, provider, monkeypatch):
+        monkeypatch.setattr(ai_client_module.settings, "ai_max_connections", 3)
+        provider.delay = 0.01
+        client = AIClient()
+        try:
+            await asyncio.gather(*(client.call_model("hi") for _ in range(12)))
+        finally:
+            await client.close()
+
+        assert provider.connections == 3
+
+    async def test_parses_responses(self, provider):
+        client = AIClient()
+        try:
+            openai = await client.call_openai([{"role": "user", "content": "hi"}], model="gpt-4")
+            anthropic = await client.call_anthropic("hi")
+        finally:
+            await client.close()
+
+        assert openai["content"] == "openai reply"
+        assert anthropic["content"] == "anthropic reply"
+        path, headers, body = provider.requests[1]
+        assert path == "/v1/messages"
+        assert headers["x-api-key"] == "sk-ant-test"
+        assert body["messages"] == [{"role": "user", "content": "hi"}]
+
+    async def test_shared_client_lifecycle(self, provider):
+        client = get_ai_client()
+        assert get_ai_client() is client
+        assert AgentExecutor(FakeSession()).ai_client is client
+
+        await close_ai_client()
+        assert client.http.is_closed
+        assert get_ai_client() is not client
+
+
+class TestAIClientStreaming:
+    """Unit tests for streamed completions."""
+
+    @pytest.mark.parametrize("provider_name", ["openai", "anthropic"])
+    async def test_stream_yields_tokens(self, provider, provider_name):
+        client = AIClient()
+        try:
+            chunks = [c async for c in client.stream_model("hi", provider=provider_name)]
+        finally:
+            await client.close()
+
+        assert chunks == ["Hello", ", ", "world"]
+        assert provider.requests[0][2]["stream"] is True
+
+    async def test_first_token_before_generation_ends(self, provider):
+        provider.token_delay = 0.1
+        client = AIClient()
+        try:
+            start = asyncio.get_running_loop().time()
+            arrivals = []
+            async for _ in client.stream_model("hi"):
+                arrivals.append(asyncio.get_running_loop().time() - start)
+        finally:
+            await client.close()
+
+        # Tokens arrive one by one instead of all at the end
+        assert arrivals[-1] - arrivals[0] >= 0.15
+
+    @pytest.mark.parametrize("provider_name", ["openai", "anthropic"])
+    async def test_stopping_early_releases_the_slot(self, provider, provider_name):
+        provider.token_delay = 0.05
+        client = AIClient()
+        try:
+            async with aclosing(client.stream_model("hi", provider=provider_name)) as chunks:
+                async for chunk in chunks:
+                    assert client.limiter.stats()["in_flight"] != {}
+                    break
+            in_flight = client.limiter.stats()["in_flight"]
+        finally:
+            await client.close()
+
+        assert chunk == "Hello"
+        assert set(in_flight.values()) == {0}
@@ -0,0 +1,175 @@
+import asyncio
+import httpx
+import pytest
+from app.services import ai_client as ai_client_module
+from app.services.ai_client import AIClient
+from app.services.ai_limits import ProviderLimiter, RetryPolicy, TokenBudget
+from tests.fakes import FakeAIProvider
+
+
+class FakeTime:
+    """Clock and sleep that advance together without real waiting."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+async def provider(monkeypatch):
+    server = FakeAIProvider()
+    base_url = await server.start()
+    monkeypatch.setattr(ai_client_module.settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(ai_client_module.settings, "anthropic_base_url", base_url)
+    yield server
+    await server.stop()
+
+
+def make_client(sleeps: list, max_retries: int = 3, **limiter_kwargs) -> AIClient:
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    return AIClient(
+        limiter=ProviderLimiter(**limiter_kwargs),
+        retry=RetryPolicy(max_retries=max_retries, base_delay=1.0, sleep=sleep, jitter=lambda: 0.5),
+    )
+
+
+class TestRetryPolicy:
+    """Unit tests for backoff delays."""
+
+    def test_exponential_backoff_with_jitter(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=10.0, jitter=lambda: 0.5)
+        assert [policy.delay(n) for n in range(6)] == [0.5, 1.0, 2.0, 4.0, 5.0, 5.0]
+
+    def test_honors_retry_after(self):
+        policy = RetryPolicy(max_delay=30.0)
+        response = httpx.Response(429, headers={"retry-after": "7"})
+        assert policy.delay(0, response) == 7.0
+        capped = httpx.Response(429, headers={"retry-after": "120"})
+        assert policy.delay(0, capped) == 30.0
+
+    def test_retryable(self):
+        assert RetryPolicy.retryable(None)
+        assert RetryPolicy.retryable(httpx.Response(429))
+        assert RetryPolicy.retryable(httpx.Response(503))
+        assert not RetryPolicy.retryable(httpx.Response(400))
+
+
+class TestTokenBudget:
+    """Unit tests for tokens-per-minute budgeting."""
+
+    async def test_waits_for_refill(self):
+        fake = FakeTime()
+        budget = TokenBudget(600, clock=fake.clock, sleep=fake.sleep)
+
+        await budget.acquire(600)
+        await budget.acquire(300)
+
+        # 300 tokens at 10 tokens/second
+        assert fake.sleeps == [30.0]
+
+    async def test_oversized_request_still_fits(self):
+        fake = FakeTime()
+        budget = TokenBudget(100, clock=fake.clock, sleep=fake.sleep)
+        await budget.acquire(5000)
+        assert fake.sleeps == []
+
+
+class TestAIClientLimits:
+    """AIClient against a fake provider that injects failures."""
+
+    async def test_retries_429_and_5xx_then_succeeds(self, provider):
+        provider.failures = [(429, {"retry-after": "2"}), (503, {}), (500, {})]
+        sleeps = []
+        client = make_client(sleeps)
+        try:
+            assert await client.call_model("hi") == "anthropic reply"
+        finally:
+            await client.close()
+
+        assert len(provider.requests) == 4
+        assert sleeps == [2.0, 1.0, 2.0]
+
+    async def test_gives_up_after_max_retries(self, provider):
+        provider.failures = [(429, {})] * 3
+        sleeps = []
+        client = make_client(sleeps, max_retries=2)
+        try:
+            with pytest.raises(httpx.HTTPStatusError) as exc:
+                await client.call_model("hi")
+        finally:
+            await client.close()
+
+        assert exc.value.response.status_code == 429
+        assert len(provider.requests) == 3
+
+    async def test_client_errors_not_retried(self, provider):
+        provider.failures = [(400, {})]
+        client = make_client([])
+        try:
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.call_model("hi")
+        finally:
+            await client.close()
+
+        assert len(provider.requests) == 1
+
+    async def test_stream_retries_before_first_token(self, provider):
+        provider.failures = [(529, {}), (429, {"retry-after": "0"})]
+        client = make_client([])
+        try:
+            chunks = [c async for c in client.stream_model("hi")]
+        finally:
+            await client.close()
+
+        assert chunks == ["Hello", ", ", "world"]
+        assert len(provider.requests) == 3
+
+    async def test_burst_queues_within_concurrency_cap(self, provider):
+        provider.delay = 0.02
+        client = make_client([], max_concurrency=2)
+        try:
+            results = await asyncio.gather(*(client.call_model("hi") for _ in range(10)))
+        finally:
+            await client.close()
+
+        assert results == ["anthropic reply"] * 10
+        assert provider.max_in_flight == 2
+
+    async def test_concurrency_is_per_model(self, provider):
+        provider.delay = 0.02
+        client = make_client([], max_concurrency=1)
+        try:
+            await asyncio.gather(
+                client.call_model("hi", model="model-a"),
+                client.call_model("hi", model="model-b"),
+            )
+        finally:
+            await client.close()
+
+        assert provider.max_in_flight == 2
+
+    async def test_token_budget_delays_calls(self, provider):
+        fake = FakeTime()
+        client = AIClient(limiter=ProviderLimiter(
+            tokens_per_minute={"anthropic": 6000},
+            clock=fake.clock,
+            sleep=fake.sleep,
+        ))
+        try:
+            for _ in range(3):
+                await client.call_model("hi", max_tokens=2000)
+        finally:
+            await client.close()
+
+        # Each call reserves ~2000 tokens; the third waits for refill
+        assert len(fake.sleeps) == 1
+        assert len(provider.requests) == 3
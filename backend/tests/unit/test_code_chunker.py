@@ -0,0 +1,50 @@
+from app.services.code_chunker import module_imports, split_python
+
+SOURCE = "import os\nfrom typing import List\n\n\n" + "\n\n".join(
+    f"# helper {i}\n@cached\ndef f{i}(values: List[int]) -> int:\n    return sum(values) + {i}\n"
+    for i in range(12)
+) + "\n\nclass Big:\n" + "".join(f"    x{i} = {i}\n" for i in range(40)) + "# trailing comment\n"
+
+
+class TestSplitPython:
+    """Unit tests for splitting source along top-level definitions."""
+
+    def test_small_source_is_one_chunk(self):
+        [chunk] = split_python(SOURCE, max_chars=len(SOURCE))
+        assert chunk.text == SOURCE
+        assert chunk.names == [f"f{i}" for i in range(12)] + ["Big"]
+
+    def test_chunks_cover_source_in_order(self):
+        chunks = split_python(SOURCE, max_chars=250)
+
+        assert len(chunks) > 1
+        assert "".join(c.text for c in chunks) == SOURCE
+        for before, after in zip(chunks, chunks[1:]):
+            assert after.start_line == before.end_line + 1
+
+    def test_definitions_are_not_split(self):
+        chunks = split_python(SOURCE, max_chars=250)
+
+        for chunk in chunks:
+            assert len(chunk.text) <= 250 or chunk.names == ["Big"]
+        for i in range(12):
+            [chunk] = [c for c in chunks if f"f{i}" in c.names]
+            assert f"# helper {i}\n@cached\ndef f{i}(" in chunk.text
+            assert f"return sum(values) + {i}\n" in chunk.text
+
+    def test_oversized_definition_is_cut_by_lines(self):
+        chunks = [c for c in split_python(SOURCE, max_chars=250) if c.names == ["Big"]]
+
+        assert len(chunks) > 1
+        assert all(len(c.text) <= 250 for c in chunks)
+        assert chunks[-1].text.endswith("# trailing comment\n")
+
+    def test_unparseable_source_is_cut_by_lines(self):
+        source = "def broken(:\n" + "x = 1\n" * 100
+        chunks = split_python(source, max_chars=100)
+
+        assert "".join(c.text for c in chunks) == source
+        assert all(len(c.text) <= 100 for c in chunks)
+
+    def test_module_imports(self):
+        assert module_imports(SOURCE) == "import os\nfrom typing import List"
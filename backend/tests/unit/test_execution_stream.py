@@ -0,0 +1,152 @@
+import asyncio
+import uuid
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from app.api.v1 import agents
+from app.core.database import get_db
+from app.models.agent import AgentExecution, AgentStatus
+from app.services import ai_client as ai_client_module
+from app.services.agent_executor import AgentExecutor
+from app.services.ai_client import close_ai_client
+from app.services.execution_stream import ExecutionStream, ExecutionStreamRegistry, execution_streams
+from tests.fakes import FakeAIProvider, FakeSession
+
+
+def parse_sse(body: str) -> list[tuple[str, str]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], lines["data"]))
+    return events
+
+
+class TestExecutionStream:
+    """Unit tests for the in-process execution stream."""
+
+    async def test_subscriber_sees_chunks_as_published(self):
+        stream = ExecutionStream()
+
+        async def agent():
+            for chunk in ["a", "b", "c"]:
+                stream.publish(chunk)
+                await asyncio.sleep(0)
+            stream.close()
+
+        async def collect():
+            return [c async for c in stream.subscribe()]
+
+        task = asyncio.create_task(collect())
+        await asyncio.sleep(0)
+        await agent()
+
+        assert await asyncio.wait_for(task, 1) == ["a", "b", "c"]
+        assert stream.waiters == []
+
+    async def test_late_subscriber_replays_from_start(self):
+        stream = ExecutionStream()
+        stream.publish("a")
+        stream.close(error="boom")
+
+        assert [c async for c in stream.subscribe()] == ["a"]
+        assert stream.error == "boom"
+
+    def test_registry_purges_finished_streams(self):
+        registry = ExecutionStreamRegistry(retention_seconds=0)
+        registry.open("old").close()
+        registry.open("new")
+
+        assert registry.get("old") is None
+        assert registry.get("new") is not None
+
+
+class TestStreamEndpoint:
+    """Unit tests for GET /agents/{execution_id}/stream."""
+
+    @pytest.fixture
+    async def provider(self, monkeypatch):
+        server = FakeAIProvider(token_delay=0.01)
+        base_url = await server.start()
+        monkeypatch.setattr(ai_client_module.settings, "anthropic_api_key", "sk-ant-test")
+        monkeypatch.setattr(ai_client_module.settings, "anthropic_base_url", base_url)
+        yield server
+        await close_ai_client()
+        await server.stop()
+
+    def make_app(self, *results) -> FastAPI:
+        app = FastAPI()
+        app.include_router(agents.router, prefix="/api/v1/agents")
+
+        async def fake_db():
+            yield FakeSession(*results)
+
+        app.dependency_overrides[get_db] = fake_db
+        return app
+
+    async def test_streams_tokens_while_agent_runs(self, provider):
+        execution_id = uuid.uuid4()
+        execution_streams.open(execution_id)
+        app = self.make_app()
+        session = FakeSession()
+        session.add(AgentExecution(id=execution_id, status=AgentStatus.PENDING))
+
+        async def run_agent():
+            await AgentExecutor(session).run_agent(
+                agent_type="doc-generator",
+                project_id=str(uuid.uuid4()),
+                task_description="Document",
+                input_data={"code_content": "x = 1", "file_path": "x.py"},
+                execution_id=execution_id,
+            )
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            response, _ = await asyncio.gather(
+                c.get(f"/api/v1/agents/{execution_id}/stream"),
+                run_agent(),
+            )
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert parse_sse(response.text) == [
+            ("token", '{"text": "Hello"}'),
+            ("token", '{"text": ", "}'),
+            ("token", '{"text": "world"}'),
+            ("done", '{"status": "completed"}'),
+        ]
+
+    async def test_finished_execution_replays_output(self, monkeypatch):
+        execution = AgentExecution(
+            id=uuid.uuid4(),
+            status=AgentStatus.COMPLETED,
+            output_data={"result": "all done"},
+            started_at=datetime.utcnow(),
+        )
+        monkeypatch.setattr(agents, "AsyncSessionLocal", lambda: FakeSessionContext(execution))
+        app = self.make_app([execution])
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            response = await c.get(f"/api/v1/agents/{execution.id}/stream")
+
+        assert parse_sse(response.text) == [
+            ("token", '{"text": "all done"}'),
+            ("done", '{"status": "completed"}'),
+        ]
+
+    async def test_unknown_execution(self):
+        app = self.make_app()
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            response = await c.get(f"/api/v1/agents/{uuid.uuid4()}/stream")
+        assert response.status_code == 404
+
+
+class FakeSessionContext:
+    """async with stand-in for AsyncSessionLocal() returning one execution."""
+
+    def __init__(self, execution):
+        self.execution = execution
+
+    async def __aenter__(self):
+        return FakeSession([self.execution])
+
+    async def __aexit__(self, *exc):
+        return False
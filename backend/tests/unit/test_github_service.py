@@ -0,0 +1,388 @@
+import pytest
+import httpx
+from app.services import github_service as github_service_module
+from app.services.github_client import (
+    GitHubETagCache,
+    GitHubRateLimit,
+    GitHubRateLimitExceeded,
+    GitHubRepoCache,
+    close_github_client,
+    get_github_http_client,
+)
+from app.services.github_service import GitHubService
+from tests.fakes import FakeClock, FakeGitHub
+
+TREE_1 = "1" * 40
+TREE_2 = "2" * 40
+
+
+@pytest.fixture
+async def github(monkeypatch):
+    """Local fake GitHub with the service pointed at it."""
+    server = FakeGitHub()
+    base_url = await server.start()
+    monkeypatch.setattr(github_service_module.settings, "github_api_url", base_url)
+    server.routes["/repos/octo/app"] = {"name": "app", "default_branch": "main"}
+    yield server
+    await close_github_client()
+    await server.stop()
+
+
+def make_service(token="ghp_test", **kwargs) -> GitHubService:
+    kwargs.setdefault("cache", GitHubETagCache())
+    kwargs.setdefault("rate_limit", GitHubRateLimit(reserve=0))
+    kwargs.setdefault("repo_cache", GitHubRepoCache())
+    return GitHubService(token=token, **kwargs)
+
+
+class TestGitHubService:
+    """Unit tests for GitHubService against a local fake API."""
+
+    async def test_reuses_pooled_connection(self, github):
+        service = make_service()
+
+        for _ in range(5):
+            await service.get_repo("octo", "app")
+
+        assert github.connections == 1
+        assert service.http_client is get_github_http_client()
+
+    async def test_revalidates_with_etag_and_304_costs_no_quota(self, github):
+        service = make_service()
+
+        first = await service.get_repo("octo", "app")
+        second = await service.get_repo("octo", "app")
+
+        assert first == second == {"name": "app", "default_branch": "main"}
+        (_, _, _, initial), (_, _, _, conditional) = github.requests
+        assert "if-none-match" not in initial
+        assert conditional["if-none-match"].startswith('"')
+        assert conditional["if-modified-since"] == FakeGitHub.LAST_MODIFIED
+        assert github.remaining == github.limit - 1
+        assert service.cache.hits == 1
+        assert service.cache.misses == 1
+
+    async def test_changed_resource_is_refetched(self, github):
+        service = make_service()
+        await service.get_repo("octo", "app")
+
+        github.routes["/repos/octo/app"] = {"name": "app", "default_branch": "trunk"}
+
+        assert (await service.get_repo("octo", "app"))["default_branch"] == "trunk"
+        assert github.remaining == github.limit - 2
+        assert (await service.get_repo("octo", "app"))["default_branch"] == "trunk"
+        assert github.remaining == github.limit - 2
+
+    async def test_cache_is_per_token(self, github):
+        cache = GitHubETagCache()
+        await make_service("ghp_a", cache=cache).get_repo("octo", "app")
+        await make_service("ghp_b", cache=cache).get_repo("octo", "app")
+
+        assert all("if-none-match" not in headers for _, _, _, headers in github.requests)
+        assert github.requests[1][3]["authorization"] == "token ghp_b"
+
+    async def test_cache_key_includes_query(self, github):
+        github.routes["/repos/octo/app/issues"] = [{"number": 1}]
+        service = make_service()
+
+        await service.get_repo_issues("octo", "app", state="open")
+        await service.get_repo_issues("octo", "app", state="closed")
+
+        assert all("if-none-match" not in headers for _, _, _, headers in github.requests)
+
+    async def test_posts_are_not_cached(self, github):
+        github.routes["/repos/octo/app/issues"] = [{"number": 1}]
+        service = make_service()
+
+        await service.get_repo_issues("octo", "app")
+        await service.create_issue("octo", "app", "Bug", "Broken")
+
+        assert github.requests[1][0] == "POST"
+        assert "if-none-match" not in github.requests[1][3]
+        assert len(service.cache.entries) == 1
+
+    async def test_errors_raise(self, github):
+        service = make_service()
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await service.get_repo("octo", "missing")
+        assert service.cache.entries == {}
+
+    async def test_records_quota_from_headers(self, github):
+        rate_limit = GitHubRateLimit(reserve=0)
+        service = make_service(rate_limit=rate_limit)
+
+        await service.get_repo("octo", "app")
+
+        quota = rate_limit.quotas[service.token_key]
+        assert quota["remaining"] == github.limit - 1
+        assert quota["reset"] == github.reset
+        assert "ghp_test" not in service.token_key
+
+    async def test_throttles_when_quota_runs_low(self, github):
+        github.remaining = 4
+        clock = FakeClock(github.reset - 100)
+        rate_limit = GitHubRateLimit(reserve=10, clock=clock, sleep=clock.sleep)
+        service = make_service(rate_limit=rate_limit)
+
+        # The first call learns the quota; later ones are spread over the window
+        for _ in range(4):
+            await service.get_repo("octo", "app")
+
+        # Revalidations are free, so 3 requests remain: one every 100/3s
+        assert clock.sleeps == [pytest.approx(100 / 3)] * 2
+        assert github.remaining == 3
+        assert rate_limit.throttled == 2
+
+    async def test_no_throttling_above_reserve(self, github):
+        clock = FakeClock(github.reset - 100)
+        rate_limit = GitHubRateLimit(reserve=10, clock=clock, sleep=clock.sleep)
+        service = make_service(rate_limit=rate_limit)
+
+        for _ in range(3):
+            await service.get_repo("octo", "app")
+
+        assert clock.sleeps == []
+
+
+class TestPagination:
+    """Unit tests for the iter_* methods."""
+
+    async def collect(self, iterator) -> list:
+        return [item async for item in iterator]
+
+    async def test_yields_every_page_in_order(self, github):
+        github.routes["/repos/octo/app/commits"] = [{"sha": str(i)} for i in range(250)]
+        service = make_service()
+
+        commits = await self.collect(service.iter_repo_commits("octo", "app"))
+
+        assert [c["sha"] for c in commits] == [str(i) for i in range(250)]
+        assert [query.get("page") for _, _, query, _ in github.requests] == [None, "2", "3"]
+        assert all(query["per_page"] == "100" for _, _, query, _ in github.requests)
+
+    async def test_keeps_filters_on_every_page(self, github):
+        github.routes["/repos/octo/app/issues"] = [{"number": i} for i in range(5)]
+        service = make_service()
+
+        issues = await self.collect(service.iter_repo_issues("octo", "app", state="closed", per_page=2))
+
+        assert len(issues) == 5
+        assert all(query["state"] == "closed" for _, _, query, _ in github.requests)
+
+    async def test_fetches_remaining_pages_with_bounded_fan_out(self, github):
+        github.routes["/repos/octo/app/pulls/7/files"] = [{"filename": f"f{i}.py"} for i in range(20)]
+        github.delay = 0.02
+        service = make_service(page_concurrency=3)
+
+        files = await self.collect(service.iter_pull_files("octo", "app", 7, per_page=2))
+
+        assert [f["filename"] for f in files] == [f"f{i}.py" for i in range(20)]
+        assert github.max_in_flight == 3
+
+    async def test_follows_next_links_without_last(self, github):
+        github.routes["/repos/octo/app/pulls"] = [{"number": i} for i in range(5)]
+        github.link_last = False
+        service = make_service()
+
+        pulls = await self.collect(service.iter_repo_pulls("octo", "app", per_page=2))
+
+        assert [p["number"] for p in pulls] == list(range(5))
+        assert github.max_in_flight == 1
+        assert len(github.requests) == 3
+
+    async def test_stopping_early_cancels_outstanding_pages(self, github):
+        github.routes["/repos/octo/app/commits"] = [{"sha": str(i)} for i in range(100)]
+        service = make_service(page_concurrency=2)
+
+        iterator = service.iter_repo_commits("octo", "app", per_page=10)
+        async for commit in iterator:
+            if commit["sha"] == "15":
+                break
+        await iterator.aclose()
+
+        # Page 1, pages 2-3 in flight, and page 4 scheduled as page 2 arrived
+        assert len(github.requests) <= 4
+
+    async def test_unchanged_pages_are_revalidated(self, github):
+        github.routes["/repos/octo/app/commits"] = [{"sha": str(i)} for i in range(30)]
+        service = make_service()
+
+        first = await self.collect(service.iter_repo_commits("octo", "app", per_page=10))
+        remaining = github.remaining
+        second = await self.collect(service.iter_repo_commits("octo", "app", per_page=10))
+
+        assert first == second
+        assert github.remaining == remaining
+        assert service.cache.hits == 3
+
+    async def test_refuses_links_to_other_hosts(self, github):
+        service = make_service()
+
+        with pytest.raises(ValueError):
+            await service._send("GET", "https://example.com/repos/octo/app")
+
+
+class TestRepoTree:
+    """Unit tests for get_repo_tree caching."""
+
+    def set_branch(self, github, branch: str, tree_sha: str):
+        tree = {
+            "sha": tree_sha,
+            "tree": [{"path": f"{tree_sha[:2]}.py", "type": "blob"}],
+            "truncated": False,
+        }
+        github.routes[f"/repos/octo/app/git/trees/{branch}"] = tree
+        github.routes[f"/repos/octo/app/git/trees/{tree_sha}"] = tree
+
+    async def test_cold_path_is_two_requests(self, github):
+        self.set_branch(github, "main", TREE_1)
+        service = make_service()
+
+        tree = await service.get_repo_tree("octo", "app")
+
+        assert tree["tree"] == [{"path": "11.py", "type": "blob"}]
+        assert github.paths() == ["/repos/octo/app", "/repos/octo/app/git/trees/main"]
+        assert github.requests[1][2] == {"recursive": "1"}
+
+    async def test_unchanged_branch_is_one_conditional_request(self, github):
+        self.set_branch(github, "main", TREE_1)
+        service = make_service()
+
+        first = await service.get_repo_tree("octo", "app")
+        second = await service.get_repo_tree("octo", "app")
+
+        assert first == second
+        assert github.paths() == [
+            "/repos/octo/app",
+            "/repos/octo/app/git/trees/main",
+            "/repos/octo/app/git/trees/main",
+        ]
+        assert "if-none-match" in github.requests[2][3]
+        # The revalidation was a 304 and spent no quota
+        assert github.remaining == github.limit - 2
+
+    async def test_new_commit_fetches_new_tree(self, github):
+        self.set_branch(github, "main", TREE_1)
+        service = make_service()
+        await service.get_repo_tree("octo", "app")
+
+        self.set_branch(github, "main", TREE_2)
+        tree = await service.get_repo_tree("octo", "app")
+
+        assert tree["sha"] == TREE_2
+        assert github.remaining == github.limit - 3
+
+    async def test_honors_branch_argument(self, github):
+        self.set_branch(github, "main", TREE_1)
+        self.set_branch(github, "dev", TREE_2)
+        service = make_service()
+
+        tree = await service.get_repo_tree("octo", "app", branch="dev")
+
+        assert tree["sha"] == TREE_2
+        assert github.paths() == ["/repos/octo/app/git/trees/dev"]
+
+    async def test_known_sha_is_served_locally(self, github):
+        self.set_branch(github, "main", TREE_1)
+        self.set_branch(github, "dev", TREE_2)
+        service = make_service()
+        await service.get_repo_tree("octo", "app")
+
+        assert (await service.get_repo_tree("octo", "app", branch=TREE_1))["sha"] == TREE_1
+        assert (await service.get_repo_tree("octo", "app", branch=TREE_2))["sha"] == TREE_2
+        assert (await service.get_repo_tree("octo", "app", branch=TREE_2))["sha"] == TREE_2
+
+        assert github.paths() == [
+            "/repos/octo/app",
+            "/repos/octo/app/git/trees/main",
+            f"/repos/octo/app/git/trees/{TREE_2}",
+        ]
+        assert service.repo_cache.tree_hits == 2
+
+    async def test_cached_tree_is_not_served_to_another_token(self, github):
+        self.set_branch(github, "main", TREE_1)
+        cache = GitHubRepoCache()
+        await make_service("ghp_a", repo_cache=cache).get_repo_tree("octo", "app")
+        sent = len(github.requests)
+
+        # The second token must ask GitHub, which checks its access
+        github.routes.pop(f"/repos/octo/app/git/trees/{TREE_1}")
+        with pytest.raises(httpx.HTTPStatusError):
+            await make_service("ghp_b", repo_cache=cache).get_repo_tree("octo", "app", branch=TREE_1)
+
+        assert github.paths()[sent:] == [f"/repos/octo/app/git/trees/{TREE_1}"]
+        assert github.requests[sent][3]["authorization"] == "token ghp_b"
+
+    async def test_default_branch_expires(self, github):
+        self.set_branch(github, "main", TREE_1)
+        self.set_branch(github, "trunk", TREE_2)
+        clock = FakeClock(0.0)
+        service = make_service(repo_cache=GitHubRepoCache(branch_ttl=60, clock=clock))
+        await service.get_repo_tree("octo", "app")
+
+        github.routes["/repos/octo/app"] = {"name": "app", "default_branch": "trunk"}
+        assert (await service.get_repo_tree("octo", "app"))["sha"] == TREE_1
+
+        clock.now = 61.0
+        assert (await service.get_repo_tree("octo", "app"))["sha"] == TREE_2
+
+    async def test_default_branch_is_cached_per_token(self, github):
+        self.set_branch(github, "main", TREE_1)
+        cache = GitHubRepoCache()
+        await make_service("ghp_a", repo_cache=cache).get_repo_tree("octo", "app")
+        await make_service("ghp_b", repo_cache=cache).get_repo_tree("octo", "app")
+
+        assert github.paths().count("/repos/octo/app") == 2
+
+
+class TestGitHubRateLimit:
+    """Unit tests for quota pacing."""
+
+    def headers(self, remaining: int, reset: float) -> httpx.Headers:
+        return httpx.Headers({
+            "x-ratelimit-limit": "5000",
+            "x-ratelimit-remaining": str(remaining),
+            "x-ratelimit-reset": str(reset),
+        })
+
+    async def test_concurrent_callers_get_successive_slots(self):
+        clock = FakeClock(1000.0)
+        rate_limit = GitHubRateLimit(reserve=10, clock=clock)
+        rate_limit.update("t", self.headers(5, 1100))
+
+        assert [rate_limit.delay("t") for _ in range(3)] == [0.0, 20.0, 40.0]
+
+    async def test_exhausted_quota_waits_for_reset(self):
+        clock = FakeClock(1000.0)
+        rate_limit = GitHubRateLimit(reserve=10, max_wait=60, clock=clock, sleep=clock.sleep)
+        rate_limit.update("t", self.headers(0, 1030))
+
+        await rate_limit.acquire("t")
+
+        assert clock.sleeps == [30.0]
+
+    async def test_exhausted_quota_past_max_wait_raises(self):
+        clock = FakeClock(1000.0)
+        rate_limit = GitHubRateLimit(reserve=10, max_wait=60, clock=clock, sleep=clock.sleep)
+        rate_limit.update("t", self.headers(0, 2000))
+
+        with pytest.raises(GitHubRateLimitExceeded) as exc:
+            await rate_limit.acquire("t")
+        assert exc.value.retry_after == 1000.0
+        assert clock.sleeps == []
+
+    async def test_window_rollover_stops_throttling(self):
+        clock = FakeClock(1000.0)
+        rate_limit = GitHubRateLimit(reserve=10, clock=clock)
+        rate_limit.update("t", self.headers(0, 1030))
+
+        clock.now = 1031.0
+        assert rate_limit.delay("t") == 0.0
+
+    async def test_ignores_responses_without_quota_headers(self):
+        rate_limit = GitHubRateLimit()
+        rate_limit.update("t", httpx.Headers({}))
+
+        assert rate_limit.quotas == {}
+        assert rate_limit.delay("t") == 0.0
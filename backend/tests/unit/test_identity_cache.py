@@ -0,0 +1,129 @@
+import uuid
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import inspect
+from starlette.requests import Request
+from app.middleware.auth import get_current_user
+from app.models.user import User
+from app.schemas.user import UserUpdate
+from app.services.identity_cache import UserIdentityCache, user_identity_cache
+from app.services.user_service import UserService
+from tests.fakes import FakeClock, FakeSession
+
+
+def make_user(**overrides) -> User:
+    fields = {
+        "id": uuid.uuid4(),
+        "email": "dev@example.com",
+        "username": "dev",
+        "full_name": "Dev",
+        "hashed_password": "hash",
+        "created_at": datetime(2024, 1, 1),
+        "updated_at": None,
+    }
+    fields.update(overrides)
+    return User(**fields)
+
+
+def make_request(user_id) -> Request:
+    return Request({"type": "http", "state": {"user_id": str(user_id)}})
+
+
+@pytest.fixture(autouse=True)
+def clear_identity_cache():
+    user_identity_cache.clear()
+    yield
+    user_identity_cache.clear()
+
+
+class TestUserIdentityCache:
+    """Unit tests for the user snapshot cache."""
+
+    def test_snapshot_round_trip(self):
+        cache = UserIdentityCache()
+        user = make_user()
+        cache.put(user)
+
+        cached = cache.get(str(user.id))
+        assert cached is not user
+        assert (cached.id, cached.email, cached.username) == (user.id, user.email, user.username)
+        assert inspect(cached).detached
+        assert "hashed_password" not in cache.entries[str(user.id)][0]
+
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = UserIdentityCache(ttl_seconds=5, clock=clock)
+        user = make_user()
+        cache.put(user)
+
+        clock.now = 4.9
+        assert cache.get(str(user.id)) is not None
+        clock.now = 5.0
+        assert cache.get(str(user.id)) is None
+        assert cache.stats()["size"] == 0
+
+    def test_invalidate(self):
+        cache = UserIdentityCache()
+        user = make_user()
+        cache.put(user)
+        cache.invalidate(user.id)
+        assert cache.get(str(user.id)) is None
+
+    def test_lru_bound(self):
+        cache = UserIdentityCache(max_size=2)
+        users = [make_user() for _ in range(3)]
+        for user in users:
+            cache.put(user)
+        assert cache.get(str(users[0].id)) is None
+        assert cache.stats()["size"] == 2
+
+
+class TestGetCurrentUser:
+    """Unit tests for resolving the caller."""
+
+    async def test_memoized_within_request(self):
+        user = make_user()
+        db = FakeSession([user])
+        request = make_request(user.id)
+
+        first = await get_current_user(request, db)
+        second = await get_current_user(request, db)
+
+        assert first is second
+        assert len(db.statements) == 1
+
+    async def test_later_requests_skip_database(self):
+        user = make_user()
+        await get_current_user(make_request(user.id), FakeSession([user]))
+
+        db = FakeSession()
+        cached = await get_current_user(make_request(user.id), db)
+
+        assert cached.id == user.id
+        assert db.statements == []
+
+    async def test_unknown_user(self):
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(make_request(uuid.uuid4()), FakeSession())
+        assert exc.value.status_code == 401
+
+    async def test_update_invalidates(self):
+        user = make_user()
+        await get_current_user(make_request(user.id), FakeSession([user]))
+
+        await UserService(FakeSession([user])).update(str(user.id), UserUpdate(full_name="New"))
+
+        db = FakeSession([user])
+        refreshed = await get_current_user(make_request(user.id), db)
+        assert refreshed.full_name == "New"
+        assert len(db.statements) == 1
+
+    async def test_delete_invalidates(self):
+        user = make_user()
+        await get_current_user(make_request(user.id), FakeSession([user]))
+
+        await UserService(FakeSession([user])).delete(str(user.id))
+
+        with pytest.raises(HTTPException):
+            await get_current_user(make_request(user.id), FakeSession())
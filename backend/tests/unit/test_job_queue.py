@@ -0,0 +1,269 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.api.v1 import agents
+from app.core.database import get_db
+from app.models.agent import AgentExecution, AgentStatus
+from app.services.execution_stream import execution_streams
+from app.services.job_queue import AgentJobQueue, AgentJobWorker
+from tests.fakes import FakeClock, FakeResult, FakeSession
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_sessions(path) -> async_sessionmaker:
+    """Session factory on its own engine, like a separate worker process."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+async def db_path(tmp_path, sqlite_postgres_types):
+    path = tmp_path / "queue.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: AgentExecution.__table__.create(c))
+    await engine.dispose()
+    return path
+
+
+async def enqueue(sessions, count: int) -> list:
+    ids = [uuid.uuid4() for _ in range(count)]
+    async with sessions() as db:
+        for i, execution_id in enumerate(ids):
+            db.add(AgentExecution(
+                id=execution_id,
+                project_id=uuid.uuid4(),
+                agent_type="code-reviewer",
+                task_description="Review",
+                status=AgentStatus.PENDING,
+                started_at=START + timedelta(seconds=i),
+            ))
+        await db.commit()
+    return ids
+
+
+async def load(sessions, execution_id) -> AgentExecution:
+    async with sessions() as db:
+        return await db.get(AgentExecution, execution_id)
+
+
+class TestAgentJobQueue:
+    """Unit tests for claiming executions from the database."""
+
+    async def test_claims_oldest_pending_once(self, db_path):
+        sessions = make_sessions(db_path)
+        queue = AgentJobQueue(sessions, lease_seconds=60, clock=FakeClock(START))
+        ids = await enqueue(sessions, 2)
+
+        assert await queue.claim("a") == ids[0]
+        assert await queue.claim("b") == ids[1]
+        assert await queue.claim("c") is None
+
+        execution = await load(sessions, ids[0])
+        assert execution.status == AgentStatus.RUNNING
+        assert execution.claimed_by == "a"
+        assert execution.attempts == 1
+
+    async def test_expired_lease_is_retried_by_another_worker(self, db_path):
+        sessions = make_sessions(db_path)
+        clock = FakeClock(START)
+        queue = AgentJobQueue(sessions, lease_seconds=60, clock=clock)
+        [execution_id] = await enqueue(sessions, 1)
+        await queue.claim("a")
+
+        clock.now += timedelta(seconds=30)
+        assert await queue.heartbeat(execution_id, "a")
+        clock.now += timedelta(seconds=45)
+        assert await queue.claim("b") is None
+
+        clock.now += timedelta(seconds=16)
+        assert await queue.claim("b") == execution_id
+        assert not await queue.heartbeat(execution_id, "a")
+        assert (await load(sessions, execution_id)).attempts == 2
+
+    async def test_fails_after_max_attempts(self, db_path):
+        sessions = make_sessions(db_path)
+        clock = FakeClock(START)
+        queue = AgentJobQueue(sessions, lease_seconds=60, max_attempts=2, clock=clock)
+        [execution_id] = await enqueue(sessions, 1)
+
+        for worker_id in ("a", "b"):
+            assert await queue.claim(worker_id) == execution_id
+            clock.now += timedelta(seconds=61)
+        assert await queue.claim("c") is None
+        assert await queue.fail_exhausted() == 1
+
+        execution = await load(sessions, execution_id)
+        assert execution.status == AgentStatus.FAILED
+        assert "lost its lease 2 times" in execution.error_message
+
+    async def test_release_returns_execution_to_queue(self, db_path):
+        sessions = make_sessions(db_path)
+        queue = AgentJobQueue(sessions, clock=FakeClock(START))
+        [execution_id] = await enqueue(sessions, 1)
+        await queue.claim("a")
+
+        await queue.release(execution_id, "a")
+
+        execution = await load(sessions, execution_id)
+        assert execution.status == AgentStatus.PENDING
+        assert execution.attempts == 0
+        assert await queue.claim("b") == execution_id
+
+    async def test_concurrent_workers_never_share_an_execution(self, db_path):
+        ids = await enqueue(make_sessions(db_path), 40)
+        queues = [AgentJobQueue(make_sessions(db_path)) for _ in range(4)]
+
+        async def drain(queue, worker_id):
+            claimed = []
+            while (execution_id := await queue.claim(worker_id)) is not None:
+                claimed.append(execution_id)
+            return claimed
+
+        results = await asyncio.gather(*(
+            drain(queue, f"w{i}-{j}") for i, queue in enumerate(queues) for j in range(3)
+        ))
+
+        claimed = [execution_id for result in results for execution_id in result]
+        assert sorted(claimed) == sorted(ids)
+
+    async def test_postgres_claim_skips_locked_rows(self):
+        session = FakeSession(FakeResult([]))
+        queue = AgentJobQueue(lambda: session)
+
+        assert await queue.claim("a") is None
+        sql = session.sql()
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "RETURNING agent_executions.id" in sql
+
+
+class TestAgentJobWorker:
+    """Unit tests for the worker process loop."""
+
+    async def test_workers_run_each_execution_once(self, db_path):
+        ids = await enqueue(make_sessions(db_path), 12)
+        runs = []
+
+        def make_worker(name):
+            sessions = make_sessions(db_path)
+
+            async def runner(execution_id):
+                runs.append(execution_id)
+                await asyncio.sleep(0.01)
+                async with sessions() as db:
+                    execution = await db.get(AgentExecution, execution_id)
+                    execution.status = AgentStatus.COMPLETED
+                    await db.commit()
+
+            return AgentJobWorker(
+                AgentJobQueue(sessions), worker_id=name, concurrency=3,
+                poll_interval=0.01, runner=runner,
+            )
+
+        workers = [make_worker("a"), make_worker("b")]
+        tasks = [asyncio.create_task(w.run()) for w in workers]
+        for _ in range(200):
+            if len(runs) == len(ids):
+                break
+            await asyncio.sleep(0.01)
+        for worker in workers:
+            worker.stop()
+        await asyncio.wait_for(asyncio.gather(*tasks), 5)
+
+        assert sorted(runs) == sorted(ids)
+        assert sum(w.processed for w in workers) == len(ids)
+
+    async def test_heartbeat_keeps_long_execution_claimed(self, db_path):
+        sessions = make_sessions(db_path)
+        [execution_id] = await enqueue(sessions, 1)
+        queue = AgentJobQueue(sessions, lease_seconds=0.15)
+        started = asyncio.Event()
+        done = asyncio.Event()
+
+        async def runner(execution_id):
+            started.set()
+            await asyncio.sleep(0.4)
+            done.set()
+
+        worker = AgentJobWorker(queue, worker_id="a", concurrency=1, poll_interval=0.01, runner=runner)
+        other = AgentJobQueue(sessions, lease_seconds=0.15)
+        task = asyncio.create_task(worker.run())
+        await asyncio.wait_for(started.wait(), 1)
+
+        while not done.is_set():
+            assert await other.claim("b") is None
+            await asyncio.sleep(0.05)
+        worker.stop()
+        await task
+
+    async def test_stop_releases_unfinished_execution(self, db_path):
+        sessions = make_sessions(db_path)
+        [execution_id] = await enqueue(sessions, 1)
+        started = asyncio.Event()
+
+        async def runner(execution_id):
+            started.set()
+            await asyncio.sleep(10)
+
+        worker = AgentJobWorker(
+            AgentJobQueue(sessions), worker_id="a", concurrency=1,
+            poll_interval=0.01, drain_timeout=0.05, runner=runner,
+        )
+        task = asyncio.create_task(worker.run())
+        await asyncio.wait_for(started.wait(), 1)
+        worker.stop()
+        await asyncio.wait_for(task, 1)
+
+        execution = await load(sessions, execution_id)
+        assert execution.status == AgentStatus.PENDING
+        assert execution.claimed_by is None
+
+
+class TestDurableExecuteEndpoint:
+    """POST /agents with AGENT_QUEUE_BACKEND=database."""
+
+    def make_app(self, session) -> FastAPI:
+        app = FastAPI()
+        app.include_router(agents.router, prefix="/api/v1/agents")
+
+        async def fake_db():
+            yield session
+
+        app.dependency_overrides[get_db] = fake_db
+        return app
+
+    def body(self) -> dict:
+        return {
+            "project_id": str(uuid.uuid4()),
+            "agent_type": "code-reviewer",
+            "task_description": "Review",
+            "input_data": {"code_content": "x = 1", "file_path": "x.py"},
+        }
+
+    async def test_leaves_pending_row_for_workers(self, monkeypatch):
+        monkeypatch.setattr(agents.settings, "agent_queue_backend", "database")
+        session = FakeSession([], [[3]])
+
+        async with AsyncClient(transport=ASGITransport(app=self.make_app(session)), base_url="http://test") as c:
+            response = await c.post("/api/v1/agents", json=self.body())
+
+        assert response.status_code == 202
+        [execution] = session.added
+        assert execution.status == "pending"
+        assert execution_streams.get(execution.id) is None
+
+    async def test_full_queue_returns_429(self, monkeypatch):
+        monkeypatch.setattr(agents.settings, "agent_queue_backend", "database")
+        monkeypatch.setattr(agents.settings, "agent_queue_size", 3)
+        session = FakeSession([], [[3]])
+
+        async with AsyncClient(transport=ASGITransport(app=self.make_app(session)), base_url="http://test") as c:
+            response = await c.post("/api/v1/agents", json=self.body())
+
+        assert response.status_code == 429
+        assert session.added == []
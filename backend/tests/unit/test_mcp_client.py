@@ -0,0 +1,375 @@
+import uuid
+from datetime import datetime, timezone
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.api.v1 import mcp as mcp_api
+from app.core.database import get_db
+from app.models.mcp import MCPServer, MCPServerStatus, MCPServerType
+from app.services.mcp_client import (
+    CircuitBreaker,
+    MCPConnectionManager,
+    MCPServerError,
+    MCPServerUnavailable,
+    MCPSession,
+    MCPToolError,
+)
+from tests.fakes import FakeClock, FakeMCPServer, FakeSession
+
+CHECKED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def mcp_server():
+    server = FakeMCPServer()
+    server.endpoint = await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def dead_endpoint():
+    """URL of a port nothing listens on any more."""
+    server = FakeMCPServer()
+    endpoint = await server.start()
+    await server.stop()
+    return endpoint
+
+
+class TestMCPSession:
+    """Unit tests for pooled MCP sessions."""
+
+    async def test_reuses_connection_and_session(self, mcp_server):
+        session = MCPSession(mcp_server.endpoint)
+
+        for i in range(5):
+            result = await session.call_tool("echo", {"n": i})
+            assert result == {"content": [{"type": "text", "text": f'{{"n": {i}}}'}]}
+        await session.close()
+
+        assert mcp_server.connections == 1
+        assert mcp_server.methods() == ["initialize", "notifications/initialized"] + ["tools/call"] * 5
+        _, headers = mcp_server.requests[-1]
+        assert headers["mcp-session-id"] == session.session_id
+        assert "text/event-stream" in headers["accept"]
+
+    async def test_reinitializes_expired_session(self, mcp_server):
+        session = MCPSession(mcp_server.endpoint)
+        await session.call_tool("echo", {})
+        first_session_id = session.session_id
+
+        mcp_server.expire_sessions()
+        await session.call_tool("echo", {})
+        await session.close()
+
+        assert session.session_id != first_session_id
+        assert session.initializations == 2
+        assert mcp_server.methods()[-4:] == ["tools/call", "initialize", "notifications/initialized", "tools/call"]
+
+    async def test_reads_event_stream_responses(self, mcp_server):
+        mcp_server.sse = True
+        session = MCPSession(mcp_server.endpoint)
+
+        result = await session.call_tool("echo", {"a": 1})
+        await session.close()
+
+        assert result["content"][0]["text"] == '{"a": 1}'
+
+    async def test_tool_error_does_not_count_against_server(self, mcp_server):
+        session = MCPSession(mcp_server.endpoint, breaker=CircuitBreaker(failure_threshold=1))
+
+        with pytest.raises(MCPToolError) as exc:
+            await session.call_tool("missing", {})
+        await session.close()
+
+        assert exc.value.code == -32602
+        assert session.breaker.state == "closed"
+
+    async def test_failing_server_trips_breaker(self, mcp_server):
+        clock = FakeClock()
+        session = MCPSession(mcp_server.endpoint, breaker=CircuitBreaker(2, 30, clock))
+        await session.call_tool("echo", {})
+        mcp_server.failing = True
+
+        for _ in range(2):
+            with pytest.raises(MCPServerError):
+                await session.call_tool("echo", {})
+        sent = len(mcp_server.requests)
+
+        with pytest.raises(MCPServerUnavailable) as exc:
+            await session.call_tool("echo", {})
+        assert exc.value.retry_after == 30
+        assert len(mcp_server.requests) == sent
+
+        # After the timeout one trial call goes through and closes the breaker
+        mcp_server.failing = False
+        clock.now = 31
+        await session.call_tool("echo", {})
+        await session.close()
+        assert session.breaker.state == "closed"
+
+    async def test_unreachable_server_fails(self, dead_endpoint):
+        session = MCPSession(dead_endpoint, breaker=CircuitBreaker(failure_threshold=1))
+
+        with pytest.raises(MCPServerError):
+            await session.call_tool("echo", {})
+        with pytest.raises(MCPServerUnavailable):
+            await session.call_tool("echo", {})
+        await session.close()
+
+
+class TestCircuitBreaker:
+    """Unit tests for the breaker states."""
+
+    def test_half_open_allows_a_single_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        clock.now = 10
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.retry_after() == 10
+
+    def test_released_trial_can_be_retried(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.allow()
+
+    def test_trip_opens_until_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10, clock=clock)
+        breaker.trip()
+
+        assert not breaker.allow()
+        clock.now = 10
+        assert breaker.allow()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == "closed"
+
+
+class TestHealthChecks:
+    """Unit tests for MCPConnectionManager.check_health."""
+
+    @pytest.fixture
+    async def sessions(self, tmp_path, sqlite_postgres_types):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'mcp.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda c: MCPServer.__table__.create(c))
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        await engine.dispose()
+
+    async def add_server(self, sessions, name, endpoint, status=MCPServerStatus.ACTIVE) -> uuid.UUID:
+        async with sessions() as db:
+            server = MCPServer(
+                id=uuid.uuid4(),
+                name=name,
+                server_type=MCPServerType.GITHUB,
+                endpoint=endpoint,
+                status=status,
+            )
+            db.add(server)
+            await db.commit()
+            return server.id
+
+    async def load(self, sessions, server_id) -> MCPServer:
+        async with sessions() as db:
+            return await db.get(MCPServer, server_id)
+
+    async def test_updates_status_and_last_health_check(self, sessions, mcp_server, dead_endpoint):
+        up = await self.add_server(sessions, "up", mcp_server.endpoint)
+        down = await self.add_server(sessions, "down", dead_endpoint)
+        off = await self.add_server(sessions, "off", dead_endpoint, MCPServerStatus.INACTIVE)
+        manager = MCPConnectionManager(sessions, clock=lambda: CHECKED_AT)
+
+        results = await manager.check_health()
+        await manager.stop()
+
+        assert results == {up: True, down: False}
+        assert (await self.load(sessions, up)).status == MCPServerStatus.ACTIVE
+        assert (await self.load(sessions, down)).status == MCPServerStatus.ERROR
+        assert (await self.load(sessions, off)).status == MCPServerStatus.INACTIVE
+        checked = (await self.load(sessions, up)).last_health_check
+        assert checked.replace(tzinfo=timezone.utc) == CHECKED_AT
+
+    async def test_pings_reuse_the_tool_session(self, sessions, mcp_server):
+        server_id = await self.add_server(sessions, "up", mcp_server.endpoint)
+        manager = MCPConnectionManager(sessions)
+
+        await manager.check_health()
+        server = await self.load(sessions, server_id)
+        await manager.call_tool(server, "echo", {})
+        await manager.check_health()
+        await manager.stop()
+
+        assert mcp_server.connections == 1
+        assert mcp_server.methods().count("initialize") == 1
+
+    async def test_failed_pings_trip_the_breaker(self, sessions, dead_endpoint):
+        server_id = await self.add_server(sessions, "down", dead_endpoint)
+        manager = MCPConnectionManager(
+            sessions,
+            session_class=lambda endpoint: MCPSession(endpoint, breaker=CircuitBreaker(failure_threshold=2)),
+        )
+
+        await manager.check_health()
+        await manager.check_health()
+        server = await self.load(sessions, server_id)
+
+        with pytest.raises(MCPServerUnavailable):
+            await manager.call_tool(server, "echo", {})
+        await manager.stop()
+
+    async def test_prunes_sessions_of_removed_servers(self, sessions, mcp_server, dead_endpoint):
+        up = await self.add_server(sessions, "up", mcp_server.endpoint)
+        off = await self.add_server(sessions, "off", dead_endpoint, MCPServerStatus.INACTIVE)
+        removed = uuid.uuid4()
+        manager = MCPConnectionManager(sessions)
+        stale = [await manager.session(removed, dead_endpoint), await manager.session(off, dead_endpoint)]
+
+        await manager.check_health()
+
+        assert list(manager.sessions) == [up]
+        assert all(session.http_client.is_closed for session in stale)
+        await manager.stop()
+
+    async def test_error_status_starts_with_open_breaker(self, mcp_server):
+        manager = MCPConnectionManager(FakeSession)
+
+        session = await manager.session(uuid.uuid4(), mcp_server.endpoint, MCPServerStatus.ERROR)
+        await manager.stop()
+
+        assert session.breaker.state == "open"
+
+    async def test_changed_endpoint_gets_a_new_session(self, mcp_server):
+        manager = MCPConnectionManager(FakeSession)
+        server_id = uuid.uuid4()
+
+        first = await manager.session(server_id, mcp_server.endpoint)
+        assert await manager.session(server_id, mcp_server.endpoint) is first
+        second = await manager.session(server_id, mcp_server.endpoint + "/v2")
+        await manager.stop()
+
+        assert second is not first
+        assert first.http_client.is_closed
+
+
+class TestExecuteEndpoint:
+    """POST /mcp/servers/{id}/execute."""
+
+    def make_app(self, session) -> FastAPI:
+        app = FastAPI()
+        app.include_router(mcp_api.router, prefix="/api/v1/mcp")
+
+        async def fake_db():
+            yield session
+
+        app.dependency_overrides[get_db] = fake_db
+        return app
+
+    @pytest.fixture
+    async def manager(self, monkeypatch):
+        manager = MCPConnectionManager(FakeSession)
+        monkeypatch.setattr(mcp_api, "mcp_connections", manager)
+        yield manager
+        await manager.stop()
+
+    async def execute(self, server, tool_name="echo"):
+        app = self.make_app(FakeSession([server]))
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            return await c.post(
+                f"/api/v1/mcp/servers/{server.id}/execute",
+                json={"tool_name": tool_name, "parameters": {"x": 1}},
+            )
+
+    def server(self, endpoint, status=MCPServerStatus.ACTIVE) -> MCPServer:
+        return MCPServer(
+            id=uuid.uuid4(), name="gh", server_type=MCPServerType.GITHUB, endpoint=endpoint, status=status,
+        )
+
+    async def test_calls_tool_on_server(self, manager, mcp_server):
+        response = await self.execute(self.server(mcp_server.endpoint))
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["tool_name"] == "echo"
+        assert data["result"]["content"][0]["text"] == '{"x": 1}'
+
+    async def test_unknown_tool_is_a_bad_request(self, manager, mcp_server):
+        response = await self.execute(self.server(mcp_server.endpoint), tool_name="missing")
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"]["code"] == "MCP_TOOL_ERROR"
+
+    async def test_dead_server_fails_fast(self, manager, dead_endpoint, monkeypatch):
+        monkeypatch.setattr(manager, "session_class", lambda endpoint: MCPSession(
+            endpoint, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30),
+        ))
+        server = self.server(dead_endpoint)
+
+        first = await self.execute(server)
+        second = await self.execute(server)
+
+        assert first.status_code == 502
+        assert second.status_code == 503
+        assert second.json()["detail"]["error"]["code"] == "MCP_SERVER_UNAVAILABLE"
+        assert second.headers["retry-after"] == "30"
+
+    async def test_missing_server_is_404(self, manager):
+        app = self.make_app(FakeSession([]))
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            response = await c.post(f"/api/v1/mcp/servers/{uuid.uuid4()}/execute", json={"tool_name": "echo"})
+
+        assert response.status_code == 404
+
+    async def test_server_in_error_is_refused(self, manager, mcp_server):
+        manager.health_check_interval = 30
+        response = await self.execute(self.server(mcp_server.endpoint, MCPServerStatus.ERROR))
+
+        assert response.status_code == 503
+        assert response.json()["detail"]["error"]["code"] == "MCP_SERVER_UNAVAILABLE"
+        assert response.headers["retry-after"] == "30"
+        assert mcp_server.requests == []
+
+    async def test_inactive_server_is_refused(self, manager, mcp_server):
+        server = self.server(mcp_server.endpoint)
+        await self.execute(server)
+        session = manager.sessions[server.id]
+
+        server.status = MCPServerStatus.INACTIVE
+        response = await self.execute(server)
+
+        assert response.status_code == 503
+        assert response.json()["detail"]["error"]["code"] == "MCP_SERVER_INACTIVE"
+        assert server.id not in manager.sessions
+        assert session.http_client.is_closed
+
+    async def test_deleted_server_session_is_closed(self, manager, mcp_server):
+        server = self.server(mcp_server.endpoint)
+        await self.execute(server)
+        session = manager.sessions[server.id]
+
+        app = self.make_app(FakeSession([]))
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            response = await c.post(f"/api/v1/mcp/servers/{server.id}/execute", json={"tool_name": "echo"})
+
+        assert response.status_code == 404
+        assert server.id not in manager.sessions
+        assert session.http_client.is_closed
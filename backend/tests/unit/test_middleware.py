@@ -0,0 +1,219 @@
+import asyncio
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from app.core.security import create_access_token, create_refresh_token
+from datetime import timedelta
+from app.middleware import (
+    AuthMiddleware,
+    RateLimitMiddleware,
+    RequestLoggingMiddleware,
+    VerifiedTokenCache,
+)
+from tests.fakes import FakeClock
+
+
+async def whoami(request: Request):
+    return JSONResponse({"user_id": getattr(request.state, "user_id", None)})
+
+
+async def chunks(request: Request):
+    async def body():
+        for i in range(3):
+            yield f"chunk{i}\n"
+    return StreamingResponse(body(), media_type="text/plain")
+
+
+def build_app(max_requests: int = 100) -> Starlette:
+    """Trivial app wrapped in the same middleware order as app.main."""
+    app = Starlette(routes=[
+        Route("/api/v1/health", whoami),
+        Route("/api/v1/me", whoami),
+        Route("/api/v1/stream", chunks),
+    ])
+    app.add_middleware(RateLimitMiddleware, max_requests=max_requests, window_seconds=60)
+    app.add_middleware(RequestLoggingMiddleware)
+    app.add_middleware(AuthMiddleware)
+    return app
+
+
+@pytest.fixture
+def client():
+    def make(**kwargs):
+        return AsyncClient(transport=ASGITransport(app=build_app(**kwargs)), base_url="http://test")
+    return make
+
+
+def auth_header(user_id: str = "user-1") -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+
+class TestAuthMiddleware:
+    """Unit tests for the ASGI auth middleware."""
+
+    async def test_public_path_skips_auth(self, client):
+        async with client() as c:
+            response = await c.get("/api/v1/health")
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize("headers, code", [
+        ({}, "NO_AUTH_HEADER"),
+        ({"Authorization": "Token abc"}, "INVALID_AUTH_FORMAT"),
+        ({"Authorization": "Bearer not-a-jwt"}, "INVALID_TOKEN"),
+    ])
+    async def test_rejects_bad_credentials(self, client, headers, code):
+        async with client() as c:
+            response = await c.get("/api/v1/me", headers=headers)
+        assert response.status_code == 401
+        assert response.json()["error"]["code"] == code
+
+    async def test_rejects_refresh_token(self, client):
+        token = create_refresh_token({"sub": "user-1"})
+        async with client() as c:
+            response = await c.get("/api/v1/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.json()["error"]["code"] == "INVALID_TOKEN_TYPE"
+
+    async def test_sets_request_state(self, client):
+        async with client() as c:
+            response = await c.get("/api/v1/me", headers=auth_header("user-42"))
+        assert response.json() == {"user_id": "user-42"}
+
+
+class TestVerifiedTokenCache:
+    """Unit tests for the verified-JWT cache."""
+
+    def test_second_decode_is_a_hit(self):
+        cache = VerifiedTokenCache()
+        token = create_access_token({"sub": "user-1"})
+
+        first = cache.decode(token)
+        assert cache.decode(token) == first
+        assert first["sub"] == "user-1"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_invalid_token_not_cached(self):
+        cache = VerifiedTokenCache()
+        assert cache.decode("not-a-jwt") is None
+        assert cache.stats()["size"] == 0
+
+    def test_entry_not_served_after_exp(self):
+        clock = FakeClock(1_000.0)
+        cache = VerifiedTokenCache(clock=clock)
+        cache.put("token", {"sub": "user-1", "exp": 1_060})
+
+        assert cache.get("token") is not None
+        clock.now = 1_060.0
+        assert cache.get("token") is None
+        assert cache.stats()["size"] == 0
+
+    def test_expired_entries_evicted_on_insert(self):
+        clock = FakeClock(1_000.0)
+        cache = VerifiedTokenCache(clock=clock)
+        for i in range(3):
+            cache.put(f"old-{i}", {"exp": 1_010})
+        clock.now = 1_020.0
+        cache.put("fresh", {"exp": 2_000})
+
+        assert cache.stats()["size"] == 1
+
+    def test_lru_bound(self):
+        cache = VerifiedTokenCache(max_size=2, clock=FakeClock(0.0))
+        cache.put("a", {"exp": 100})
+        cache.put("b", {"exp": 100})
+        cache.get("a")
+        cache.put("c", {"exp": 100})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_disabled_when_size_zero(self):
+        cache = VerifiedTokenCache(max_size=0)
+        token = create_access_token({"sub": "user-1"})
+        cache.decode(token)
+        assert cache.decode(token)["sub"] == "user-1"
+        assert cache.stats()["hits"] == 0
+
+    async def test_middleware_uses_cache(self):
+        cache = VerifiedTokenCache()
+        app = Starlette(routes=[Route("/api/v1/me", whoami)])
+        app.add_middleware(AuthMiddleware, cache=cache)
+        headers = auth_header("user-7")
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            for _ in range(3):
+                response = await c.get("/api/v1/me", headers=headers)
+            expired = create_access_token({"sub": "user-7"}, timedelta(seconds=-1))
+            rejected = await c.get("/api/v1/me", headers={"Authorization": f"Bearer {expired}"})
+
+        assert response.json() == {"user_id": "user-7"}
+        assert cache.stats()["hits"] == 2
+        assert rejected.status_code == 401
+
+
+class TestRateLimitMiddleware:
+    """Unit tests for the ASGI rate limit middleware."""
+
+    async def test_adds_headers_and_limits_per_user(self, client):
+        async with client(max_requests=2) as c:
+            first = await c.get("/api/v1/me", headers=auth_header("a"))
+            await c.get("/api/v1/me", headers=auth_header("a"))
+            denied = await c.get("/api/v1/me", headers=auth_header("a"))
+            other = await c.get("/api/v1/me", headers=auth_header("b"))
+
+        assert first.headers["X-RateLimit-Limit"] == "2"
+        assert first.headers["X-RateLimit-Remaining"] == "1"
+        assert denied.status_code == 429
+        assert denied.json()["error"]["code"] == "RATE_LIMIT_EXCEEDED"
+        assert other.status_code == 200
+
+    async def test_health_not_limited(self, client):
+        async with client(max_requests=1) as c:
+            responses = [await c.get("/api/v1/health") for _ in range(3)]
+        assert all(r.status_code == 200 for r in responses)
+        assert "X-RateLimit-Limit" not in responses[0].headers
+
+
+class TestRequestLoggingMiddleware:
+    """Unit tests for the ASGI request logging middleware."""
+
+    async def test_adds_process_time(self, client):
+        async with client() as c:
+            response = await c.get("/api/v1/health")
+        assert float(response.headers["X-Process-Time"]) >= 0
+
+    async def test_streaming_passes_through_chunks(self):
+        """Test body chunks reach the server unbuffered through all layers."""
+        app = build_app()
+        scope = {
+            "type": "http", "method": "GET", "path": "/api/v1/stream",
+            "headers": [(b"authorization", auth_header()["Authorization"].encode())],
+            "query_string": b"", "client": ("127.0.0.1", 1234),
+            "server": ("test", 80), "scheme": "http", "root_path": "",
+            "http_version": "1.1",
+        }
+        sent = []
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            # Client stays connected until the response finishes
+            await asyncio.Event().wait()
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+
+        start = sent[0]
+        bodies = [m["body"] for m in sent[1:] if m["body"]]
+        assert start["status"] == 200
+        header_names = {name for name, _ in start["headers"]}
+        assert {b"x-process-time", b"x-ratelimit-remaining"} <= header_names
+        assert bodies == [b"chunk0\n", b"chunk1\n", b"chunk2\n"]
@@ -0,0 +1,147 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, String, Uuid, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from app.core.pagination import (
+    CountMode,
+    PageParams,
+    count_rows,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+
+PaginationBase = declarative_base()
+
+
+class Event(PaginationBase):
+    """Portable table used to exercise pagination on SQLite."""
+
+    __tablename__ = "events"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    closed_at = Column(DateTime)
+
+
+def page_params(page=1, per_page=20, cursor=None, count=CountMode.EXACT) -> PageParams:
+    return PageParams(page=page, per_page=per_page, cursor=cursor, count=count)
+
+
+@pytest.fixture
+async def events_db():
+    """SQLite session with 25 events, several sharing a timestamp."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(PaginationBase.metadata.create_all)
+
+    base = datetime(2024, 1, 1)
+    async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+        for i in range(25):
+            session.add(Event(
+                kind="even" if i % 2 == 0 else "odd",
+                timestamp=base + timedelta(minutes=i // 3),
+            ))
+        await session.commit()
+        yield session
+
+    await engine.dispose()
+
+
+class TestCursor:
+    """Unit tests for cursor encoding."""
+
+    def test_round_trip(self):
+        """Test cursor encodes and decodes to the same position."""
+        ts = datetime(2024, 5, 1, 12, 30)
+        row_id = uuid.uuid4()
+        assert decode_cursor(encode_cursor(ts, row_id)) == (ts, row_id)
+
+    def test_invalid_cursor_rejected(self):
+        """Test malformed cursors become a 400 error."""
+        with pytest.raises(HTTPException) as exc:
+            page_params(cursor="not-a-cursor")
+        assert exc.value.status_code == 400
+
+
+class TestPaginate:
+    """Unit tests for count and keyset pagination."""
+
+    async def test_exact_count(self, events_db):
+        """Test exact count uses SELECT count(*)."""
+        total, is_exact = await count_rows(
+            events_db, select(Event).where(Event.kind == "even")
+        )
+        assert (total, is_exact) == (13, True)
+
+    async def test_capped_count(self, events_db):
+        """Test capped count stops at the cap."""
+        total, is_exact = await count_rows(
+            events_db, select(Event), CountMode.CAPPED, cap=10
+        )
+        assert (total, is_exact) == (10, False)
+
+    async def test_estimated_count_falls_back_to_exact(self, events_db):
+        """Test estimated mode is exact where the planner is unavailable."""
+        total, is_exact = await count_rows(events_db, select(Event), CountMode.ESTIMATED)
+        assert (total, is_exact) == (25, True)
+
+    async def test_cursor_walk_matches_full_ordering(self, events_db):
+        """Test following next_cursor visits every row exactly once, in order."""
+        result = await events_db.execute(
+            select(Event).order_by(Event.timestamp.desc(), Event.id.desc())
+        )
+        expected = [e.id for e in result.scalars().all()]
+
+        seen = []
+        cursor = None
+        while True:
+            page = await paginate(
+                events_db, select(Event), page_params(per_page=7, cursor=cursor),
+                Event.timestamp, Event.id,
+            )
+            seen.extend(e.id for e in page["items"])
+            cursor = page["meta"]["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == expected
+
+    async def test_offset_page_meta(self, events_db):
+        """Test page-number pagination still works and reports totals."""
+        page = await paginate(
+            events_db, select(Event), page_params(page=4, per_page=7),
+            Event.timestamp, Event.id,
+        )
+        assert len(page["items"]) == 4
+        assert page["meta"]["total"] == 25
+        assert page["meta"]["total_pages"] == 4
+        assert page["meta"]["next_cursor"] is None
+
+    async def test_cursor_pages_are_not_counted(self, events_db):
+        """Test pages fetched by cursor skip the count and report no totals."""
+        first = await paginate(
+            events_db, select(Event), page_params(per_page=7),
+            Event.timestamp, Event.id,
+        )
+        second = await paginate(
+            events_db, select(Event), page_params(per_page=7, cursor=first["meta"]["next_cursor"]),
+            Event.timestamp, Event.id,
+        )
+
+        assert first["meta"]["total"] == 25
+        assert second["meta"]["page"] is None
+        assert second["meta"]["total"] is None
+        assert second["meta"]["next_cursor"] is not None
+
+    async def test_nullable_sort_column_rejected(self, events_db):
+        """Test a nullable sort column is refused, since NULL has no cursor."""
+        with pytest.raises(ValueError):
+            await paginate(
+                events_db, select(Event), page_params(),
+                Event.closed_at, Event.id,
+            )
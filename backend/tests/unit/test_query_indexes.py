@@ -0,0 +1,103 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+from app.core.database import Base
+from app.models.ai_activity import AIActivity, AITool, ActivityCategory
+from app.models.pipeline import PipelineExecution
+from app.services.ai_activity_service import AIActivityService
+from tests.fakes import FakeSession
+
+PROJECT_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+@pytest.fixture(scope="module")
+def sqlite_engine(sqlite_postgres_types):
+    """SQLite schema built from the model metadata, indexes included.
+
+    Two years of activity across 20 projects are loaded and analyzed so the
+    planner works from realistic statistics rather than an empty table.
+    """
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(
+        engine,
+        tables=[AIActivity.__table__, PipelineExecution.__table__],
+    )
+
+    now = datetime.utcnow()
+    projects = [uuid.UUID(int=i) for i in range(1, 21)]
+    tools = list(AITool)
+    categories = list(ActivityCategory)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "project_id": projects[i % len(projects)],
+            "user_id": projects[0],
+            "tool_used": tools[i % len(tools)],
+            "category": categories[i % len(categories)],
+            "prompt": "prompt",
+            "timestamp": now - timedelta(hours=i * 3),
+        }
+        for i in range(6000)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(AIActivity.__table__), rows)
+        conn.execute(text("ANALYZE"))
+
+    yield engine
+    engine.dispose()
+
+
+async def captured_statement(method, *args, **kwargs):
+    """Run an AIActivityService method and return the statement it executed."""
+    db = FakeSession()
+    await method(AIActivityService(db), *args, **kwargs)
+    return db.statements[0]
+
+
+def query_plan(engine, statement) -> str:
+    """EXPLAIN QUERY PLAN output for a statement, as one string."""
+    sql = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+class TestQueryIndexes:
+    """EXPLAIN-based checks that hot AIActivityService queries hit an index."""
+
+    @pytest.mark.parametrize("method, args, indexes", [
+        (AIActivityService.get_project_activities, (PROJECT_ID,), {"ix_ai_activities_project_id_timestamp"}),
+        (AIActivityService.get_by_tool, (AITool.CLAUDE,), {"ix_ai_activities_tool_used_timestamp"}),
+        (AIActivityService.get_by_category, (ActivityCategory.TEST,), {"ix_ai_activities_category_timestamp"}),
+        (AIActivityService.get_date_range, (datetime(2024, 1, 1), datetime(2024, 2, 1)), {"ix_ai_activities_timestamp"}),
+        # Grouping by tool lets the planner skip-scan (tool_used, timestamp)
+        # instead of ranging over (timestamp) and sorting; both avoid a scan.
+        (AIActivityService.get_statistics, (), {"ix_ai_activities_timestamp", "ix_ai_activities_tool_used_timestamp"}),
+    ])
+    async def test_activity_queries_use_index(self, sqlite_engine, method, args, indexes):
+        """Test each service query is planned as a search on a composite index."""
+        statement = await captured_statement(method, *args)
+        plan = query_plan(sqlite_engine, statement)
+
+        assert plan.startswith("SEARCH ai_activities USING")
+        assert any(f"INDEX {index} (" in plan for index in indexes), plan
+
+    async def test_project_listing_avoids_sort(self, sqlite_engine):
+        """Test project listing reads rows in index order instead of sorting."""
+        statement = await captured_statement(
+            AIActivityService.get_project_activities, PROJECT_ID
+        )
+        assert "TEMP B-TREE" not in query_plan(sqlite_engine, statement)
+
+    def test_pipeline_listing_uses_index(self, sqlite_engine):
+        """Test pipeline listing by project is planned on the composite index."""
+        statement = (
+            select(PipelineExecution)
+            .where(PipelineExecution.project_id == PROJECT_ID)
+            .order_by(PipelineExecution.started_at.desc())
+        )
+        plan = query_plan(sqlite_engine, statement)
+
+        assert "ix_pipeline_executions_project_id_started_at" in plan
+        assert "TEMP B-TREE" not in plan
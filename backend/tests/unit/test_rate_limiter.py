@@ -0,0 +1,78 @@
+import pytest
+from app.middleware.rate_limit import RateLimiter
+from tests.fakes import FakeClock
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(1000.0)
+
+
+class TestRateLimiter:
+    """Unit tests for the token-bucket rate limiter."""
+
+    def test_allows_burst_up_to_limit(self, clock):
+        """Test a new key may use the whole limit at once."""
+        limiter = RateLimiter(clock=clock)
+        results = [limiter.is_allowed("ip:1", 5, 60) for _ in range(6)]
+        assert results == [True] * 5 + [False]
+        assert limiter.remaining("ip:1") == 0
+
+    def test_refills_at_steady_rate(self, clock):
+        """Test tokens come back at max_requests per window."""
+        limiter = RateLimiter(clock=clock)
+        for _ in range(5):
+            limiter.is_allowed("ip:1", 5, 60)
+
+        clock.now += 11.9
+        assert limiter.is_allowed("ip:1", 5, 60) is False
+        clock.now += 0.2
+        assert limiter.is_allowed("ip:1", 5, 60) is True
+
+    def test_keys_are_independent(self, clock):
+        """Test one client's usage does not affect another."""
+        limiter = RateLimiter(clock=clock)
+        for _ in range(5):
+            limiter.is_allowed("ip:1", 5, 60)
+        assert limiter.is_allowed("ip:2", 5, 60) is True
+
+    def test_state_is_constant_per_key(self, clock):
+        """Test per-key state does not grow with request count."""
+        limiter = RateLimiter(clock=clock)
+        for _ in range(1000):
+            limiter.is_allowed("ip:1", 100, 60)
+            clock.now += 0.01
+        assert len(limiter.buckets) == 1
+        assert len(limiter.buckets["ip:1"]) == 2
+
+    def test_idle_keys_evicted(self, clock):
+        """Test keys idle for a full window are dropped as traffic continues."""
+        limiter = RateLimiter(clock=clock)
+        for i in range(5):
+            limiter.is_allowed(f"ip:{i}", 10, 60)
+
+        clock.now += 61
+        limiter.is_allowed("ip:new", 10, 60)
+        assert list(limiter.buckets) == ["ip:new"]
+
+    def test_active_keys_not_evicted(self, clock):
+        """Test recently used keys survive eviction."""
+        limiter = RateLimiter(clock=clock)
+        limiter.is_allowed("ip:old", 10, 60)
+        clock.now += 30
+        limiter.is_allowed("ip:recent", 10, 60)
+        clock.now += 31
+
+        assert limiter.evict_idle(60) == 1
+        assert list(limiter.buckets) == ["ip:recent"]
+
+    def test_evicted_key_starts_full(self, clock):
+        """Test eviction does not change what a returning client may do."""
+        limiter = RateLimiter(clock=clock)
+        for _ in range(5):
+            limiter.is_allowed("ip:1", 5, 60)
+        clock.now += 60
+        limiter.evict_idle(60)
+
+        results = [limiter.is_allowed("ip:1", 5, 60) for _ in range(6)]
+        assert results == [True] * 5 + [False]
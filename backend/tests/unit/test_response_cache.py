@@ -0,0 +1,174 @@
+import sqlite3
+import pytest
+from app.services import ai_client as ai_client_module
+from app.services.ai_client import AIClient
+from app.services.response_cache import (
+    MemoryResponseCache,
+    ResponseCacheBackend,
+    SQLiteResponseCache,
+    cache_key,
+    create_response_cache,
+)
+from tests.fakes import FakeAIProvider, FakeClock
+
+
+def key(prompt: str = "review x.py", **overrides) -> str:
+    args = {"provider": "anthropic", "model": "m", "prompt": prompt, "temperature": 0, "max_tokens": 10}
+    args.update(overrides)
+    return cache_key(**args)
+
+
+class TestCacheKey:
+    """Unit tests for the content-addressed key."""
+
+    def test_stable(self):
+        assert key() == key()
+
+    @pytest.mark.parametrize("change", [
+        {"provider": "openai"},
+        {"model": "other"},
+        {"prompt": "review y.py"},
+        {"temperature": 0.5},
+        {"max_tokens": 11},
+        {"top_p": 0.9},
+    ])
+    def test_every_input_changes_key(self, change):
+        assert key(**change) != key()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(max_entries=1000, ttl_seconds=60):
+        clock = FakeClock(1_000.0)
+        if request.param == "memory":
+            return MemoryResponseCache(max_entries, ttl_seconds, clock=clock), clock
+        return SQLiteResponseCache(str(tmp_path / "cache.db"), max_entries, ttl_seconds, clock=clock), clock
+    return make
+
+
+class TestResponseCacheBackends:
+    """Behaviour shared by the memory and SQLite backends."""
+
+    async def test_round_trip(self, make_cache):
+        cache, _ = make_cache()
+        await cache.set("k", "review", 2.5)
+        assert await cache.get("k") == {"content": "review", "latency": 2.5}
+        assert await cache.get("missing") is None
+
+    async def test_ttl(self, make_cache):
+        cache, clock = make_cache(ttl_seconds=60)
+        await cache.set("k", "review", 1.0)
+        clock.now += 61
+        assert await cache.get("k") is None
+
+    async def test_size_cap_evicts_least_recently_used(self, make_cache, monkeypatch):
+        monkeypatch.setattr("app.services.response_cache.SQLITE_TRIM_INTERVAL", 1)
+        monkeypatch.setattr("app.services.response_cache.SQLITE_TOUCH_INTERVAL", 0)
+        cache, clock = make_cache(max_entries=2)
+        for name in ["a", "b"]:
+            await cache.set(name, name, 1.0)
+            clock.now += 1
+        await cache.get("a")
+        clock.now += 1
+        await cache.set("c", "c", 1.0)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert cache.stats()["size"] == 2
+
+    def test_factory(self, tmp_path):
+        assert create_response_cache("none") is None
+        assert isinstance(create_response_cache("memory"), MemoryResponseCache)
+        sqlite_cache = create_response_cache("sqlite", sqlite_path=str(tmp_path / "c.db"))
+        assert isinstance(sqlite_cache, SQLiteResponseCache)
+        with pytest.raises(ValueError):
+            create_response_cache("redis")
+
+    def test_backend_must_implement_get_and_set(self):
+        class GetOnly(ResponseCacheBackend):
+            async def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnly()
+
+    async def test_shared_between_sqlite_instances(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        await SQLiteResponseCache(path).set("k", "review", 1.0)
+        assert (await SQLiteResponseCache(path).get("k"))["content"] == "review"
+
+    async def test_sqlite_hits_do_not_write(self, tmp_path):
+        clock = FakeClock(1_000.0)
+        path = str(tmp_path / "cache.db")
+        cache = SQLiteResponseCache(path, clock=clock)
+        await cache.set("k", "review", 1.0)
+
+        # Readers go ahead while another process holds the write lock
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        clock.now += 1
+        assert (await cache.get("k"))["content"] == "review"
+        other.execute("ROLLBACK")
+        other.close()
+
+    async def test_locked_sqlite_store_skips_write(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        cache = SQLiteResponseCache(path, busy_timeout=0.01)
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+
+        await cache.set("k", "review", 1.0)
+        assert await cache.get("k") is None
+        other.execute("ROLLBACK")
+        other.close()
+
+        assert cache.stats()["errors"] == 1
+        await cache.set("k", "review", 1.0)
+        assert (await cache.get("k"))["content"] == "review"
+
+
+class TestAIClientCaching:
+    """Unit tests for cache use in AIClient.call_model and stream_model."""
+
+    @pytest.fixture
+    async def client(self, monkeypatch):
+        provider = FakeAIProvider()
+        base_url = await provider.start()
+        monkeypatch.setattr(ai_client_module.settings, "anthropic_api_key", "sk-ant-test")
+        monkeypatch.setattr(ai_client_module.settings, "anthropic_base_url", base_url)
+        client = AIClient(cache=MemoryResponseCache())
+        yield client, provider
+        await client.close()
+        await provider.stop()
+
+    async def test_deterministic_calls_hit_cache(self, client):
+        client, provider = client
+        first = await client.call_model("review x.py", temperature=0)
+        second = await client.call_model("review x.py", temperature=0)
+
+        assert first == second == "anthropic reply"
+        assert len(provider.requests) == 1
+        stats = client.cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["latency_saved_seconds"] > 0
+
+    async def test_sampled_calls_bypass_unless_forced(self, client):
+        client, provider = client
+        await client.call_model("review x.py")
+        await client.call_model("review x.py")
+        assert len(provider.requests) == 2
+        assert client.cache.stats()["bypasses"] == 2
+
+        await client.call_model("review x.py", force_cache=True)
+        await client.call_model("review x.py", force_cache=True)
+        assert len(provider.requests) == 3
+
+    async def test_stream_populates_and_reads_cache(self, client):
+        client, provider = client
+        streamed = [c async for c in client.stream_model("review x.py", temperature=0)]
+        cached = [c async for c in client.stream_model("review x.py", temperature=0)]
+
+        assert "".join(streamed) == "Hello, world"
+        assert cached == ["Hello, world"]
+        assert len(provider.requests) == 1
+        assert await client.call_model("review x.py", temperature=0) == "Hello, world"
@@ -0,0 +1,144 @@
+"""
+Load benchmark for the GitHub MCP tools' transport.
+
+Starts a local fake GitHub API (fixed latency per request, keep-alive)
+and runs concurrent agents issuing the read tools' requests
+(get_repo, get_commits, get_pulls, get_pr_files) three ways:
+
+- per-call: a new httpx.AsyncClient per call, as the tools used to do
+- pooled: one GitHubTransport with the response cache disabled
+  (identical reads in flight at the same moment are still shared)
+- pooled+cache: GitHubTransport with its default TTL cache
+
+Run with: python bench_tools.py [--agents 50] [--calls 20] [--latency 0.02]
+
+Connection setup on localhost is far cheaper than a TLS handshake with
+api.github.com, so the per-call numbers here are a best case.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Awaitable, Callable, List, Optional
+import httpx
+from transport import JSON_MEDIA_TYPE, GitHubTransport, TTLCache
+
+REPOS = [("octo", f"repo{i}") for i in range(5)]
+TOKENS = ["ghp_agent_a", "ghp_agent_b"]
+
+
+class FakeGitHubAPI:
+    """Minimal HTTP/1.1 GitHub stand-in answering every GET with JSON."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        self.server.close()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, path, _ = request_line.decode().split(" ", 2)
+                while await reader.readline() not in (b"\r\n", b""):
+                    pass
+                self.requests += 1
+                await asyncio.sleep(self.latency)
+                payload = json.dumps({"path": path, "items": list(range(20))}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+                    + f"content-length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def tool_call(rng: random.Random):
+    """(path, params, token) of a random read tool call."""
+    owner, repo = rng.choice(REPOS)
+    token = rng.choice(TOKENS)
+    path, params = rng.choice([
+        (f"/repos/{owner}/{repo}", None),
+        (f"/repos/{owner}/{repo}/commits", {"per_page": 10}),
+        (f"/repos/{owner}/{repo}/pulls", {"state": "open"}),
+        (f"/repos/{owner}/{repo}/pulls/{rng.randint(1, 5)}/files", None),
+    ])
+    return path, params, token
+
+
+def per_call_get(base_url: str) -> Callable[..., Awaitable]:
+    async def get(path: str, token: str, params: Optional[dict]):
+        headers = {"Accept": JSON_MEDIA_TYPE, "Authorization": f"token {token}"}
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"{base_url}{path}", headers=headers, params=params)
+            response.raise_for_status()
+            return response.json()
+    return get
+
+
+async def run(name: str, get: Callable[..., Awaitable], api: FakeGitHubAPI, agents: int, calls: int) -> None:
+    api.connections = api.requests = 0
+    latencies: List[float] = []
+
+    async def agent(seed: int):
+        rng = random.Random(seed)
+        for _ in range(calls):
+            path, params, token = tool_call(rng)
+            started = time.perf_counter()
+            await get(path, token, params)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(agent(seed) for seed in range(agents)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = agents * calls
+    print(
+        f"{name:<13} {total / elapsed:8.0f} calls/s   "
+        f"p50 {latencies[total // 2] * 1000:6.1f} ms   p99 {latencies[int(total * 0.99)] * 1000:6.1f} ms   "
+        f"{api.requests:5d} GitHub requests   {api.connections:5d} connections"
+    )
+
+
+async def main(agents: int, calls: int, latency: float) -> None:
+    api = FakeGitHubAPI(latency)
+    base_url = await api.start()
+    print(f"{agents} agents x {calls} tool calls, {latency * 1000:.0f} ms API latency")
+
+    await run("per-call", per_call_get(base_url), api, agents, calls)
+
+    pooled = GitHubTransport(base_url, cache=TTLCache(ttl=0), max_connections=100, per_token_concurrency=50)
+    await run("pooled", lambda path, token, params: pooled.get(path, token, params), api, agents, calls)
+    await pooled.close()
+
+    cached = GitHubTransport(base_url, max_connections=100, per_token_concurrency=50)
+    await run("pooled+cache", lambda path, token, params: cached.get(path, token, params), api, agents, calls)
+    await cached.close()
+
+    await api.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.agents, args.calls, args.latency))
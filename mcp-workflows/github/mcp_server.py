@@ -2,15 +2,29 @@
 GitHub MCP Server Implementation
 
 This server provides GitHub API operations for AI agents.
+All tools share one pooled GitHubTransport, opened and closed with the
+server's lifespan; read tools are cached briefly and calls are limited
+per token (see transport.py).
 """
-from typing import Dict, List, Optional
-import httpx
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
 from mcp import Server
+from transport import DIFF_MEDIA_TYPE, GITHUB_API_BASE, GitHubTransport
 
-server = Server("github-mcp-server", version="1.0.0")
+github = GitHubTransport(GITHUB_API_BASE)
 
-# Configuration
-GITHUB_API_BASE = "https://api.github.com"
+
+@asynccontextmanager
+async def lifespan(server: Server) -> AsyncIterator[GitHubTransport]:
+    """Keep the connection pool open for as long as the server runs."""
+    await github.start()
+    try:
+        yield github
+    finally:
+        await github.close()
+
+
+server = Server("github-mcp-server", version="1.0.0", lifespan=lifespan)
 
 
 @server.tool("github.get_repo")
@@ -18,21 +32,7 @@ async def get_repo(params: Dict) -> Dict:
     """Get repository information."""
     owner = params["owner"]
     repo = params["repo"]
-    token = params.get("token")
-
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-    }
-    if token:
-        headers["Authorization"] = f"token {token}"
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}",
-            headers=headers
-        )
-        response.raise_for_status()
-        return response.json()
+    return await github.get(f"/repos/{owner}/{repo}", params.get("token"))
 
 
 @server.tool("github.get_commits")
@@ -41,22 +41,11 @@ async def get_commits(params: Dict) -> List[Dict]:
     owner = params["owner"]
     repo = params["repo"]
     per_page = params.get("per_page", 10)
-    token = params.get("token")
-
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-    }
-    if token:
-        headers["Authorization"] = f"token {token}"
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/commits",
-            headers=headers,
-            params={"per_page": per_page}
-        )
-        response.raise_for_status()
-        return response.json()
+    return await github.get(
+        f"/repos/{owner}/{repo}/commits",
+        params.get("token"),
+        params={"per_page": per_page}
+    )
 
 
 @server.tool("github.get_diff")
@@ -65,22 +54,12 @@ async def get_diff(params: Dict) -> Dict:
     owner = params["owner"]
     repo = params["repo"]
     sha = params["sha"]
-    token = params.get("token")
-
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Accept": "application/vnd.github.diff",  # Get diff format
-    }
-    if token:
-        headers["Authorization"] = f"token {token}"
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/commits/{sha}",
-            headers=headers
-        )
-        response.raise_for_status()
-        return response.json()
+    diff = await github.get(
+        f"/repos/{owner}/{repo}/commits/{sha}",
+        params.get("token"),
+        accept=DIFF_MEDIA_TYPE
+    )
+    return {"sha": sha, "diff": diff}
 
 
 @server.tool("github.get_pulls")
@@ -89,22 +68,11 @@ async def get_pulls(params: Dict) -> List[Dict]:
     owner = params["owner"]
     repo = params["repo"]
     state = params.get("state", "open")
-    token = params.get("token")
-
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-    }
-    if token:
-        headers["Authorization"] = f"token {token}"
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls",
-            headers=headers,
-            params={"state": state}
-        )
-        response.raise_for_status()
-        return response.json()
+    return await github.get(
+        f"/repos/{owner}/{repo}/pulls",
+        params.get("token"),
+        params={"state": state}
+    )
 
 
 @server.tool("github.get_pr_files")
@@ -113,21 +81,10 @@ async def get_pr_files(params: Dict) -> List[Dict]:
     owner = params["owner"]
     repo = params["repo"]
     pull_number = params["pull_number"]
-    token = params.get("token")
-
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-    }
-    if token:
-        headers["Authorization"] = f"token {token}"
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{pull_number}/files",
-            headers=headers
-        )
-        response.raise_for_status()
-        return response.json()
+    return await github.get(
+        f"/repos/{owner}/{repo}/pulls/{pull_number}/files",
+        params.get("token")
+    )
 
 
 @server.tool("github.create_issue")
@@ -143,11 +100,6 @@ async def create_issue(params: Dict) -> Dict:
     if not token:
         raise ValueError("Token required for creating issues")
 
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"token {token}",
-    }
-
     data = {
         "title": title,
         "body": body,
@@ -155,14 +107,7 @@ async def create_issue(params: Dict) -> Dict:
     if labels:
         data["labels"] = labels
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues",
-            headers=headers,
-            json=data
-        )
-        response.raise_for_status()
-        return response.json()
+    return await github.post(f"/repos/{owner}/{repo}/issues", token, data)
 
 
 @server.tool("github.create_comment")
@@ -177,21 +122,8 @@ async def create_comment(params: Dict) -> Dict:
     if not token:
         raise ValueError("Token required for creating comments")
 
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"token {token}",
-    }
-
     data = {"body": body}
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{issue_number}/comments",
-            headers=headers,
-            json=data
-        )
-        response.raise_for_status()
-        return response.json()
+    return await github.post(f"/repos/{owner}/{repo}/issues/{issue_number}/comments", token, data)
 
 
 @server.tool("github.get_languages")
@@ -199,21 +131,7 @@ async def get_languages(params: Dict) -> Dict[str, int]:
     """Get repository languages."""
     owner = params["owner"]
     repo = params["repo"]
-    token = params.get("token")
-
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-    }
-    if token:
-        headers["Authorization"] = f"token {token}"
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/languages",
-            headers=headers
-        )
-        response.raise_for_status()
-        return response.json()
+    return await github.get(f"/repos/{owner}/{repo}/languages", params.get("token"))
 
 
 if __name__ == "__main__":
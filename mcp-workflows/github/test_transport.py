@@ -0,0 +1,161 @@
+"""
+Unit tests for the GitHub MCP server's transport.
+
+Run with: python -m pytest test_transport.py
+"""
+import asyncio
+import httpx
+import pytest
+from transport import GitHubTransport, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeAPI:
+    """MockTransport handler; requests wait for `release` when it is set up."""
+
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.paths = []
+        self.release = None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        if self.release is not None:
+            await self.release.wait()
+        return httpx.Response(self.status_code, json={"path": request.url.path})
+
+
+def make_transport(api: FakeAPI, cache=None) -> GitHubTransport:
+    transport = GitHubTransport("https://api.github.test", cache=cache)
+    transport.client = httpx.AsyncClient(base_url=transport.base_url, transport=httpx.MockTransport(api))
+    return transport
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestTTLCache:
+    """Unit tests for expiry and eviction."""
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl=30, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 29
+        assert cache.get("a") == 1
+        clock.now = 30
+        assert cache.get("a") is None
+        assert cache.stats() == {"size": 0, "ttl": 30, "hits": 1, "misses": 1}
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(ttl=30, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_zero_ttl_disables_cache(self):
+        cache = TTLCache(ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+
+class TestGitHubTransport:
+    """Unit tests for cached and shared reads."""
+
+    def test_cached_read_is_not_sent_again(self):
+        async def run():
+            api = FakeAPI()
+            transport = make_transport(api)
+            first = await transport.get("/repos/octo/app", "ghp_a")
+            second = await transport.get("/repos/octo/app", "ghp_a")
+            other_token = await transport.get("/repos/octo/app", "ghp_b")
+            await transport.close()
+            return api, first, second, other_token
+
+        api, first, second, other_token = asyncio.run(run())
+
+        assert first == second == other_token == {"path": "/repos/octo/app"}
+        # Cached per token
+        assert api.paths == ["/repos/octo/app"] * 2
+
+    def test_concurrent_callers_share_one_request(self):
+        async def run():
+            api = FakeAPI()
+            api.release = asyncio.Event()
+            transport = make_transport(api)
+            callers = [asyncio.create_task(transport.get("/repos/octo/app")) for _ in range(5)]
+            await settle()
+            api.release.set()
+            results = await asyncio.gather(*callers)
+            await transport.close()
+            return api, transport, results
+
+        api, transport, results = asyncio.run(run())
+
+        assert results == [{"path": "/repos/octo/app"}] * 5
+        assert api.paths == ["/repos/octo/app"]
+        assert transport.inflight == {}
+
+    def test_errors_reach_every_caller_and_are_not_cached(self):
+        async def run():
+            api = FakeAPI(status_code=502)
+            api.release = asyncio.Event()
+            transport = make_transport(api)
+            callers = [asyncio.create_task(transport.get("/repos/octo/app")) for _ in range(3)]
+            await settle()
+            api.release.set()
+            results = await asyncio.gather(*callers, return_exceptions=True)
+
+            api.status_code = 200
+            retried = await transport.get("/repos/octo/app")
+            await transport.close()
+            return api, results, retried
+
+        api, results, retried = asyncio.run(run())
+
+        assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+        assert retried == {"path": "/repos/octo/app"}
+        assert len(api.paths) == 2
+
+    def test_cancelled_leader_does_not_fail_waiters(self):
+        async def run():
+            api = FakeAPI()
+            api.release = asyncio.Event()
+            transport = make_transport(api)
+            leader = asyncio.create_task(transport.get("/repos/octo/app"))
+            await settle()
+            waiter = asyncio.create_task(transport.get("/repos/octo/app"))
+            await settle()
+
+            leader.cancel()
+            await settle()
+            api.release.set()
+            result = await waiter
+            cached = await transport.get("/repos/octo/app")
+            await transport.close()
+            return api, leader, result, cached
+
+        api, leader, result, cached = asyncio.run(run())
+
+        assert leader.cancelled()
+        assert result == cached == {"path": "/repos/octo/app"}
+        assert api.paths == ["/repos/octo/app"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
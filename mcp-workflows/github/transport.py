@@ -0,0 +1,190 @@
+"""
+GitHub Transport for the MCP Server
+
+One pooled httpx client shared by every tool call, instead of a new
+client (and TCP/TLS handshake) per invocation, plus:
+
+- TTLCache: responses of read tools, reused for a few seconds so agents
+  asking for the same repository, commits or PR files in quick
+  succession cost one GitHub request. Identical reads already in flight
+  are shared rather than sent twice.
+- A per-token concurrency limit, so one busy token cannot monopolise
+  the pool or trip GitHub's secondary rate limits.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import httpx
+
+GITHUB_API_BASE = os.getenv("GITHUB_API_BASE", "https://api.github.com")
+JSON_MEDIA_TYPE = "application/vnd.github.v3+json"
+DIFF_MEDIA_TYPE = "application/vnd.github.diff"
+
+# Seconds a read tool's response is reused (0 disables the cache)
+CACHE_TTL_SECONDS = float(os.getenv("MCP_GITHUB_CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("MCP_GITHUB_CACHE_MAX_ENTRIES", "1024"))
+MAX_CONNECTIONS = int(os.getenv("MCP_GITHUB_MAX_CONNECTIONS", "50"))
+# GitHub requests in flight per token
+PER_TOKEN_CONCURRENCY = int(os.getenv("MCP_GITHUB_PER_TOKEN_CONCURRENCY", "8"))
+TIMEOUT_SECONDS = float(os.getenv("MCP_GITHUB_TIMEOUT_SECONDS", "30"))
+
+
+class TTLCache:
+    """LRU of values that expire ttl seconds after being stored."""
+
+    def __init__(
+        self,
+        ttl: float = CACHE_TTL_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if self.clock() < expires:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        self.entries[key] = (self.clock() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self.entries), "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+def token_key(token: Optional[str]) -> str:
+    """Identifier for a token that does not expose it."""
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+class GitHubTransport:
+    """Pooled, cached and per-token limited access to the GitHub API."""
+
+    def __init__(
+        self,
+        base_url: str = GITHUB_API_BASE,
+        cache: Optional[TTLCache] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        per_token_concurrency: int = PER_TOKEN_CONCURRENCY,
+        timeout: float = TIMEOUT_SECONDS,
+    ):
+        self.base_url = base_url
+        self.cache = cache if cache is not None else TTLCache()
+        self.max_connections = max_connections
+        self.per_token_concurrency = per_token_concurrency
+        self.timeout = timeout
+        self.client: Optional[httpx.AsyncClient] = None
+        self.limiters: Dict[str, asyncio.Semaphore] = {}
+        self.inflight: Dict[Any, asyncio.Task] = {}
+        self.requests = 0
+
+    async def start(self) -> None:
+        """Open the connection pool (also done lazily on first use)."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _headers(self, token: Optional[str], accept: str) -> Dict[str, str]:
+        headers = {"Accept": accept}
+        if token:
+            headers["Authorization"] = f"token {token}"
+        return headers
+
+    def _limiter(self, key: str) -> asyncio.Semaphore:
+        limiter = self.limiters.get(key)
+        if limiter is None:
+            limiter = self.limiters[key] = asyncio.Semaphore(self.per_token_concurrency)
+        return limiter
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        token: Optional[str],
+        accept: str = JSON_MEDIA_TYPE,
+        **kwargs
+    ) -> Any:
+        """Make a request within the token's limit; JSON, or text for non-JSON media types."""
+        await self.start()
+        async with self._limiter(token_key(token)):
+            self.requests += 1
+            response = await self.client.request(method, path, headers=self._headers(token, accept), **kwargs)
+        response.raise_for_status()
+        return response.json() if accept == JSON_MEDIA_TYPE else response.text
+
+    async def get(
+        self,
+        path: str,
+        token: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        accept: str = JSON_MEDIA_TYPE,
+    ) -> Any:
+        """GET a resource, from the cache when it was read recently."""
+        # Cached per token: private resources differ between users
+        key = (token_key(token), accept, path, tuple(sorted((params or {}).items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Join an identical read already on its way. The request runs as
+        # its own task, so a caller giving up does not cancel it for the rest
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._send("GET", path, token, accept, params=params))
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._settle(key, done))
+        return await asyncio.shield(task)
+
+    def _settle(self, key: Any, task: asyncio.Task) -> None:
+        """Cache a finished read and stop sharing it."""
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        # Retrieving the exception keeps it from being logged as unhandled;
+        # the callers awaiting the task have it raised to them
+        if not task.cancelled() and task.exception() is None:
+            self.cache.set(key, task.result())
+
+    async def post(self, path: str, token: Optional[str], json: Dict[str, Any]) -> Any:
+        """POST to the API; never cached."""
+        return await self._send("POST", path, token, json=json)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "cache": self.cache.stats(),
+            "tokens": len(self.limiters),
+        }